@@ -1,21 +1,33 @@
 import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
-from plotly.subplots import make_subplots
-import os
+from data_store import Column, melt_time_series, read_time_series
+from figure_theme import dual_axis_figure, themed_figure
+from instrumentation import stage
+from macro_math import convert_currency, price_per_unit
+from panel import Panel
+from plot_utils import check_output_dir
+from render_scheduler import FigureJob, build_arg_parser, render_jobs
 
-def check_output_dir():
-    """Ensure the interactive_plots directory exists."""
-    if not os.path.exists('interactive_plots'):
-        os.makedirs('interactive_plots')
+# Store indicators and dtypes behind each dataset (country BGD unless noted)
+BANGLADESH_COLUMNS = {
+    'GDP (USD Billion)': Column('NGDPD', 'int64'),
+    'Inflation Rate (%)': Column('PCPIPCH'),
+    'Debt-to-GDP (%)': Column('GGXWDG_NGDP'),
+    'Forex Reserves (USD Billion)': Column('RESERVES_USD')
+}
+BDT_COLUMNS = {'Exchange Rate (BDT/USD)': Column('XRATE_USD')}
+BD_COMMODITIES_COLUMNS = {'Gold_USD': Column('GOLD_USD', 'int64'), 'Silver_USD': Column('SILVER_USD')} # country WLD
+REMITTANCES_COLUMNS = {'Remittances (USD Billion)': Column('REMITTANCES_USD')}
+TRADE_COLUMNS = {'Exports': Column('EXPORTS_USD'), 'Imports': Column('IMPORTS_USD')}
 
-def analyze_bangladesh_data():
-    """Generate Bangladesh specific interactive visualizations using Plotly."""
-    
-    check_output_dir()
-    
+def create_bangladesh_dataframe():
+    """Bangladesh macro indicators (2020-2025)."""
+    df = read_time_series('bangladesh', 'BGD', BANGLADESH_COLUMNS)
+    if df is not None:
+        return df
     years = [2020, 2021, 2022, 2023, 2024, 2025]
-    
+
     # Data compiled from research (Macrotrends, World Bank, IMF, FocusEconomics)
     data = {
         'Year': years,
@@ -24,14 +36,74 @@ def analyze_bangladesh_data():
         'Debt-to-GDP (%)': [34.5, 35.6, 37.9, 39.7, 41.0, 40.3],
         'Forex Reserves (USD Billion)': [43.2, 46.2, 33.7, 21.9, 21.4, 26.7]
     }
-    
-    df_bd = pd.DataFrame(data)
-    
-    print("Generating Interactive Bangladesh GDP Trend...")
-    # 1. GDP Trend (Line + Area)
-    fig_gdp = go.Figure()
+    return pd.DataFrame(data)
+
+def create_bdt_dataframe():
+    """BDT/USD exchange rate (1972-2025)."""
+    df = read_time_series('bangladesh', 'BGD', BDT_COLUMNS)
+    if df is not None:
+        return df
+    bdt_data = {
+        'Year': [
+            1972, 1975, 1980, 1985, 1990, 1995, 2000, 2005, 2010,
+            2012, 2014, 2016, 2018, 2019, 2020, 2021, 2022, 2023, 2024, 2025
+        ],
+        'Exchange Rate (BDT/USD)': [
+            7.7, 12.0, 15.4, 28.0, 32.8, 40.3, 52.1, 64.3, 69.0,
+            82.0, 77.5, 78.5, 83.9, 84.5, 84.8, 85.5, 95.0, 106.0, 117.0, 125.0
+        ]
+    }
+    return pd.DataFrame(bdt_data)
+
+def create_bd_commodities_dataframe():
+    """Gold and Silver prices in USD on the BDT exchange-rate years."""
+    df = read_time_series('bangladesh', 'WLD', BD_COMMODITIES_COLUMNS)
+    if df is not None:
+        return df
+    comm_data = {
+        'Year': [
+            1972, 1975, 1980, 1985, 1990, 1995, 2000, 2005, 2010,
+            2012, 2014, 2016, 2018, 2019, 2020, 2021, 2022, 2023, 2024, 2025
+        ],
+        'Gold_USD': [
+            58, 160, 615, 317, 383, 384, 279, 444, 1224,
+            1669, 1266, 1250, 1268, 1392, 1769, 1798, 1800, 1940, 2380, 3380
+        ],
+        'Silver_USD': [
+            1.8, 4.4, 21.0, 6.1, 4.8, 5.2, 4.9, 7.3, 20.2,
+            31.1, 19.0, 17.1, 15.7, 16.2, 20.5, 25.1, 21.8, 23.4, 28.5, 38.2
+        ]
+    }
+    return pd.DataFrame(comm_data)
+
+def create_remittances_dataframe():
+    """Remittance inflows (2015-2024)."""
+    df = read_time_series('bangladesh', 'BGD', REMITTANCES_COLUMNS)
+    if df is not None:
+        return df
+    remit_data = {
+        'Year': [2015, 2016, 2017, 2018, 2019, 2020, 2021, 2022, 2023, 2024],
+        'Remittances (USD Billion)': [15.3, 14.9, 13.5, 15.5, 18.3, 21.7, 24.8, 21.0, 21.6, 23.9]
+    }
+    return pd.DataFrame(remit_data)
+
+def create_trade_dataframe():
+    """Exports vs Imports (2019-2024)."""
+    df = read_time_series('bangladesh', 'BGD', TRADE_COLUMNS)
+    if df is not None:
+        return df
+    trade_data = {
+        'Year': [2019, 2020, 2021, 2022, 2023, 2024],
+        'Exports': [40.5, 33.7, 38.8, 52.0, 55.6, 58.0],
+        'Imports': [55.4, 50.7, 60.7, 82.5, 75.1, 72.0]
+    }
+    return pd.DataFrame(trade_data)
+
+def build_gdp_trend(df_bd):
+    """GDP Trend (Line + Area)."""
+    fig_gdp = themed_figure()
     fig_gdp.add_trace(go.Scatter(
-        x=df_bd['Year'], 
+        x=df_bd['Year'],
         y=df_bd['GDP (USD Billion)'],
         mode='lines+markers+text',
         name='GDP',
@@ -41,28 +113,23 @@ def analyze_bangladesh_data():
         text=[f'${x}B' for x in df_bd['GDP (USD Billion)']],
         textposition="top center"
     ))
-    
+
     fig_gdp.update_layout(
         title='Bangladesh GDP (2020-2025)',
         xaxis_title='Year',
         yaxis_title='GDP ($B)',
-        template='plotly_white',
-        hovermode='x unified',
-        autosize=True,
-        margin=dict(l=10, r=10, t=30, b=10),
-        title_font_size=14,
-        font=dict(size=10)
+        hovermode='x unified'
     )
-    fig_gdp.write_html("interactive_plots/bd_gdp_trend.html")
+    return fig_gdp
+
+def build_inflation_reserves(df_bd):
+    """Inflation vs Reserves (Dual Axis)."""
+    fig_dual = dual_axis_figure()
 
-    print("Generating Interactive Inflation vs Reserves Plot...")
-    # 2. Inflation vs Reserves (Dual Axis)
-    fig_dual = make_subplots(specs=[[{"secondary_y": True}]])
-    
     # Inflation (Bar or Line)
     fig_dual.add_trace(
         go.Scatter(
-            x=df_bd['Year'], 
+            x=df_bd['Year'],
             y=df_bd['Inflation Rate (%)'],
             name="Inflation",
             mode='lines+markers',
@@ -71,11 +138,11 @@ def analyze_bangladesh_data():
         ),
         secondary_y=False
     )
-    
+
     # Reserves (Line)
     fig_dual.add_trace(
         go.Scatter(
-            x=df_bd['Year'], 
+            x=df_bd['Year'],
             y=df_bd['Forex Reserves (USD Billion)'],
             name="Reserves",
             mode='lines+markers',
@@ -84,28 +151,22 @@ def analyze_bangladesh_data():
         ),
         secondary_y=True
     )
-    
+
     fig_dual.update_layout(
         title='Inflation vs Reserves',
-        template='plotly_white',
         hovermode='x unified',
-        legend=dict(orientation="h", yanchor="bottom", y=-0.2, xanchor="center", x=0.5),
-        autosize=True,
-        margin=dict(l=10, r=10, t=30, b=10),
-        title_font_size=14,
-        font=dict(size=10)
+        legend=dict(orientation="h", yanchor="bottom", y=-0.2, xanchor="center", x=0.5)
     )
-    
+
     fig_dual.update_yaxes(title_text="Inflation (%)", color='#f44336', secondary_y=False)
     fig_dual.update_yaxes(title_text="Reserves ($B)", color='#2196f3', secondary_y=True)
-    
-    fig_dual.write_html("interactive_plots/bd_inflation_reserves.html")
-    
-    print("Generating Interactive Foreign Reserves Plot...")
-    # 3. Dedicated Foreign Reserves Plot
-    fig_reserves = go.Figure()
+    return fig_dual
+
+def build_forex_reserves(df_bd):
+    """Dedicated Foreign Reserves Plot."""
+    fig_reserves = themed_figure()
     fig_reserves.add_trace(go.Scatter(
-        x=df_bd['Year'], 
+        x=df_bd['Year'],
         y=df_bd['Forex Reserves (USD Billion)'],
         mode='lines+markers+text',
         name='Reserves',
@@ -115,62 +176,40 @@ def analyze_bangladesh_data():
         text=[f'${x}B' for x in df_bd['Forex Reserves (USD Billion)']],
         textposition="top center"
     ))
-    
+
     fig_reserves.update_layout(
         title='Forex Reserves Trend',
         xaxis_title='Year',
         yaxis_title='Reserves ($B)',
-        template='plotly_white',
-        hovermode='x unified',
-        autosize=True,
-        margin=dict(l=10, r=10, t=30, b=10),
-        title_font_size=14,
-        font=dict(size=10)
+        hovermode='x unified'
     )
-    fig_reserves.write_html("interactive_plots/bd_forex_reserves.html")
+    return fig_reserves
 
-    print("Generating Interactive Debt Plot...")
-    # 4. Debt Trend (Bar)
-    fig_debt = go.Figure()
+def build_debt_trend(df_bd):
+    """Debt Trend (Bar)."""
+    fig_debt = themed_figure()
     fig_debt.add_trace(go.Bar(
-        x=df_bd['Year'], 
+        x=df_bd['Year'],
         y=df_bd['Debt-to-GDP (%)'],
         name='Debt Ratio',
         marker_color='indianred',
         text=[f'{x}%' for x in df_bd['Debt-to-GDP (%)']],
         textposition='auto'
     ))
-    
+
     fig_debt.update_layout(
         title='Public Debt Evolution',
         xaxis_title='Year',
         yaxis_title='Debt (%)',
-        template='plotly_white',
-        yaxis_range=[0, 50],
-        autosize=True,
-        margin=dict(l=10, r=10, t=30, b=10),
-        title_font_size=14,
-        font=dict(size=10)
+        yaxis_range=[0, 50]
     )
-    fig_debt.write_html("interactive_plots/bd_debt_trend.html")
+    return fig_debt
 
-    print("Generating Interactive BDT Devaluation Plot...")
-    # 5. BDT Devaluation
-    bdt_data = {
-        'Year': [
-            1972, 1975, 1980, 1985, 1990, 1995, 2000, 2005, 2010, 
-            2012, 2014, 2016, 2018, 2019, 2020, 2021, 2022, 2023, 2024, 2025
-        ],
-        'Exchange Rate (BDT/USD)': [
-            7.7, 12.0, 15.4, 28.0, 32.8, 40.3, 52.1, 64.3, 69.0, 
-            82.0, 77.5, 78.5, 83.9, 84.5, 84.8, 85.5, 95.0, 106.0, 117.0, 125.0
-        ]
-    }
-    df_bdt = pd.DataFrame(bdt_data)
-    
-    fig_curr = go.Figure()
+def build_bdt_devaluation(df_bdt):
+    """BDT Devaluation."""
+    fig_curr = themed_figure()
     fig_curr.add_trace(go.Scatter(
-        x=df_bdt['Year'], 
+        x=df_bdt['Year'],
         y=df_bdt['Exchange Rate (BDT/USD)'],
         mode='lines',
         name='Exch Rate',
@@ -178,7 +217,7 @@ def analyze_bangladesh_data():
         fill='tozeroy',
         fillcolor='rgba(231, 76, 60, 0.1)'
     ))
-    
+
     fig_curr.add_annotation(
         x=2022, y=95,
         xref="x", yref="y",
@@ -187,48 +226,30 @@ def analyze_bangladesh_data():
         arrowhead=1,
         ax=-40, ay=-40
     )
-    
+
     fig_curr.update_layout(
         title='BDT Devaluation (1972-2025)',
         xaxis_title='Year',
         yaxis_title='BDT/USD',
-        template='plotly_white',
-        hovermode='x unified',
-        autosize=True,
-        margin=dict(l=10, r=10, t=30, b=10),
-        title_font_size=14,
-        font=dict(size=10)
+        hovermode='x unified'
     )
-    fig_curr.write_html("interactive_plots/bdt_exchange_rate_trend.html")
+    return fig_curr
+
+def build_bd_commodities(df_comm, df_bdt):
+    """Commodities in BDT."""
+    # World prices on their own year grid; the exchange rate is interpolated onto
+    # it rather than dropping years the two series do not share
+    prices = Panel.from_frame(df_comm, 'BGD').join(Panel.from_frame(df_bdt, 'BGD'), how='left', fill='interpolate')
+    df_merged = prices.frame('BGD')
+
+    # USD per troy ounce -> BDT per bhori for both metals at once
+    prices_bdt = convert_currency(df_merged[['Gold_USD', 'Silver_USD']], df_merged['Exchange Rate (BDT/USD)'])
+    per_bhori = price_per_unit(prices_bdt, 'troy_oz', 'bhori')
+    df_merged['Gold_BDT_per_Bhori'] = per_bhori['Gold_USD']
+    df_merged['Silver_BDT_per_Bhori'] = per_bhori['Silver_USD']
+
+    fig_bd_comm = dual_axis_figure()
 
-    print("Generating Interactive Gold/Silver vs BDT Plot...")
-    # 6. Commodities in BDT
-    comm_data = {
-        'Year': [
-            1972, 1975, 1980, 1985, 1990, 1995, 2000, 2005, 2010, 
-            2012, 2014, 2016, 2018, 2019, 2020, 2021, 2022, 2023, 2024, 2025
-        ],
-        'Gold_USD': [
-            58, 160, 615, 317, 383, 384, 279, 444, 1224, 
-            1669, 1266, 1250, 1268, 1392, 1769, 1798, 1800, 1940, 2380, 3380
-        ],
-        'Silver_USD': [
-            1.8, 4.4, 21.0, 6.1, 4.8, 5.2, 4.9, 7.3, 20.2, 
-            31.1, 19.0, 17.1, 15.7, 16.2, 20.5, 25.1, 21.8, 23.4, 28.5, 38.2
-        ]
-    }
-    df_comm = pd.DataFrame(comm_data)
-    df_merged = pd.merge(df_comm, df_bdt, on='Year')
-    
-    df_merged['Gold_BDT_per_oz'] = df_merged['Gold_USD'] * df_merged['Exchange Rate (BDT/USD)']
-    df_merged['Silver_BDT_per_oz'] = df_merged['Silver_USD'] * df_merged['Exchange Rate (BDT/USD)']
-    
-    conversion_factor = 2.666
-    df_merged['Gold_BDT_per_Bhori'] = df_merged['Gold_BDT_per_oz'] / conversion_factor
-    df_merged['Silver_BDT_per_Bhori'] = df_merged['Silver_BDT_per_oz'] / conversion_factor
-
-    fig_bd_comm = make_subplots(specs=[[{"secondary_y": True}]])
-    
     fig_bd_comm.add_trace(
         go.Scatter(
             x=df_merged['Year'], y=df_merged['Gold_BDT_per_Bhori'],
@@ -240,7 +261,7 @@ def analyze_bangladesh_data():
         ),
         secondary_y=False
     )
-    
+
     fig_bd_comm.add_trace(
         go.Scatter(
             x=df_merged['Year'], y=df_merged['Silver_BDT_per_Bhori'],
@@ -250,32 +271,20 @@ def analyze_bangladesh_data():
         ),
         secondary_y=True
     )
-    
+
     fig_bd_comm.update_layout(
         title='Gold & Silver in BDT',
-        template='plotly_white',
         hovermode='x unified',
-        legend=dict(orientation="h", yanchor="bottom", y=-0.2, xanchor="center", x=0.5),
-        autosize=True,
-        margin=dict(l=10, r=10, t=30, b=10),
-        title_font_size=14,
-        font=dict(size=10)
+        legend=dict(orientation="h", yanchor="bottom", y=-0.2, xanchor="center", x=0.5)
     )
-    
+
     fig_bd_comm.update_yaxes(title_text="Gold (BDT)", color='#b7950b', secondary_y=False)
     fig_bd_comm.update_yaxes(title_text="Silver (BDT)", color='#7f8c8d', secondary_y=True)
-    
-    fig_bd_comm.write_html("interactive_plots/bd_commodities.html")
-    
-    print("Generating Interactive Remittances Plot...")
-    # 7. Remittances Inflow
-    remit_data = {
-        'Year': [2015, 2016, 2017, 2018, 2019, 2020, 2021, 2022, 2023, 2024],
-        'Remittances (USD Billion)': [15.3, 14.9, 13.5, 15.5, 18.3, 21.7, 24.8, 21.0, 21.6, 23.9]
-    }
-    df_remit = pd.DataFrame(remit_data)
-    
-    fig_remit = go.Figure()
+    return fig_bd_comm
+
+def build_remittances(df_remit):
+    """Remittances Inflow."""
+    fig_remit = themed_figure()
     fig_remit.add_trace(go.Bar(
         x=df_remit['Year'],
         y=df_remit['Remittances (USD Billion)'],
@@ -284,29 +293,17 @@ def analyze_bangladesh_data():
         text=[f'${x}B' for x in df_remit['Remittances (USD Billion)']],
         textposition='auto'
     ))
-    
+
     fig_remit.update_layout(
         title='Remittance Inflows',
         xaxis_title='Year',
-        yaxis_title='USD Billion',
-        template='plotly_white',
-        autosize=True,
-        margin=dict(l=10, r=10, t=30, b=10),
-        title_font_size=14,
-        font=dict(size=10)
+        yaxis_title='USD Billion'
     )
-    fig_remit.write_html("interactive_plots/bd_remittances.html")
+    return fig_remit
 
-    print("Generating Interactive Trade Balance Plot...")
-    # 8. Trade Balance (Exports vs Imports)
-    trade_data = {
-        'Year': [2019, 2020, 2021, 2022, 2023, 2024],
-        'Exports': [40.5, 33.7, 38.8, 52.0, 55.6, 58.0],
-        'Imports': [55.4, 50.7, 60.7, 82.5, 75.1, 72.0]
-    }
-    df_trade = pd.DataFrame(trade_data)
-    
-    fig_trade = go.Figure()
+def build_trade_balance(df_trade):
+    """Trade Balance (Exports vs Imports)."""
+    fig_trade = themed_figure()
     fig_trade.add_trace(go.Bar(
         x=df_trade['Year'], y=df_trade['Exports'],
         name='Exports', marker_color='#2980b9'
@@ -315,22 +312,54 @@ def analyze_bangladesh_data():
         x=df_trade['Year'], y=df_trade['Imports'],
         name='Imports', marker_color='#c0392b'
     ))
-    
+
     fig_trade.update_layout(
         title='Trade Balance: Exp vs Imp',
         xaxis_title='Year',
         yaxis_title='USD Billion',
         barmode='group',
-        template='plotly_white',
-        legend=dict(orientation="h", yanchor="bottom", y=-0.2, xanchor="center", x=0.5),
-        autosize=True,
-        margin=dict(l=10, r=10, t=30, b=10),
-        title_font_size=14,
-        font=dict(size=10)
+        legend=dict(orientation="h", yanchor="bottom", y=-0.2, xanchor="center", x=0.5)
     )
-    fig_trade.write_html("interactive_plots/bd_trade_balance.html")
+    return fig_trade
+
+def store_records():
+    """Long-format data store rows for the Bangladesh datasets."""
+    return [
+        melt_time_series(create_bangladesh_dataframe(), 'bangladesh', 'BGD', BANGLADESH_COLUMNS, 'Bangladesh'),
+        melt_time_series(create_bdt_dataframe(), 'bangladesh', 'BGD', BDT_COLUMNS, 'Bangladesh'),
+        melt_time_series(create_bd_commodities_dataframe(), 'bangladesh', 'WLD', BD_COMMODITIES_COLUMNS, 'World'),
+        melt_time_series(create_remittances_dataframe(), 'bangladesh', 'BGD', REMITTANCES_COLUMNS, 'Bangladesh'),
+        melt_time_series(create_trade_dataframe(), 'bangladesh', 'BGD', TRADE_COLUMNS, 'Bangladesh'),
+    ]
+
+def bangladesh_figure_jobs():
+    """Independent figure jobs for the Bangladesh dashboard."""
+    df_bd = create_bangladesh_dataframe()
+    df_bdt = create_bdt_dataframe()
+    return [
+        FigureJob("bd_gdp_trend.html", build_gdp_trend, (df_bd,)),
+        FigureJob("bd_inflation_reserves.html", build_inflation_reserves, (df_bd,)),
+        FigureJob("bd_forex_reserves.html", build_forex_reserves, (df_bd,)),
+        FigureJob("bd_debt_trend.html", build_debt_trend, (df_bd,)),
+        FigureJob("bdt_exchange_rate_trend.html", build_bdt_devaluation, (df_bdt,)),
+        FigureJob("bd_commodities.html", build_bd_commodities, (create_bd_commodities_dataframe(), df_bdt)),
+        FigureJob("bd_remittances.html", build_remittances, (create_remittances_dataframe(),)),
+        FigureJob("bd_trade_balance.html", build_trade_balance, (create_trade_dataframe(),)),
+    ]
+
+def analyze_bangladesh_data(max_workers=None, force=False):
+    """Generate Bangladesh specific interactive visualizations using Plotly."""
+
+    check_output_dir()
+
+    print("Generating interactive Bangladesh plots...")
+    with stage('load', script='bangladesh_analysis'):
+        jobs = bangladesh_figure_jobs()
+    results = render_jobs(jobs, max_workers=max_workers, force=force)
 
     print("Done generating interactive Bangladesh plots.")
+    return results
 
 if __name__ == "__main__":
-    analyze_bangladesh_data()
+    args = build_arg_parser("Build the Bangladesh dashboard figures.").parse_args()
+    analyze_bangladesh_data(max_workers=args.workers, force=args.force)
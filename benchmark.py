@@ -0,0 +1,312 @@
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import tempfile
+import platform
+import subprocess
+from collections import namedtuple
+from datetime import datetime, timezone
+
+import numpy as np
+import pandas as pd
+
+# Synthetic dataset sizes, from today's hand-entered tables up to the full IMF panel
+BenchSize = namedtuple('BenchSize', ['countries', 'years', 'indicators'])
+SIZES = {
+    'current': BenchSize(11, 13, 4),
+    'small': BenchSize(50, 20, 5),
+    'medium': BenchSize(100, 40, 10),
+    'large': BenchSize(200, 60, 20),
+}
+STAGES = [
+    'process_data',
+    'create_visualizations',
+    'create_oic_visualizations',
+    'analyze_bangladesh_data',
+    'analyze_financial_history',
+]
+RESULTS_FILE = os.path.join('benchmarks', 'results.jsonl')
+REGRESSION_THRESHOLD = 0.2  # flag stages >20% slower or larger than the previous commit
+LAST_YEAR = 2025
+IMF_INDICATORS = ['GGXWDG_NGDP', 'NGDPD', 'NGDP_RPCH', 'PCPIPCH']
+
+REPO_DIR = os.path.dirname(os.path.abspath(__file__))
+
+def synthetic_countries(n):
+    """n (ISO-3 code, name) pairs: real countries first so maps resolve, then placeholders."""
+    import plotly.express as px
+    real = px.data.gapminder()[['iso_alpha', 'country']].drop_duplicates().values.tolist()
+    pairs = [tuple(p) for p in real[:n]]
+    pairs += [(f"X{i:02d}", f"Country {i}") for i in range(len(pairs), n)]
+    return pairs
+
+def synthetic_indicators(k):
+    return (IMF_INDICATORS + [f"SYN_{i:02d}" for i in range(len(IMF_INDICATORS), k)])[:k]
+
+def write_imf_payload(directory, size, rng):
+    """Datamapper-style payload with size.countries x size.years x size.indicators values."""
+    countries = synthetic_countries(size.countries)
+    years = [str(y) for y in range(LAST_YEAR - size.years + 1, LAST_YEAR + 1)]
+    values = {
+        indicator: {
+            code: dict(zip(years, np.round(rng.uniform(1, 260, len(years)), 1).tolist()))
+            for code, _ in countries
+        }
+        for indicator in synthetic_indicators(size.indicators)
+    }
+    with open(os.path.join(directory, 'imf_debt_data.json'), 'w', encoding='utf-8') as f:
+        json.dump({'values': values, 'api': {'version': 'synthetic'}}, f)
+    with open(os.path.join(directory, 'imf_countries.json'), 'w', encoding='utf-8') as f:
+        json.dump({'countries': {code: {'label': name} for code, name in countries}}, f)
+
+def synthetic_store(size, rng):
+    """Long-format store rows: the built-in series stretched to size.years, plus an IMF panel."""
+    import data_store
+    import gdp_debt_analysis
+    import bangladesh_analysis
+    import financial_history_analysis
+
+    with data_store.store_disabled():
+        seed = pd.concat(
+            gdp_debt_analysis.store_records()
+            + bangladesh_analysis.store_records()
+            + financial_history_analysis.store_records(),
+            ignore_index=True,
+        )
+
+    frames = []
+    for (source, indicator, code), group in seed.groupby(['source', 'indicator', 'country_code']):
+        if len(group) < 2:
+            frames.append(group)
+            continue
+        group = group.sort_values('year')
+        years = np.arange(group['year'].max() - size.years + 1, group['year'].max() + 1)
+        values = np.interp(years, group['year'], group['value']) * rng.normal(1, 0.02, len(years))
+        frames.append(pd.DataFrame({
+            'source': source, 'indicator': indicator, 'country_code': code,
+            'country': group['country'].iloc[0], 'year': years, 'value': values,
+        }))
+
+    countries = synthetic_countries(size.countries)
+    for indicator in synthetic_indicators(size.indicators):
+        for year in range(LAST_YEAR - size.years + 1, LAST_YEAR + 1):
+            frames.append(pd.DataFrame({
+                'source': 'imf', 'indicator': indicator,
+                'country_code': [code for code, _ in countries],
+                'country': [name for _, name in countries],
+                'year': year, 'value': rng.uniform(1, 260, len(countries)),
+            }))
+    return pd.concat(frames, ignore_index=True)
+
+def synthetic_overview(size, rng):
+    """Cross-section in the layout of create_dataframe() / create_oic_dataframe()."""
+    from debt_categories import debt_category
+    names = [name for _, name in synthetic_countries(size.countries)]
+    gdp = np.round(rng.lognormal(6, 1.5, len(names)))
+    ratio = np.round(rng.uniform(2, 260, len(names)), 1)
+    df = pd.DataFrame({
+        'Country': names,
+        'GDP (USD) Billion': gdp,
+        'Total Debt (USD) Billion': np.round(gdp * ratio / 100),
+        'Debt-to-GDP Ratio (%)': ratio,
+    })
+    df['Debt Category'] = debt_category(df['Debt-to-GDP Ratio (%)'])
+    return df
+
+def prepare_workdir(directory, size, seed=0):
+    """Write the synthetic IMF payload and data store a stage runs against."""
+    import data_store
+    rng = np.random.default_rng(seed)
+    write_imf_payload(directory, size, rng)
+    data_store.write_store(synthetic_store(size, rng), os.path.join(directory, data_store.STORE_PATH))
+
+def _peak_rss_mb():
+    """Peak resident set size of this process and its finished children (render workers)."""
+    import resource
+    usage = max(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+                resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss)
+    # ru_maxrss is in bytes on macOS and kilobytes elsewhere
+    return usage / (1024 * 1024) if sys.platform == 'darwin' else usage / 1024
+
+def _output_sizes(paths):
+    return {os.path.basename(p): os.path.getsize(p) for p in paths if os.path.exists(p)}
+
+def run_stage(stage, size_name, workers=None):
+    """Run one stage in the current directory and return its measurements."""
+    size = SIZES[size_name]
+    rng = np.random.default_rng(1)
+    figures = {}
+
+    if stage == 'process_data':
+        import process_imf_data
+        start = time.perf_counter()
+        process_imf_data.process_data()
+        wall = time.perf_counter() - start
+        outputs = _output_sizes([process_imf_data.OUTPUT_CSV, os.path.join('data', 'economic_data.parquet')])
+    else:
+        import gdp_debt_analysis
+        import bangladesh_analysis
+        import financial_history_analysis
+        runners = {
+            'create_visualizations': (gdp_debt_analysis.create_visualizations, (synthetic_overview(size, rng),)),
+            'create_oic_visualizations': (gdp_debt_analysis.create_oic_visualizations, (synthetic_overview(size, rng),)),
+            'analyze_bangladesh_data': (bangladesh_analysis.analyze_bangladesh_data, ()),
+            'analyze_financial_history': (financial_history_analysis.analyze_financial_history, ()),
+        }
+        function, stage_args = runners[stage]
+        start = time.perf_counter()
+        results = function(*stage_args, max_workers=workers, force=True)
+        wall = time.perf_counter() - start
+        from plot_utils import OUTPUT_DIR
+        for result in results:
+            path = os.path.join(OUTPUT_DIR, result.filename)
+            figures[result.filename] = {
+                'seconds': round(result.seconds, 4),
+                'bytes': os.path.getsize(path) if os.path.exists(path) else None,
+                'json_saved': result.saved,
+                'error': result.error is not None,
+            }
+        outputs = {name: info['bytes'] or 0 for name, info in figures.items()}
+
+    return {
+        'stage': stage,
+        'size': size_name,
+        'countries': size.countries,
+        'years': size.years,
+        'indicators': size.indicators,
+        'wall_seconds': round(wall, 4),
+        'peak_rss_mb': round(_peak_rss_mb(), 1),
+        'output_bytes': sum(outputs.values()),
+        'outputs': outputs,
+        'figures': figures,
+    }
+
+def git_commit():
+    try:
+        out = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=REPO_DIR,
+                             capture_output=True, text=True, check=True)
+        dirty = subprocess.run(['git', 'status', '--porcelain', '--untracked-files=no'], cwd=REPO_DIR,
+                               capture_output=True, text=True).stdout.strip()
+        return out.stdout.strip() + ('-dirty' if dirty else '')
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def run_benchmarks(stages=STAGES, sizes=SIZES, workers=None, repeat=1):
+    """Run every stage x size in a fresh subprocess and scratch directory, offline."""
+    import plotly
+    environment = {
+        'commit': git_commit(),
+        'timestamp': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'pandas': pd.__version__,
+        'plotly': plotly.__version__,
+        'machine': platform.machine(),
+        'cpus': os.cpu_count(),
+        'workers': workers,
+    }
+    records = []
+    for size_name in sizes:
+        with tempfile.TemporaryDirectory(prefix=f'bench-{size_name}-') as root:
+            print(f"Preparing synthetic '{size_name}' dataset {tuple(SIZES[size_name])}...")
+            template = os.path.join(root, 'template')
+            os.makedirs(template)
+            prepare_workdir(template, SIZES[size_name])
+            for stage in stages:
+                for attempt in range(repeat):
+                    # Every run starts from an untouched copy, without a build manifest
+                    workdir = os.path.join(root, f'{stage}-{attempt}')
+                    shutil.copytree(template, workdir)
+                    cmd = [sys.executable, os.path.abspath(__file__), 'stage', stage, size_name]
+                    if workers is not None:
+                        cmd += ['--workers', str(workers)]
+                    proc = subprocess.run(cmd, cwd=workdir, capture_output=True, text=True,
+                                          env=dict(os.environ, USE_DATA_STORE='1'))
+                    if proc.returncode != 0:
+                        print(f"  {stage:28s} {size_name:8s} FAILED\n{proc.stderr}")
+                        continue
+                    record = dict(environment, **json.loads(proc.stdout.strip().splitlines()[-1]))
+                    records.append(record)
+                    print(f"  {stage:28s} {size_name:8s} {record['wall_seconds']:8.2f}s "
+                          f"{record['peak_rss_mb']:8.1f} MB {record['output_bytes'] / 1024:10.1f} KiB")
+    return records
+
+def save_results(records, path=RESULTS_FILE):
+    """Append benchmark records to the JSON-lines results file."""
+    directory = os.path.dirname(path)
+    if directory and not os.path.exists(directory):
+        os.makedirs(directory)
+    with open(path, 'a', encoding='utf-8') as f:
+        for record in records:
+            f.write(json.dumps(record, sort_keys=True) + '\n')
+    print(f"Saved {len(records)} results to {path}")
+
+def load_results(path=RESULTS_FILE):
+    if not os.path.exists(path):
+        return []
+    with open(path, 'r', encoding='utf-8') as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+def compare_results(records, history, threshold=REGRESSION_THRESHOLD):
+    """Compare records with the most recent earlier commit's results; returns the regressions."""
+    commits = [r['commit'] for r in history if r.get('commit') not in (None, records[0].get('commit'))]
+    if not commits:
+        print("No earlier commit to compare against.")
+        return []
+    baseline_commit = commits[-1]
+    baseline = {}
+    for r in history:
+        if r['commit'] == baseline_commit:
+            # Best of the repeats is the least noisy reference
+            key = (r['stage'], r['size'])
+            best = baseline.get(key)
+            baseline[key] = r if best is None or r['wall_seconds'] < best['wall_seconds'] else best
+
+    regressions = []
+    print(f"Compared with {baseline_commit}:")
+    for r in records:
+        base = baseline.get((r['stage'], r['size']))
+        if base is None:
+            continue
+        for metric in ('wall_seconds', 'peak_rss_mb', 'output_bytes'):
+            if not base[metric]:
+                continue
+            change = r[metric] / base[metric] - 1
+            if change > threshold:
+                regressions.append((r['stage'], r['size'], metric, base[metric], r[metric]))
+                print(f"  REGRESSION {r['stage']} [{r['size']}] {metric}: "
+                      f"{base[metric]} -> {r[metric]} ({change:+.0%})")
+    if not regressions:
+        print("  no regressions")
+    return regressions
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark ingest and figure generation on synthetic data.")
+    sub = parser.add_subparsers(dest='command')
+    run = sub.add_parser('run', help='run the benchmark suite (default)')
+    run.add_argument('--stages', nargs='+', choices=STAGES, default=STAGES)
+    run.add_argument('--sizes', nargs='+', choices=list(SIZES), default=list(SIZES))
+    run.add_argument('--workers', type=int, default=None, help='render processes per stage')
+    run.add_argument('--repeat', type=int, default=1, help='runs per stage and size')
+    run.add_argument('--results', default=RESULTS_FILE, help='JSON-lines file to append results to')
+    run.add_argument('--no-save', action='store_true', help='do not record the results')
+    stage = sub.add_parser('stage', help='run a single stage in the current directory (internal)')
+    stage.add_argument('stage', choices=STAGES)
+    stage.add_argument('size', choices=list(SIZES))
+    stage.add_argument('--workers', type=int, default=None)
+    args = parser.parse_args()
+
+    if args.command == 'stage':
+        # Keep the JSON record on the last stdout line, after the stage's own progress output
+        print(json.dumps(run_stage(args.stage, args.size, args.workers)))
+    else:
+        if args.command is None:
+            args = run.parse_args([])
+        history = load_results(args.results)
+        records = run_benchmarks(args.stages, {s: SIZES[s] for s in args.sizes}, args.workers, args.repeat)
+        if records:
+            compare_results(records, history)
+            if not args.no_save:
+                save_results(records, args.results)
@@ -0,0 +1,123 @@
+import hashlib
+import importlib
+import inspect
+import json
+import os
+
+import pandas as pd
+import plotly
+
+import figure_theme
+import plot_utils
+from geometry import geometry_available
+from large_scatter import scatter_settings
+from plot_utils import OUTPUT_DIR, check_output_dir
+
+MANIFEST_PATH = os.path.join(OUTPUT_DIR, 'manifest.json')
+# Shared figure helpers (themes, compact JSON, delta frames, geometry, scatter
+# modes, page scripts); a change to any of them rebuilds every figure
+HELPER_MODULES = ('figure_theme', 'compact_json', 'delta_frames', 'geometry', 'large_scatter', 'plot_utils',
+                  'countries', 'debt_categories')
+
+def load_manifest(path=MANIFEST_PATH):
+    """Load the {filename: content hash} manifest of the last successful build."""
+    if not os.path.exists(path):
+        return {}
+    try:
+        with open(path, "r", encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        print("Ignoring unreadable build manifest.")
+        return {}
+
+def save_manifest(updates, path=MANIFEST_PATH):
+    """Merge freshly built entries into the manifest, written atomically."""
+    if path == MANIFEST_PATH:
+        check_output_dir()
+    else:
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    manifest = load_manifest(path)
+    manifest.update(updates)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w", encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    os.replace(tmp_path, path)
+
+def _update_with_value(h, value):
+    """Feed a figure input (DataFrame, Series or plain value) into the hash."""
+    if isinstance(value, pd.DataFrame):
+        h.update(repr(list(value.columns)).encode())
+        h.update(repr(list(value.dtypes.astype(str))).encode())
+        h.update(pd.util.hash_pandas_object(value, index=True).values.tobytes())
+    elif isinstance(value, pd.Series):
+        h.update(repr(value.name).encode())
+        h.update(pd.util.hash_pandas_object(value, index=True).values.tobytes())
+    elif isinstance(value, (list, tuple)):
+        h.update(b'[')
+        for item in value:
+            _update_with_value(h, item)
+        h.update(b']')
+    elif isinstance(value, dict):
+        h.update(b'{')
+        for key in sorted(value, key=repr):
+            h.update(repr(key).encode())
+            _update_with_value(h, value[key])
+        h.update(b'}')
+    else:
+        h.update(repr(value).encode())
+
+def _layout_spec(build, seen=None):
+    """Source of the figure builder plus the module-level constants it reads.
+
+    Functions of the builder's own module that it calls (such as _ranking)
+    are followed, so editing them changes the spec too.
+    """
+    seen = set() if seen is None else seen
+    seen.add(build)
+    parts = [inspect.getsource(build)]
+    module_globals = getattr(build, '__globals__', {})
+    for name in build.__code__.co_names:
+        value = module_globals.get(name)
+        if isinstance(value, (dict, list, tuple, str, int, float)):
+            parts.append(f"{name}={value!r}")
+        elif (inspect.isfunction(value) and value.__module__ == build.__module__
+              and value not in seen):
+            parts.append(_layout_spec(value, seen))
+    return "\n".join(parts)
+
+_HELPERS_DIGEST = None
+
+def helpers_digest():
+    """Hash of the shared modules every figure is built and written with, computed once."""
+    global _HELPERS_DIGEST
+    if _HELPERS_DIGEST is None:
+        h = hashlib.sha256()
+        for name in HELPER_MODULES:
+            h.update(inspect.getsource(importlib.import_module(name)).encode())
+        _HELPERS_DIGEST = h.hexdigest()
+    return _HELPERS_DIGEST
+
+def html_output_spec():
+    """Settings that change the written HTML of an otherwise identical figure."""
+    return (f"{plot_utils.PLOTLYJS_MODE}:{plot_utils.FIGURE_JSON_MODE}:{plot_utils.FIGURE_PRECISION}"
+            f":geometry={geometry_available()}")
+
+def job_hash(job, output_spec=None):
+    """Content hash of a figure job's input data, layout spec, helpers, theme and output mode.
+
+    output_spec describes how the figure is written (default: the HTML settings).
+    """
+    h = hashlib.sha256()
+    h.update(job.filename.encode())
+    h.update(_layout_spec(job.build).encode())
+    h.update(helpers_digest().encode())
+    h.update(plotly.__version__.encode())
+    h.update(repr(figure_theme.THEMES).encode())
+    h.update(repr(scatter_settings()).encode())
+    h.update((html_output_spec() if output_spec is None else output_spec).encode())
+    _update_with_value(h, job.args)
+    return h.hexdigest()
+
+def is_up_to_date(manifest, filename, digest, directory=OUTPUT_DIR):
+    """A figure is still valid if its hash matches and the output file exists."""
+    return manifest.get(filename) == digest and os.path.exists(os.path.join(directory, filename))
@@ -0,0 +1,193 @@
+import os
+import sys
+import argparse
+import subprocess
+
+# Single entry point for the ingest, figure, analytics and serve tasks. Only the standard
+# library is imported at startup; each subcommand imports what it needs when it
+# runs, so --help and the data-only ingest never load the plotting stack.
+
+IMPORTTIME_TOP = 15
+
+def _render_args(parser):
+    parser.add_argument('--force', action='store_true',
+                        help='rebuild every figure even if its inputs are unchanged')
+    parser.add_argument('--workers', type=int, default=None,
+                        help='number of render processes (default: one per CPU)')
+
+def cmd_ingest(args):
+    if args.watch:
+        from process_imf_data import watch_data
+        watch_data(timeout=args.timeout)
+    elif args.no_download:
+        from process_imf_data import process_data
+        process_data()
+    else:
+        from imf_pipeline import run_pipeline
+        from download_imf import MAX_WORKERS
+        run_pipeline(base_url=args.base_url, max_workers=args.download_workers or MAX_WORKERS,
+                     force=args.force)
+
+def cmd_build_global(args):
+    import gdp_debt_analysis as gda
+    from plot_utils import check_output_dir
+    from render_scheduler import render_jobs
+    check_output_dir()
+    jobs = (gda.global_figure_jobs(gda.create_dataframe())
+            + gda.inflation_figure_jobs()
+            + gda.commodities_figure_jobs())
+    return render_jobs(jobs, max_workers=args.workers, force=args.force)
+
+def cmd_build_oic(args):
+    import gdp_debt_analysis as gda
+    return gda.create_oic_visualizations(gda.create_oic_dataframe(), max_workers=args.workers, force=args.force)
+
+def cmd_build_bd(args):
+    from bangladesh_analysis import analyze_bangladesh_data
+    return analyze_bangladesh_data(max_workers=args.workers, force=args.force)
+
+def cmd_build_history(args):
+    from financial_history_analysis import analyze_financial_history
+    return analyze_financial_history(max_workers=args.workers, force=args.force)
+
+def cmd_bundle(args):
+    from dashboard_bundler import BUNDLE_DIR, bundle_dashboards
+    return bundle_dashboards(bundle_dir=args.out or BUNDLE_DIR, max_workers=args.workers)
+
+def cmd_images(args):
+    from dashboard_bundler import dashboard_figure_jobs
+    from image_export import IMAGE_DIR, export_images
+    jobs = dashboard_figure_jobs()
+    selected = [jobs[name] for name in args.figures] if args.figures else list(jobs.values())
+    kwargs = dict(image_dir=args.out or IMAGE_DIR, max_workers=args.workers, force=args.force)
+    if args.formats:
+        kwargs['formats'] = args.formats.split(',')
+    if args.sizes:
+        kwargs['sizes'] = args.sizes.split(',')
+    if args.tabs:
+        kwargs['tabs'] = args.tabs
+    return export_images(selected, **kwargs)
+
+def cmd_correlate(args):
+    from correlation import report
+    from data_store import load_panel
+    report(load_panel(args.source), args.x, args.y, args.method, args.window, args.max_lag,
+           args.replicates, args.workers)
+
+def cmd_simulate(args):
+    from debt_dynamics import run
+    from data_store import load_panel
+    return run(load_panel(args.source), args.horizon, args.paths, args.seed, args.workers, args.force)
+
+def cmd_serve(args):
+    from dashboard_server import CACHE_SIZE, serve
+    serve(args.host, args.port, args.cache_size or CACHE_SIZE)
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="GDP vs Debt analysis tasks.")
+    parser.add_argument('--import-time', action='store_true',
+                        help='report module import times (runs the command under -X importtime)')
+    sub = parser.add_subparsers(dest='command', metavar='command')
+    sub.required = True
+
+    ingest = sub.add_parser('ingest', help='download and process IMF data into the CSV and data store')
+    ingest.add_argument('--base-url', default=None, help='datamapper API root (default: IMF_API_URL)')
+    ingest.add_argument('--download-workers', type=int, default=None, help='concurrent downloads')
+    ingest.add_argument('--force', action='store_true', help='reprocess even if nothing was modified')
+    ingest.add_argument('--no-download', action='store_true', help='only process the files already on disk')
+    ingest.add_argument('--watch', action='store_true', help='reprocess whenever the debt payload is replaced')
+    ingest.add_argument('--timeout', type=float, default=None, help='with --watch, stop after this many idle seconds')
+    ingest.set_defaults(handler=cmd_ingest)
+
+    for name, handler, help_text in (
+        ('build-global', cmd_build_global, 'global overview, inflation and commodity figures'),
+        ('build-oic', cmd_build_oic, 'OIC dashboard figures'),
+        ('build-bd', cmd_build_bd, 'Bangladesh dashboard figures'),
+        ('build-history', cmd_build_history, 'financial history figures'),
+    ):
+        command = sub.add_parser(name, help=help_text)
+        _render_args(command)
+        command.set_defaults(handler=handler)
+
+    bundle = sub.add_parser('bundle', help='single-page dashboards with lazily rendered charts')
+    bundle.add_argument('--out', default=None, help='output directory (default: site)')
+    bundle.add_argument('--workers', type=int, default=None, help='figure build processes (default: one per CPU)')
+    bundle.set_defaults(handler=cmd_bundle)
+
+    images = sub.add_parser('images', help='export the figures as PNG/SVG/WebP with one warm renderer')
+    images.add_argument('figures', nargs='*', help='figure files to export (default: all), e.g. oic_scatter.html')
+    images.add_argument('--formats', default=None, help='comma-separated png,svg,webp (default: IMAGE_FORMATS or png)')
+    images.add_argument('--sizes', default=None, help='comma-separated default,thumbnail,retina (default: IMAGE_SIZES)')
+    images.add_argument('--out', default=None, help='output directory (default: images)')
+    images.add_argument('--tabs', type=int, default=None, help='renderer tabs (default: IMAGE_RENDER_TABS or 4)')
+    _render_args(images)
+    images.set_defaults(handler=cmd_images)
+
+    correlate = sub.add_parser('correlate', help='pooled, regional, lagged and rolling indicator correlations')
+    correlate.add_argument('--source', default='imf', help='data store source (default: imf)')
+    correlate.add_argument('--x', default='GGXWDG_NGDP', help='first indicator (default: GGXWDG_NGDP)')
+    correlate.add_argument('--y', default='NGDP_RPCH', help='second indicator (default: NGDP_RPCH)')
+    correlate.add_argument('--method', choices=('pearson', 'spearman'), default='pearson')
+    correlate.add_argument('--window', type=int, default=10, help='rolling window in years')
+    correlate.add_argument('--max-lag', type=int, default=5, help='largest lead/lag in years')
+    correlate.add_argument('--replicates', type=int, default=1000, help='bootstrap replicates (0 to skip)')
+    correlate.add_argument('--workers', type=int, default=None, help='bootstrap processes (default: one per CPU)')
+    correlate.set_defaults(handler=cmd_correlate)
+
+    simulate = sub.add_parser('simulate', help='Monte Carlo debt-dynamics fan charts and threshold probabilities')
+    simulate.add_argument('--source', default='imf', help='data store source (default: imf)')
+    simulate.add_argument('--horizon', type=int, default=10, help='years to project')
+    simulate.add_argument('--paths', type=int, default=10000, help='stochastic paths per country')
+    simulate.add_argument('--seed', type=int, default=0)
+    simulate.add_argument('--workers', type=int, default=None, help='simulation processes (default: one per CPU)')
+    simulate.add_argument('--force', action='store_true', help='rewrite the figures even if unchanged')
+    simulate.set_defaults(handler=cmd_simulate)
+
+    serve = sub.add_parser('serve', help='serve the dashboards, building figures on request')
+    serve.add_argument('--host', default='127.0.0.1')
+    serve.add_argument('--port', type=int, default=8000)
+    serve.add_argument('--cache-size', type=int, default=None, help='figure pages kept in memory (default: 64)')
+    serve.set_defaults(handler=cmd_serve)
+    return parser
+
+def parse_importtime(lines):
+    """(cumulative_us, self_us, module, depth) rows from `-X importtime` stderr lines."""
+    rows = []
+    for line in lines:
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|', 2)
+        depth = (len(name) - len(name.lstrip())) // 2
+        rows.append((int(cumulative_us), int(self_us), name.strip(), depth))
+    return rows
+
+def report_import_time(argv):
+    """Re-run the command under -X importtime and summarise the slowest top-level imports."""
+    cmd = [sys.executable, '-X', 'importtime', os.path.abspath(__file__), *argv]
+    proc = subprocess.Popen(cmd, stderr=subprocess.PIPE, text=True)
+    timing = []
+    for line in proc.stderr:
+        if line.startswith('import time:'):
+            timing.append(line)
+        else:
+            sys.stderr.write(line)
+    proc.wait()
+
+    rows = parse_importtime(timing)
+    top_level = [row for row in rows if row[3] == 0]
+    total = sum(row[0] for row in top_level)
+    print(f"\nImport time: {total / 1e6:.3f}s across {len(rows)} modules", file=sys.stderr)
+    for cumulative_us, self_us, name, _ in sorted(top_level, reverse=True)[:IMPORTTIME_TOP]:
+        print(f"  {cumulative_us / 1e3:9.1f} ms  {name}", file=sys.stderr)
+    return proc.returncode
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    args = build_parser().parse_args(argv)
+    if args.import_time:
+        return report_import_time([a for a in argv if a != '--import-time'])
+    args.handler(args)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
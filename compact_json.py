@@ -0,0 +1,157 @@
+import base64
+from collections import namedtuple
+
+import numpy as np
+import plotly.io as pio
+
+# Compact figure JSON: numeric trace arrays as plotly.js typed-array specs
+# ({"dtype", "bdata", "shape"}), floats rounded to a fixed number of decimals
+# (coordinates stored as float32 where that keeps them), and the layout
+# template pruned to what the figure's traces can use.
+DEFAULT_PRECISION = 6
+
+FigureSize = namedtuple('FigureSize', ['plain', 'compact'])
+
+# Trace attributes that hold data arrays; plotly keeps lists given here as JSON lists
+DATA_ARRAY_KEYS = {
+    'x', 'y', 'z', 'lat', 'lon', 'values', 'r', 'theta', 'a', 'b', 'c',
+    'open', 'high', 'low', 'close', 'base', 'customdata',
+}
+NESTED_DATA_ARRAY_KEYS = {'marker': {'color', 'size', 'opacity'}, 'error_x': {'array', 'arrayminus'},
+                          'error_y': {'array', 'arrayminus'}}
+
+# Data arrays plotly.js formats through an axis for hover and ticks, so float32
+# storage noise (42.03 read back as 42.029998779) never shows; customdata, marker
+# colors and pie values are printed as they are and stay float64
+FLOAT32_KEYS = {'x', 'y', 'z', 'lat', 'lon'}
+
+# Trace keys whose value equals the plotly.js default
+DEFAULT_TRACE_VALUES = {'xaxis': 'x', 'yaxis': 'y', 'geo': 'geo', 'legendgroup': ''}
+
+# Template layout sections only used by these trace types
+SUBPLOT_TRACE_TYPES = {
+    'geo': {'choropleth', 'scattergeo'},
+    'mapbox': {'scattermapbox', 'choroplethmapbox', 'densitymapbox'},
+    'map': {'scattermap', 'choroplethmap', 'densitymap'},
+    'polar': {'scatterpolar', 'scatterpolargl', 'barpolar'},
+    'ternary': {'scatterternary'},
+    'smith': {'scattersmith'},
+    'scene': {'scatter3d', 'surface', 'mesh3d', 'cone', 'streamtube', 'volume', 'isosurface'},
+}
+
+INTEGER_TYPES = [
+    (np.int8, 'i1'), (np.uint8, 'u1'), (np.int16, 'i2'), (np.uint16, 'u2'), (np.int32, 'i4'), (np.uint32, 'u4'),
+]
+DTYPE_CODES = {code for _, code in INTEGER_TYPES} | {'f4', 'f8'}
+
+def typed_array(values, precision=DEFAULT_PRECISION, single=False):
+    """plotly.js typed-array spec for a numeric array, or None if it is not numeric.
+
+    Floats are rounded to precision decimals; arrays that are then whole numbers
+    use the smallest integer dtype that holds them exactly. With single, the
+    others use float32 when every rounded value reads back the same at that
+    precision.
+    """
+    arr = np.asarray(values)
+    if arr.size == 0 or arr.dtype.kind not in 'iuf':
+        return None
+    if arr.dtype.kind == 'f':
+        if precision is not None:
+            arr = np.round(arr, precision)
+        if np.isfinite(arr).all() and (arr % 1 == 0).all():
+            arr = arr.astype(np.int64)
+        else:
+            arr = arr.astype(np.float64)
+            # Rounded values that survive a float32 round trip only need half the bytes
+            if single and precision is not None:
+                with np.errstate(over='ignore'):
+                    narrow = arr.astype(np.float32)
+                if np.array_equal(np.round(narrow.astype(np.float64), precision), arr, equal_nan=True):
+                    arr = narrow
+    if arr.dtype.kind in 'iu':
+        low, high = arr.min(), arr.max()
+        for dtype, code in INTEGER_TYPES:
+            info = np.iinfo(dtype)
+            if info.min <= low and high <= info.max:
+                arr = arr.astype(dtype)
+                break
+        else:
+            return None  # 64-bit integers are not supported by plotly.js
+    else:
+        code = 'f4' if arr.dtype == np.float32 else 'f8'
+
+    spec = {'dtype': code, 'bdata': base64.b64encode(np.ascontiguousarray(arr)).decode('ascii')}
+    if arr.ndim > 1:
+        spec['shape'] = str(arr.shape)[1:-1]
+    return spec
+
+def _is_numeric_list(value):
+    return (isinstance(value, (list, tuple)) and len(value) > 0
+            and all(isinstance(v, (int, float)) and not isinstance(v, bool) for v in value))
+
+def _is_typed_array(value):
+    return isinstance(value, dict) and set(value) <= {'dtype', 'bdata', 'shape'} and 'bdata' in value
+
+def decode_typed_array(spec):
+    """numpy array of a typed-array spec."""
+    arr = np.frombuffer(base64.b64decode(spec['bdata']), dtype=np.dtype(spec['dtype']).newbyteorder('<'))
+    if spec.get('shape'):
+        arr = arr.reshape([int(n) for n in str(spec['shape']).split(',')])
+    return arr
+
+def _compact_array(value, precision, single=False):
+    if _is_typed_array(value) and value.get('dtype') in DTYPE_CODES:
+        # Already encoded by plotly (Figure.to_dict() does this for numpy data), at full precision
+        value = decode_typed_array(value)
+    # Anything else (strings, dates) is left for plotly's own JSON encoder
+    if isinstance(value, np.ndarray) or _is_numeric_list(value):
+        spec = typed_array(value, precision, single)
+        if spec is not None:
+            return spec
+    return value
+
+def compact_trace(trace, precision=DEFAULT_PRECISION):
+    """Trace dict with data arrays encoded and default-valued keys removed."""
+    compact = {}
+    for key, value in trace.items():
+        if isinstance(value, str) and DEFAULT_TRACE_VALUES.get(key) == value:
+            continue
+        if key in DATA_ARRAY_KEYS:
+            value = _compact_array(value, precision, key in FLOAT32_KEYS)
+        elif key in NESTED_DATA_ARRAY_KEYS and isinstance(value, dict):
+            value = {k: _compact_array(v, precision) if k in NESTED_DATA_ARRAY_KEYS[key] else v
+                     for k, v in value.items()}
+        elif isinstance(value, np.ndarray):
+            # plotly only keeps numpy arrays in data-array attributes
+            value = _compact_array(value, precision)
+        compact[key] = value
+    return compact
+
+def prune_template(template, trace_types):
+    """Keep only the template defaults the figure's trace types can use."""
+    template = dict(template)
+    if 'data' in template:
+        template['data'] = {t: v for t, v in template['data'].items() if t in trace_types}
+    if 'layout' in template:
+        template['layout'] = {k: v for k, v in template['layout'].items()
+                              if k not in SUBPLOT_TRACE_TYPES or SUBPLOT_TRACE_TYPES[k] & trace_types}
+    return template
+
+def compact_figure(fig, precision=DEFAULT_PRECISION):
+    """Compact {data, layout} dict of a plotly figure (or figure dict)."""
+    fig_dict = fig if isinstance(fig, dict) else fig.to_dict()
+    data = [compact_trace(trace, precision) for trace in fig_dict.get('data', [])]
+    layout = dict(fig_dict.get('layout', {}))
+    if 'template' in layout:
+        layout['template'] = prune_template(layout['template'], {t.get('type', 'scatter') for t in data})
+    compact = {'data': data, 'layout': layout}
+    if fig_dict.get('frames'):
+        compact['frames'] = [dict(frame, data=[compact_trace(t, precision) for t in frame.get('data', [])])
+                             for frame in fig_dict['frames']]
+    return compact
+
+def compact_figure_json(fig, precision=DEFAULT_PRECISION):
+    """(compact JSON string, FigureSize) comparing it with plotly's own serialization."""
+    plain = pio.to_json(fig, validate=False)
+    compact = pio.to_json(compact_figure(fig, precision), validate=False)
+    return compact, FigureSize(len(plain), len(compact))
@@ -0,0 +1,241 @@
+import os
+import math
+import argparse
+import time
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from statistics import NormalDist
+
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+
+from panel import REGIONS
+
+# Correlations between panel indicators (country x year matrices). Every
+# statistic is pairwise complete: a country-year counts only if both indicators
+# are present. Work is vectorized along the last axis, so one call covers every
+# country, window, lag or bootstrap replicate at once.
+METHODS = ('pearson', 'spearman')
+MIN_PERIODS = 3
+BOOTSTRAP_REPLICATES = 1000
+BOOTSTRAP_BLOCK = 100  # replicates per worker task
+ALPHA = 0.05
+
+Correlation = namedtuple('Correlation', ['r', 'n', 'p_value'])
+BootstrapResult = namedtuple('BootstrapResult', ['r', 'low', 'high', 'replicates'])
+
+def _check_method(method):
+    if method not in METHODS:
+        raise ValueError(f"Unknown correlation method '{method}', expected one of {METHODS}")
+
+def _rank(a):
+    """Average ranks along the last axis, ties averaged and NaNs kept."""
+    flat = a.reshape(-1, a.shape[-1])
+    return pd.DataFrame(flat).rank(axis=1).to_numpy().reshape(a.shape)
+
+def _correlate(x, y, method='pearson', min_periods=MIN_PERIODS):
+    """(r, n) along the last axis over the positions where both x and y are present."""
+    _check_method(method)
+    mask = ~(np.isnan(x) | np.isnan(y))
+    x, y = np.where(mask, x, np.nan), np.where(mask, y, np.nan)
+    if method == 'spearman':
+        x, y = _rank(x), _rank(y)
+    n = mask.sum(axis=-1)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        dx = np.where(mask, x - np.nanmean(x, axis=-1, keepdims=True), 0.0)
+        dy = np.where(mask, y - np.nanmean(y, axis=-1, keepdims=True), 0.0)
+        r = (dx * dy).sum(axis=-1) / np.sqrt((dx * dx).sum(axis=-1) * (dy * dy).sum(axis=-1))
+    return np.where(n >= min_periods, r, np.nan), n
+
+_erfc = np.vectorize(math.erfc, otypes=[float])
+
+def p_value(r, n):
+    """Two-sided p-value of r against zero (Fisher z, normal approximation)."""
+    r, n = np.asarray(r, dtype=float), np.asarray(n, dtype=float)
+    with np.errstate(invalid='ignore'):
+        z = np.abs(np.arctanh(np.clip(r, -0.999999, 0.999999))) * np.sqrt(np.maximum(n - 3, 0))
+    p = np.where(n > 3, _erfc(z / math.sqrt(2)), np.nan)
+    return p if p.ndim else float(p)
+
+def pooled(panel, x, y, method='pearson', countries=None, years=None):
+    """Correlation over every country-year of the panel (optionally a subset)."""
+    if countries is not None or years is not None:
+        panel = panel.select(countries=countries, years=years)
+    r, n = _correlate(panel.matrix(x).ravel(), panel.matrix(y).ravel(), method)
+    return Correlation(float(r), int(n), float(p_value(r, n)))
+
+def by_country(panel, x, y, method='pearson', min_periods=MIN_PERIODS):
+    """Time-series correlation within each country; DataFrame indexed by country code."""
+    r, n = _correlate(panel.matrix(x), panel.matrix(y), method, min_periods)
+    return pd.DataFrame({'r': r, 'n': n, 'p_value': p_value(r, n)}, index=pd.Index(panel.countries, name='country_code'))
+
+def by_region(panel, x, y, method='pearson', regions=REGIONS):
+    """Pooled correlation over the members of each region; DataFrame indexed by region."""
+    rows = {}
+    for name, members in regions.items():
+        present = [c for c in members if panel.covers([c])]
+        rows[name] = pooled(panel, x, y, method, countries=present) if present else Correlation(np.nan, 0, np.nan)
+    return pd.DataFrame.from_dict({k: v._asdict() for k, v in rows.items()}, orient='index').rename_axis('region')
+
+def rolling(panel, x, y, window=10, method='pearson', min_periods=MIN_PERIODS):
+    """Trailing-window correlation per country; country x year DataFrame labelled by window end year."""
+    if window > len(panel.years):
+        raise ValueError(f"Window of {window} years is longer than the panel ({len(panel.years)} years)")
+    wx = sliding_window_view(panel.matrix(x), window, axis=1)
+    wy = sliding_window_view(panel.matrix(y), window, axis=1)
+    r, _ = _correlate(wx, wy, method, min_periods)
+    return pd.DataFrame(r, index=pd.Index(panel.countries, name='country_code'), columns=panel.years[window - 1:])
+
+def _shifted(a, b, lag):
+    """Pair a[t] with b[t + lag] along the year axis."""
+    if lag >= 0:
+        return a[:, :a.shape[1] - lag], b[:, lag:]
+    return a[:, -lag:], b[:, :b.shape[1] + lag]
+
+def lagged(panel, x, y, lags=range(-5, 6), method='pearson'):
+    """Pooled correlation of x in year t with y in year t + lag, for each lag; DataFrame indexed by lag.
+
+    The lags are evaluated in one call by padding each shifted pair to the panel length.
+    """
+    mx, my = panel.matrix(x), panel.matrix(y)
+    size = mx.size
+    xs = np.full((len(lags), size), np.nan)
+    ys = np.full((len(lags), size), np.nan)
+    for i, lag in enumerate(lags):
+        a, b = _shifted(mx, my, lag)
+        xs[i, :a.size], ys[i, :b.size] = a.ravel(), b.ravel()
+    r, n = _correlate(xs, ys, method)
+    return pd.DataFrame({'r': r, 'n': n, 'p_value': p_value(r, n)}, index=pd.Index(list(lags), name='lag'))
+
+def matrix(panel, indicators=None, method='pearson'):
+    """Pooled correlation matrix between indicators; every pair is computed in one blocked call."""
+    indicators = list(indicators or panel.indicators)
+    k = len(indicators)
+    data = np.stack([panel.matrix(i).ravel() for i in indicators])
+    left, right = np.triu_indices(k, 1)
+    r, _ = _correlate(data[left], data[right], method)
+    result = np.eye(k)
+    result[left, right] = result[right, left] = r
+    return pd.DataFrame(result, index=indicators, columns=indicators)
+
+def _weighted_pearson(x, y, weights):
+    """Pearson r of x and y with each observation repeated weights times (one row per replicate)."""
+    total = weights.sum(axis=-1, keepdims=True)
+    dx = x - (weights * x).sum(axis=-1, keepdims=True) / total
+    dy = y - (weights * y).sum(axis=-1, keepdims=True) / total
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return (weights * dx * dy).sum(axis=-1) / np.sqrt(
+            (weights * dx * dx).sum(axis=-1) * (weights * dy * dy).sum(axis=-1))
+
+def _weighted_ranks(values, weights):
+    """Average ranks of values in each replicate where observation i appears weights[:, i] times.
+
+    One sort serves every replicate: an observation's rank is the weight of all
+    smaller values plus the midpoint of its tie group's weight.
+    """
+    order = np.argsort(values, kind='stable')
+    ordered = values[order]
+    first = np.r_[True, ordered[1:] != ordered[:-1]]
+    starts = np.flatnonzero(first)
+    ends = np.r_[starts[1:], len(ordered)]
+    group = np.cumsum(first) - 1
+
+    cumulative = np.zeros((weights.shape[0], len(values) + 1))
+    np.cumsum(weights[:, order], axis=-1, out=cumulative[:, 1:])
+    below = cumulative[:, starts[group]]
+    tied = cumulative[:, ends[group]] - below
+    ranks = np.empty_like(below)
+    ranks[:, order] = below + (tied + 1) / 2
+    return ranks
+
+def _bootstrap_block(rows, x, y, countries, method, replicates, seed):
+    """Pooled correlations for replicates resampling countries with replacement.
+
+    rows gives each complete observation's country; a replicate weights every
+    observation by how often its country was drawn.
+    """
+    rng = np.random.default_rng(seed)
+    draws = rng.multinomial(countries, np.full(countries, 1 / countries), size=replicates)
+    weights = draws[:, rows].astype(float)
+    if method == 'spearman':
+        x, y = _weighted_ranks(x, weights), _weighted_ranks(y, weights)
+    return _weighted_pearson(x, y, weights)
+
+def bootstrap(panel, x, y, method='pearson', replicates=BOOTSTRAP_REPLICATES, alpha=ALPHA,
+              seed=0, max_workers=None):
+    """Percentile confidence interval of the pooled correlation.
+
+    Countries are resampled with replacement (a cluster bootstrap), which keeps
+    each country's years together. Blocks of replicates run in a process pool.
+    """
+    _check_method(method)
+    mx, my = panel.matrix(x), panel.matrix(y)
+    complete = ~(np.isnan(mx) | np.isnan(my))
+    rows = np.nonzero(complete)[0]
+    args = (rows, mx[complete], my[complete], mx.shape[0], method)
+
+    blocks = [min(BOOTSTRAP_BLOCK, replicates - start) for start in range(0, replicates, BOOTSTRAP_BLOCK)]
+    seeds = np.random.SeedSequence(seed).spawn(len(blocks))
+    max_workers = max_workers or os.cpu_count() or 1
+    if max_workers == 1 or len(blocks) == 1:
+        results = [_bootstrap_block(*args, size, s) for size, s in zip(blocks, seeds)]
+    else:
+        with ProcessPoolExecutor(max_workers=min(max_workers, len(blocks))) as executor:
+            futures = [executor.submit(_bootstrap_block, *args, size, s) for size, s in zip(blocks, seeds)]
+            results = [future.result() for future in futures]
+    draws = np.concatenate(results)
+    draws = draws[~np.isnan(draws)]
+    low, high = np.quantile(draws, [alpha / 2, 1 - alpha / 2]) if draws.size else (np.nan, np.nan)
+    return BootstrapResult(pooled(panel, x, y, method).r, float(low), float(high), int(draws.size))
+
+def fisher_interval(r, n, alpha=ALPHA):
+    """Analytic (Fisher z) confidence interval for a correlation."""
+    if n <= 3:
+        return float('nan'), float('nan')
+    z = math.atanh(max(min(r, 0.999999), -0.999999))
+    half = NormalDist().inv_cdf(1 - alpha / 2) / math.sqrt(n - 3)
+    return math.tanh(z - half), math.tanh(z + half)
+
+def report(panel, x, y, method='pearson', window=10, max_lag=5, replicates=BOOTSTRAP_REPLICATES,
+           max_workers=None):
+    """Print pooled, regional, lagged and rolling correlations with a bootstrap interval."""
+    start = time.perf_counter()
+    overall = pooled(panel, x, y, method)
+    low, high = fisher_interval(overall.r, overall.n)
+    print(f"{method.title()} correlation of {x} and {y}: {panel}")
+    print(f"  pooled r={overall.r:.3f} (n={overall.n}, p={overall.p_value:.3g}, Fisher 95% CI {low:.3f}..{high:.3f})")
+    if replicates:
+        boot = bootstrap(panel, x, y, method, replicates, max_workers=max_workers)
+        print(f"  bootstrap 95% CI {boot.low:.3f}..{boot.high:.3f} ({boot.replicates} country resamples)")
+
+    print("\nBy region:")
+    print(by_region(panel, x, y, method).to_string(float_format=lambda v: f"{v:.3f}"))
+    print(f"\nLagged ({y} leads by lag years):")
+    print(lagged(panel, x, y, range(-max_lag, max_lag + 1), method).to_string(float_format=lambda v: f"{v:.3f}"))
+
+    countries = by_country(panel, x, y, method)
+    print(f"\nWithin-country: median r={countries['r'].median():.3f} over "
+          f"{int(countries['r'].notna().sum())} countries")
+    if window <= len(panel.years):
+        windows = rolling(panel, x, y, window, method)
+        medians = windows.median().dropna()
+        print(f"{window}-year rolling median r by end year: "
+              + ", ".join(f"{year}: {r:.2f}" for year, r in medians.iloc[::-5][::-1].items()))
+    print(f"\nComputed in {time.perf_counter() - start:.2f}s")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Correlation analytics over the IMF panel in the data store.")
+    parser.add_argument('--source', default='imf', help='data store source (default: imf)')
+    parser.add_argument('--x', default='GGXWDG_NGDP', help='first indicator (default: GGXWDG_NGDP)')
+    parser.add_argument('--y', default='NGDP_RPCH', help='second indicator (default: NGDP_RPCH)')
+    parser.add_argument('--method', choices=METHODS, default='pearson')
+    parser.add_argument('--window', type=int, default=10, help='rolling window in years')
+    parser.add_argument('--max-lag', type=int, default=5, help='largest lead/lag in years')
+    parser.add_argument('--replicates', type=int, default=BOOTSTRAP_REPLICATES, help='bootstrap replicates (0 to skip)')
+    parser.add_argument('--workers', type=int, default=None, help='bootstrap processes (default: one per CPU)')
+    args = parser.parse_args()
+
+    from data_store import load_panel
+    report(load_panel(args.source), args.x, args.y, args.method, args.window, args.max_lag,
+           args.replicates, args.workers)
@@ -0,0 +1,227 @@
+import argparse
+import bisect
+import re
+
+import numpy as np
+import pandas as pd
+
+# One identity per country for every dataset. Names, ISO-2, ISO-3 and IMF
+# datamapper codes all resolve to a small integer id (its position in CODES),
+# so sources can be joined on integer keys and no dataset carries its own name
+# map. Lookups normalize the string (accents, punctuation, case, "the",
+# "saint") and hit one dict; strings it misses are retried without an IMF
+# state form (", Republic of") and then fall back to a sorted prefix index,
+# which accepts a prefix only if every alias it starts resolves to the same country.
+
+# ISO-3 -> (ISO-2, name); names follow the IMF / World Bank style the datasets use
+COUNTRIES = {
+    'ABW': ('AW', 'Aruba'), 'AFG': ('AF', 'Afghanistan'), 'AGO': ('AO', 'Angola'), 'ALB': ('AL', 'Albania'),
+    'AND': ('AD', 'Andorra'), 'ARE': ('AE', 'United Arab Emirates'), 'ARG': ('AR', 'Argentina'),
+    'ARM': ('AM', 'Armenia'), 'ATG': ('AG', 'Antigua and Barbuda'), 'AUS': ('AU', 'Australia'),
+    'AUT': ('AT', 'Austria'), 'AZE': ('AZ', 'Azerbaijan'), 'BDI': ('BI', 'Burundi'), 'BEL': ('BE', 'Belgium'),
+    'BEN': ('BJ', 'Benin'), 'BFA': ('BF', 'Burkina Faso'), 'BGD': ('BD', 'Bangladesh'), 'BGR': ('BG', 'Bulgaria'),
+    'BHR': ('BH', 'Bahrain'), 'BHS': ('BS', 'Bahamas'), 'BIH': ('BA', 'Bosnia and Herzegovina'),
+    'BLR': ('BY', 'Belarus'), 'BLZ': ('BZ', 'Belize'), 'BOL': ('BO', 'Bolivia'), 'BRA': ('BR', 'Brazil'),
+    'BRB': ('BB', 'Barbados'), 'BRN': ('BN', 'Brunei'), 'BTN': ('BT', 'Bhutan'), 'BWA': ('BW', 'Botswana'),
+    'CAF': ('CF', 'Central African Republic'), 'CAN': ('CA', 'Canada'), 'CHE': ('CH', 'Switzerland'),
+    'CHL': ('CL', 'Chile'), 'CHN': ('CN', 'China'), 'CIV': ('CI', "Cote d'Ivoire"), 'CMR': ('CM', 'Cameroon'),
+    'COD': ('CD', 'Congo, Dem. Rep.'), 'COG': ('CG', 'Congo, Rep.'), 'COL': ('CO', 'Colombia'),
+    'COM': ('KM', 'Comoros'), 'CPV': ('CV', 'Cabo Verde'), 'CRI': ('CR', 'Costa Rica'), 'CUB': ('CU', 'Cuba'),
+    'CYP': ('CY', 'Cyprus'), 'CZE': ('CZ', 'Czech Republic'), 'DEU': ('DE', 'Germany'), 'DJI': ('DJ', 'Djibouti'),
+    'DMA': ('DM', 'Dominica'), 'DNK': ('DK', 'Denmark'), 'DOM': ('DO', 'Dominican Republic'),
+    'DZA': ('DZ', 'Algeria'), 'ECU': ('EC', 'Ecuador'), 'EGY': ('EG', 'Egypt'), 'ERI': ('ER', 'Eritrea'),
+    'ESP': ('ES', 'Spain'), 'EST': ('EE', 'Estonia'), 'ETH': ('ET', 'Ethiopia'), 'FIN': ('FI', 'Finland'),
+    'FJI': ('FJ', 'Fiji'), 'FRA': ('FR', 'France'), 'FSM': ('FM', 'Micronesia'), 'GAB': ('GA', 'Gabon'),
+    'GBR': ('GB', 'United Kingdom'), 'GEO': ('GE', 'Georgia'), 'GHA': ('GH', 'Ghana'), 'GIN': ('GN', 'Guinea'),
+    'GMB': ('GM', 'Gambia, The'), 'GNB': ('GW', 'Guinea-Bissau'), 'GNQ': ('GQ', 'Equatorial Guinea'),
+    'GRC': ('GR', 'Greece'), 'GRD': ('GD', 'Grenada'), 'GTM': ('GT', 'Guatemala'), 'GUY': ('GY', 'Guyana'),
+    'HKG': ('HK', 'Hong Kong SAR'), 'HND': ('HN', 'Honduras'), 'HRV': ('HR', 'Croatia'), 'HTI': ('HT', 'Haiti'),
+    'HUN': ('HU', 'Hungary'), 'IDN': ('ID', 'Indonesia'), 'IND': ('IN', 'India'), 'IRL': ('IE', 'Ireland'),
+    'IRN': ('IR', 'Iran'), 'IRQ': ('IQ', 'Iraq'), 'ISL': ('IS', 'Iceland'), 'ISR': ('IL', 'Israel'),
+    'ITA': ('IT', 'Italy'), 'JAM': ('JM', 'Jamaica'), 'JOR': ('JO', 'Jordan'), 'JPN': ('JP', 'Japan'),
+    'KAZ': ('KZ', 'Kazakhstan'), 'KEN': ('KE', 'Kenya'), 'KGZ': ('KG', 'Kyrgyz Republic'),
+    'KHM': ('KH', 'Cambodia'), 'KIR': ('KI', 'Kiribati'), 'KNA': ('KN', 'St. Kitts and Nevis'),
+    'KOR': ('KR', 'Korea'), 'KWT': ('KW', 'Kuwait'), 'LAO': ('LA', 'Lao PDR'), 'LBN': ('LB', 'Lebanon'),
+    'LBR': ('LR', 'Liberia'), 'LBY': ('LY', 'Libya'), 'LCA': ('LC', 'St. Lucia'), 'LKA': ('LK', 'Sri Lanka'),
+    'LSO': ('LS', 'Lesotho'), 'LTU': ('LT', 'Lithuania'), 'LUX': ('LU', 'Luxembourg'), 'LVA': ('LV', 'Latvia'),
+    'MAC': ('MO', 'Macao SAR'), 'MAR': ('MA', 'Morocco'), 'MDA': ('MD', 'Moldova'), 'MDG': ('MG', 'Madagascar'),
+    'MDV': ('MV', 'Maldives'), 'MEX': ('MX', 'Mexico'), 'MHL': ('MH', 'Marshall Islands'),
+    'MKD': ('MK', 'North Macedonia'), 'MLI': ('ML', 'Mali'), 'MLT': ('MT', 'Malta'), 'MMR': ('MM', 'Myanmar'),
+    'MNE': ('ME', 'Montenegro'), 'MNG': ('MN', 'Mongolia'), 'MOZ': ('MZ', 'Mozambique'),
+    'MRT': ('MR', 'Mauritania'), 'MUS': ('MU', 'Mauritius'), 'MWI': ('MW', 'Malawi'), 'MYS': ('MY', 'Malaysia'),
+    'NAM': ('NA', 'Namibia'), 'NER': ('NE', 'Niger'), 'NGA': ('NG', 'Nigeria'), 'NIC': ('NI', 'Nicaragua'),
+    'NLD': ('NL', 'Netherlands'), 'NOR': ('NO', 'Norway'), 'NPL': ('NP', 'Nepal'), 'NRU': ('NR', 'Nauru'),
+    'NZL': ('NZ', 'New Zealand'), 'OMN': ('OM', 'Oman'), 'PAK': ('PK', 'Pakistan'), 'PAN': ('PA', 'Panama'),
+    'PER': ('PE', 'Peru'), 'PHL': ('PH', 'Philippines'), 'PLW': ('PW', 'Palau'), 'PNG': ('PG', 'Papua New Guinea'),
+    'POL': ('PL', 'Poland'), 'PRI': ('PR', 'Puerto Rico'), 'PRK': ('KP', "Korea, Dem. People's Rep."), 'PRT': ('PT', 'Portugal'), 'PRY': ('PY', 'Paraguay'),
+    'PSE': ('PS', 'West Bank and Gaza'), 'QAT': ('QA', 'Qatar'), 'ROU': ('RO', 'Romania'), 'RUS': ('RU', 'Russia'),
+    'RWA': ('RW', 'Rwanda'), 'SAU': ('SA', 'Saudi Arabia'), 'SDN': ('SD', 'Sudan'), 'SEN': ('SN', 'Senegal'),
+    'SGP': ('SG', 'Singapore'), 'SLB': ('SB', 'Solomon Islands'), 'SLE': ('SL', 'Sierra Leone'),
+    'SLV': ('SV', 'El Salvador'), 'SMR': ('SM', 'San Marino'), 'SOM': ('SO', 'Somalia'), 'SRB': ('RS', 'Serbia'),
+    'SSD': ('SS', 'South Sudan'), 'STP': ('ST', 'Sao Tome and Principe'), 'SUR': ('SR', 'Suriname'),
+    'SVK': ('SK', 'Slovak Republic'), 'SVN': ('SI', 'Slovenia'), 'SWE': ('SE', 'Sweden'), 'SWZ': ('SZ', 'Eswatini'),
+    'SYC': ('SC', 'Seychelles'), 'SYR': ('SY', 'Syria'), 'TCD': ('TD', 'Chad'), 'TGO': ('TG', 'Togo'),
+    'THA': ('TH', 'Thailand'), 'TJK': ('TJ', 'Tajikistan'), 'TKM': ('TM', 'Turkmenistan'),
+    'TLS': ('TL', 'Timor-Leste'), 'TON': ('TO', 'Tonga'), 'TTO': ('TT', 'Trinidad and Tobago'),
+    'TUN': ('TN', 'Tunisia'), 'TUR': ('TR', 'Turkey'), 'TUV': ('TV', 'Tuvalu'), 'TWN': ('TW', 'Taiwan'),
+    'TZA': ('TZ', 'Tanzania'), 'UGA': ('UG', 'Uganda'), 'UKR': ('UA', 'Ukraine'), 'URY': ('UY', 'Uruguay'),
+    'USA': ('US', 'United States'), 'UZB': ('UZ', 'Uzbekistan'), 'VCT': ('VC', 'St. Vincent and the Grenadines'),
+    'VEN': ('VE', 'Venezuela'), 'VNM': ('VN', 'Vietnam'), 'VUT': ('VU', 'Vanuatu'), 'WSM': ('WS', 'Samoa'),
+    'XKX': ('XK', 'Kosovo'), 'YEM': ('YE', 'Yemen'), 'ZAF': ('ZA', 'South Africa'), 'ZMB': ('ZM', 'Zambia'),
+    'ZWE': ('ZW', 'Zimbabwe'),
+}
+
+# Aggregates plotted next to countries; they resolve like countries but have no ISO-3 code
+GROUPS = {'OIC': 'OIC (57 members)', 'OIC_OTHERS': 'Others', 'WLD': 'World'}
+
+# IMF datamapper codes that differ from ISO-3
+IMF_CODES = {'UVK': 'XKX', 'WBG': 'PSE'}
+
+# Shorter labels for the dashboards
+SHORT_NAMES = {'ARE': 'UAE'}
+
+# Other spellings found in the IMF, World Bank and hand-made sources
+ALIASES = {
+    'UAE': 'ARE', 'Bahamas, The': 'BHS', 'Brunei Darussalam': 'BRN', 'Cape Verde': 'CPV', 'Ivory Coast': 'CIV',
+    "Côte d'Ivoire": 'CIV', 'Democratic Republic of the Congo': 'COD', 'Congo, Democratic Republic of the': 'COD',
+    'DR Congo': 'COD', 'Republic of Congo': 'COG', 'Congo, Republic of': 'COG', 'Czechia': 'CZE',
+    'Egypt, Arab Rep.': 'EGY', 'Gambia': 'GMB', 'Hong Kong': 'HKG', 'Iran, Islamic Rep.': 'IRN',
+    'Islamic Republic of Iran': 'IRN', 'South Korea': 'KOR', 'Korea, Rep.': 'KOR', 'Republic of Korea': 'KOR',
+    'Kyrgyzstan': 'KGZ', 'Lao P.D.R.': 'LAO', 'Laos': 'LAO', "Lao People's Democratic Republic": 'LAO',
+    'Macao': 'MAC', 'Micronesia, Fed. States of': 'FSM', 'Micronesia, Fed. Sts.': 'FSM', 'Moldova, Republic of': 'MDA',
+    'Burma': 'MMR', 'Macedonia': 'MKD', 'Palestine': 'PSE', 'Russian Federation': 'RUS', 'Slovakia': 'SVK',
+    'Swaziland': 'SWZ', 'Syrian Arab Republic': 'SYR', 'East Timor': 'TLS', 'Taiwan Province of China': 'TWN',
+    'United Republic of Tanzania': 'TZA', 'Turkiye': 'TUR', 'Türkiye, Republic of': 'TUR', 'UK': 'GBR',
+    'Great Britain': 'GBR', 'United States of America': 'USA', 'Venezuela, RB': 'VEN', 'Viet Nam': 'VNM',
+    'Yemen, Rep.': 'YEM', 'Organisation of Islamic Cooperation': 'OIC', "China, People's Republic of": 'CHN',
+    'Korea, Republic of': 'KOR', 'Congo, Dem. Rep. of the': 'COD', 'North Korea': 'PRK', 'DPRK': 'PRK',
+    "Korea, Democratic People's Republic of": 'PRK', "Democratic People's Republic of Korea": 'PRK',
+}
+
+# The IMF's trailing state forms, e.g. "Serbia, Republic of" or "Bahrain, Kingdom of";
+# a name the alias dict misses is retried without one. Only these exact forms are
+# dropped, so a qualifier that names a different state ("Democratic People's
+# Republic of") never falls through to the bare name.
+STATE_FORMS = ('Republic of', 'Kingdom of', 'State of', 'Principality of', 'Sultanate of', 'Islamic Republic of',
+               'Arab Republic of', "People's Republic of", 'Federal Republic of', 'Federal Democratic Republic of',
+               'Democratic Socialist Republic of')
+STATE_FORM = (r',\s*(?:the\s+)?(?:' + '|'.join(re.escape(form).replace("'", "['\u2019]") for form in STATE_FORMS)
+              + r')(?:\s+the)?\s*$')
+
+# Sorted codes; a country's id is its position here
+CODES = sorted(COUNTRIES) + list(GROUPS)
+CODE_IDS = {code: i for i, code in enumerate(CODES)}
+MISSING = -1
+# Shortest string the prefix index will resolve
+MIN_PREFIX = 4
+
+def normalize_name(name):
+    """Lookup key: accents, punctuation and case removed, 'saint' as 'st', a leading or trailing 'the' dropped."""
+    return _normalize(pd.Series([name], dtype=object)).iloc[0]
+
+def _normalize(names):
+    keys = (names.astype(str).str.replace('\u2019', "'", regex=False).str.normalize('NFKD').str.encode('ascii', 'ignore').str.decode('ascii')
+            .str.lower().str.replace('&', ' and ', regex=False)
+            .str.replace(r'[^a-z0-9]+', ' ', regex=True).str.strip()
+            .str.replace(r'\bsaint\b', 'st', regex=True))
+    return keys.str.replace(r'^the |\bthe$', '', regex=True).str.strip()
+
+_TABLE = None
+
+def alias_table():
+    """(normalized alias -> id dict, sorted aliases, their ids), built once per process."""
+    global _TABLE
+    if _TABLE is None:
+        aliases = {}
+        for code, (iso2, name) in COUNTRIES.items():
+            aliases.update({code: code, iso2: code, name: code})
+        for code, name in GROUPS.items():
+            aliases.update({code: code, name: code})
+        aliases.update(IMF_CODES)
+        aliases.update(ALIASES)
+        keys = _normalize(pd.Series(list(aliases), dtype=object))
+        table = {}
+        for key, code in zip(keys, aliases.values()):
+            table.setdefault(key, CODE_IDS[code])
+        ordered = sorted(table)
+        _TABLE = (table, ordered, [table[key] for key in ordered])
+    return _TABLE
+
+def _prefix_id(key):
+    """Id of the one country whose aliases start with key, else MISSING."""
+    if len(key) < MIN_PREFIX:
+        return MISSING
+    _, ordered, ids = alias_table()
+    start = bisect.bisect_left(ordered, key)
+    end = bisect.bisect_right(ordered, key + '\x7f')
+    matches = set(ids[start:end])
+    return matches.pop() if len(matches) == 1 else MISSING
+
+def country_ids(values):
+    """Integer country id per name or code (-1 where unknown), in one vectorized pass.
+
+    Each distinct string is normalized and looked up once.
+    """
+    positions, uniques = pd.factorize(pd.Series(values, dtype=object))
+    if len(uniques) == 0:
+        return np.full(len(positions), MISSING, dtype=np.int16)
+    table, _, _ = alias_table()
+    keys = _normalize(pd.Series(uniques, dtype=object))
+    ids = keys.map(table)
+    unresolved = ids.isna()
+    if unresolved.any():
+        stripped = _normalize(pd.Series(uniques, dtype=object)[unresolved].str.replace(STATE_FORM, '', regex=True, case=False))
+        ids[unresolved] = stripped.map(table)
+        unresolved = ids.isna()
+    if unresolved.any():
+        ids[unresolved] = keys[unresolved].map(_prefix_id)
+    ids = ids.to_numpy(dtype=np.int16)
+    return np.where(positions >= 0, ids[positions], MISSING).astype(np.int16)
+
+def codes_for(ids):
+    """Canonical codes (ISO-3 or group code) for ids; None where missing."""
+    lookup = np.array(CODES + [None], dtype=object)
+    return lookup[np.asarray(ids)]
+
+def to_iso3(values):
+    """ISO-3 codes for country names or codes (NaN for groups and unknown names), aligned with values."""
+    index = values.index if isinstance(values, pd.Series) else None
+    codes = pd.Series(codes_for(country_ids(values)), index=index, dtype=object)
+    return codes.where(codes.isin(COUNTRIES))
+
+def _names(short=False):
+    names = [COUNTRIES[code][1] if code in COUNTRIES else GROUPS[code] for code in CODES]
+    if short:
+        names = [SHORT_NAMES.get(code, name) for code, name in zip(CODES, names)]
+    return np.array(names + [None], dtype=object)
+
+def country_names(values, fallback=None, short=False):
+    """Canonical display names for country names or codes.
+
+    Unknown values are looked up in fallback (a dict) and otherwise kept as
+    they are.
+    """
+    values = pd.Series(values, dtype=object)
+    names = pd.Series(_names(short)[country_ids(values)], index=values.index, dtype=object)
+    unknown = names.isna()
+    if unknown.any():
+        names[unknown] = values[unknown].map(lambda v: (fallback or {}).get(v, v))
+    return names
+
+def display_names(codes):
+    """Ordered {code: dashboard label} for the countries a figure plots."""
+    return dict(zip(codes, country_names(codes, short=True)))
+
+def merge_countries(left, right, left_on, right_on=None, **kwargs):
+    """pd.merge on resolved country ids rather than on the raw name or code strings."""
+    left = left.assign(_country_id=country_ids(left[left_on]))
+    right = right.assign(_country_id=country_ids(right[right_on or left_on]))
+    left, right = left[left['_country_id'] != MISSING], right[right['_country_id'] != MISSING]
+    return pd.merge(left, right, on='_country_id', **kwargs).drop(columns='_country_id')
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Resolve country names and codes to canonical ISO-3 codes.")
+    parser.add_argument('names', nargs='+', help='names, ISO-2, ISO-3 or IMF codes')
+    args = parser.parse_args()
+    for name, code, label in zip(args.names, codes_for(country_ids(args.names)), country_names(args.names)):
+        print(f"{name!r:40} {code or '?':<11} {label}")
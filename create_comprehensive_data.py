@@ -1,4 +1,7 @@
 import pandas as pd
+from countries import country_names
+from data_store import update_store
+from debt_categories import debt_category
 
 # Approx 2023/2024 Estimates (IMF/World Bank Sources)
 data = {
@@ -26,52 +29,24 @@ data = {
     'ZMB': 110.0, 'ZWE': 95.0
 }
 
-# Mapping codes to names
-country_names = {
-    'AFG': 'Afghanistan', 'ALB': 'Albania', 'DZA': 'Algeria', 'AGO': 'Angola', 'ARG': 'Argentina', 'ARM': 'Armenia', 'AUS': 'Australia', 'AUT': 'Austria', 'AZE': 'Azerbaijan',
-    'BHS': 'Bahamas', 'BHR': 'Bahrain', 'BGD': 'Bangladesh', 'BRB': 'Barbados', 'BLR': 'Belarus', 'BEL': 'Belgium', 'BLZ': 'Belize', 'BEN': 'Benin', 'BTN': 'Bhutan', 'BOL': 'Bolivia', 'BIH': 'Bosnia and Herzegovina', 'BWA': 'Botswana', 'BRA': 'Brazil', 'BRN': 'Brunei', 'BGR': 'Bulgaria', 'BFA': 'Burkina Faso', 'BDI': 'Burundi', 'CPV': 'Cabo Verde', 'KHM': 'Cambodia', 'CMR': 'Cameroon', 'CAN': 'Canada', 'CAF': 'Central African Republic', 'TCD': 'Chad', 'CHL': 'Chile', 'CHN': 'China', 'COL': 'Colombia', 'COM': 'Comoros', 'COD': 'Congo, Dem. Rep.', 'COG': 'Congo, Rep.', 'CRI': 'Costa Rica', 'CIV': 'Cote d\'Ivoire', 'HRV': 'Croatia', 'CUB': 'Cuba', 'CYP': 'Cyprus', 'CZE': 'Czech Republic',
-    'DNK': 'Denmark', 'DJI': 'Djibouti', 'DMA': 'Dominica', 'DOM': 'Dominican Republic', 'ECU': 'Ecuador', 'EGY': 'Egypt', 'SLV': 'El Salvador', 'GNQ': 'Equatorial Guinea', 'ERI': 'Eritrea', 'EST': 'Estonia', 'ETH': 'Ethiopia',
-    'FJI': 'Fiji', 'FIN': 'Finland', 'FRA': 'France',
-    'GAB': 'Gabon', 'GMB': 'Gambia, The', 'GEO': 'Georgia', 'DEU': 'Germany', 'GHA': 'Ghana', 'GRC': 'Greece', 'GRD': 'Grenada', 'GTM': 'Guatemala', 'GIN': 'Guinea', 'GNB': 'Guinea-Bissau', 'GUY': 'Guyana',
-    'HTI': 'Haiti', 'HND': 'Honduras', 'HKG': 'Hong Kong SAR', 'HUN': 'Hungary',
-    'ISL': 'Iceland', 'IND': 'India', 'IDN': 'Indonesia', 'IRN': 'Iran', 'IRQ': 'Iraq', 'IRL': 'Ireland', 'ISR': 'Israel', 'ITA': 'Italy',
-    'JAM': 'Jamaica', 'JPN': 'Japan', 'JOR': 'Jordan',
-    'KAZ': 'Kazakhstan', 'KEN': 'Kenya', 'KIR': 'Kiribati', 'KWT': 'Kuwait', 'KGZ': 'Kyrgyz Republic',
-    'LAO': 'Lao PDR', 'LVA': 'Latvia', 'LBN': 'Lebanon', 'LSO': 'Lesotho', 'LBR': 'Liberia', 'LBY': 'Libya', 'LTU': 'Lithuania', 'LUX': 'Luxembourg',
-    'MDG': 'Madagascar', 'MWI': 'Malawi', 'MYS': 'Malaysia', 'MDV': 'Maldives', 'MLI': 'Mali', 'MLT': 'Malta', 'MHL': 'Marshall Islands', 'MRT': 'Mauritania', 'MUS': 'Mauritius', 'MEX': 'Mexico', 'FSM': 'Micronesia', 'MDA': 'Moldova', 'MNG': 'Mongolia', 'MNE': 'Montenegro', 'MAR': 'Morocco', 'MOZ': 'Mozambique', 'MMR': 'Myanmar',
-    'NAM': 'Namibia', 'NRU': 'Nauru', 'NPL': 'Nepal', 'NLD': 'Netherlands', 'NZL': 'New Zealand', 'NIC': 'Nicaragua', 'NER': 'Niger', 'NGA': 'Nigeria', 'MKD': 'North Macedonia', 'NOR': 'Norway',
-    'OMN': 'Oman',
-    'PAK': 'Pakistan', 'PLW': 'Palau', 'PAN': 'Panama', 'PNG': 'Papua New Guinea', 'PRY': 'Paraguay', 'PER': 'Peru', 'PHL': 'Philippines', 'POL': 'Poland', 'PRT': 'Portugal',
-    'QAT': 'Qatar',
-    'ROU': 'Romania', 'RUS': 'Russia', 'RWA': 'Rwanda',
-    'WSM': 'Samoa', 'SMR': 'San Marino', 'STP': 'Sao Tome and Principe', 'SAU': 'Saudi Arabia', 'SEN': 'Senegal', 'SRB': 'Serbia', 'SYC': 'Seychelles', 'SLE': 'Sierra Leone', 'SGP': 'Singapore', 'SVK': 'Slovak Republic', 'SVN': 'Slovenia', 'SLB': 'Solomon Islands', 'SOM': 'Somalia', 'ZAF': 'South Africa', 'SSD': 'South Sudan', 'ESP': 'Spain', 'LKA': 'Sri Lanka', 'KNA': 'St. Kitts and Nevis', 'LCA': 'St. Lucia', 'VCT': 'St. Vincent and the Grenadines', 'SDN': 'Sudan', 'SUR': 'Suriname', 'SWE': 'Sweden', 'CHE': 'Switzerland', 'SYR': 'Syria',
-    'TWN': 'Taiwan', 'TJK': 'Tajikistan', 'TZA': 'Tanzania', 'THA': 'Thailand', 'TLS': 'Timor-Leste', 'TGO': 'Togo', 'TON': 'Tonga', 'TTO': 'Trinidad and Tobago', 'TUN': 'Tunisia', 'TUR': 'Turkey', 'TKM': 'Turkmenistan', 'TUV': 'Tuvalu',
-    'UGA': 'Uganda', 'UKR': 'Ukraine', 'ARE': 'United Arab Emirates', 'GBR': 'United Kingdom', 'USA': 'United States', 'URY': 'Uruguay', 'UZB': 'Uzbekistan',
-    'VUT': 'Vanuatu', 'VEN': 'Venezuela', 'VNM': 'Vietnam',
-    'YEM': 'Yemen',
-    'ZMB': 'Zambia', 'ZWE': 'Zimbabwe'
-}
-
-processed_list = []
-for code, val in data.items():
-    category = "Moderate (30-60%)"
-    if val > 200:
-        category = "Critical (>200%)"
-    elif val > 90:
-        category = "High (>90%)"
-    elif val > 60:
-        category = "High (60-90%)"
-    elif val < 30:
-        category = "Low (<30%)"
-        
-    name = country_names.get(code, code)
-    processed_list.append({
-        'Country Code': code,
-        'Country': name,
-        'Debt-to-GDP Ratio (%)': val,
-        'Debt Category': category
-    })
-
-df = pd.DataFrame(processed_list)
+df = pd.DataFrame({
+    'Country Code': list(data),
+    'Country': country_names(list(data)).to_numpy(),
+    'Debt-to-GDP Ratio (%)': list(data.values()),
+})
+df['Debt Category'] = debt_category(df['Debt-to-GDP Ratio (%)'])
 df.to_csv("global_debt_data_2024.csv", index=False)
 print("Manually generated global_debt_data_2024.csv")
+
+store_df = pd.DataFrame({
+    'source': 'estimates',
+    'indicator': 'GGXWDG_NGDP',
+    'country_code': df['Country Code'],
+    'country': df['Country'],
+    'year': 2024,
+    'value': df['Debt-to-GDP Ratio (%)'].astype(float)
+})
+try:
+    update_store(store_df)
+except ImportError as e:
+    print(f"Skipping data store: {e}")
@@ -0,0 +1,206 @@
+import os
+import re
+import json
+import shutil
+import argparse
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import plotly.io as pio
+from plotly.offline import get_plotlyjs
+
+import plot_utils
+from delta_frames import EXPAND_SCRIPT, META_KEY
+from geometry import install_geometry
+from plot_utils import OUTPUT_DIR, PLOTLYJS_CDN_URL, PLOTLYJS_FILENAME, SHARED_SCRIPT_TAGS
+from instrumentation import stage
+from render_scheduler import default_workers, input_rows
+
+# The hand-written dashboards embed one iframe per figure; the bundler turns each
+# into a single page with one plotly.js runtime and the figure JSON inlined.
+DASHBOARDS = ['index.html', 'oic_dashboard.html', 'bangladesh_dashboard.html', 'financial_history.html']
+BUNDLE_DIR = 'site'
+STATIC_DIRS = ['css']
+
+IFRAME_RE = re.compile(
+    r'<iframe\s+src="interactive_plots/(?P<filename>[\w\-]+\.html)"(?:\s+title="(?P<title>[^"]*)")?\s*></iframe>'
+)
+
+# Charts start rendering shortly before they scroll into view
+LAZY_ROOT_MARGIN = '300px 0px'
+
+LOADER_SCRIPT = """<script>
+(function () {
+    var topojsonURL = %(topojson_url)s;
+    function render(el) {
+        var spec = JSON.parse(document.getElementById('figure-' + el.dataset.figure).textContent);
+        var config = {responsive: true};
+        if (topojsonURL) {
+            config.topojsonURL = topojsonURL;
+        }
+        Plotly.newPlot(el, spec.data, spec.layout, config).then(function (gd) {
+            // Animated figures ship their frames delta-encoded (delta_frames.py)
+            if (window.expandDeltaFrames) {
+                window.expandDeltaFrames(gd);
+            }
+        });
+    }
+    function start() {
+        var charts = Array.prototype.slice.call(document.querySelectorAll('.chart-lazy'));
+        if (!('IntersectionObserver' in window)) {
+            charts.forEach(render);
+            return;
+        }
+        var observer = new IntersectionObserver(function (entries) {
+            entries.forEach(function (entry) {
+                if (entry.isIntersecting) {
+                    observer.unobserve(entry.target);
+                    render(entry.target);
+                }
+            });
+        }, {rootMargin: '%(root_margin)s'});
+        charts.forEach(function (el) { observer.observe(el); });
+    }
+    if (document.readyState === 'loading') {
+        document.addEventListener('DOMContentLoaded', start);
+    } else {
+        start();
+    }
+})();
+</script>
+"""
+
+def dashboard_figure_jobs():
+    """Figure jobs of every generator, keyed by the file name the dashboards reference."""
+    import gdp_debt_analysis
+    import bangladesh_analysis
+    import financial_history_analysis
+    jobs = (
+        gdp_debt_analysis.all_figure_jobs()
+        + bangladesh_analysis.bangladesh_figure_jobs()
+        + financial_history_analysis.financial_history_figure_jobs()
+    )
+    return {job.filename: job for job in jobs}
+
+def figure_json(fig):
+    """(serialized {data, layout} for Plotly.newPlot, bytes saved by compaction)."""
+    payload, saved = plot_utils.figure_payload(fig)
+    return pio.to_json(payload, validate=False, pretty=False), saved
+
+def build_figure_json(job, json_mode=None, precision=None):
+    """Build one figure job and return (filename, json, bytes saved)."""
+    if json_mode is not None:
+        plot_utils.set_figure_json_mode(json_mode, precision)
+    with stage('build', figure=job.filename, rows=input_rows(job.args)):
+        fig = job.build(*job.args)
+    with stage('serialize', figure=job.filename) as span:
+        payload, saved = figure_json(fig)
+        span.update(bytes=len(payload), saved=saved)
+    return job.filename, payload, saved
+
+def build_figures(jobs, max_workers=None):
+    """JSON for every job, built in a process pool; {filename: json}."""
+    max_workers = max_workers or default_workers()
+    if max_workers == 1 or len(jobs) <= 1:
+        built = [build_figure_json(job) for job in jobs]
+    else:
+        modes = (plot_utils.FIGURE_JSON_MODE, plot_utils.FIGURE_PRECISION)
+        with ProcessPoolExecutor(max_workers=min(max_workers, len(jobs))) as executor:
+            built = list(executor.map(build_figure_json, jobs, *([m] * len(jobs) for m in modes)))
+    saved = sum(s for _, _, s in built)
+    print(f"  {plot_utils.FIGURE_JSON_MODE} figure JSON saved {saved / 1024:.1f} KiB")
+    return {filename: payload for filename, payload, _ in built}
+
+def _figure_id(filename):
+    return os.path.splitext(filename)[0]
+
+def _json_script(figure_id, payload):
+    # '</' would end the script element early; '<\/' is the same JSON string
+    payload = payload.replace('</', '<\\/')
+    return f'<script type="application/json" id="figure-{figure_id}">{payload}</script>\n'
+
+def plotlyjs_tags(bundle_dir):
+    """Script tags loading plotly.js once per page, following the configured plotly.js mode."""
+    mode = plot_utils.PLOTLYJS_MODE
+    if mode == 'inline':
+        return f'<script>{get_plotlyjs()}</script>\n'
+    if mode == 'cdn':
+        return f'<script src="{PLOTLYJS_CDN_URL}"></script>\n'
+    path = os.path.join(bundle_dir, PLOTLYJS_FILENAME)
+    if not os.path.exists(path):
+        shutil.copyfile(plot_utils.write_shared_plotlyjs(), path)
+    return SHARED_SCRIPT_TAGS.format(src=PLOTLYJS_FILENAME, cdn=PLOTLYJS_CDN_URL)
+
+def bundle_page(html, figures, plotlyjs, topojson_url=None, figure_dir=OUTPUT_DIR):
+    """Replace a dashboard's figure iframes with lazily rendered divs; returns (html, bundled, missing).
+
+    Iframes of figures that were not built are kept, pointing at figure_dir
+    (relative to the bundled page).
+    """
+    bundled, missing, scripts = [], [], []
+
+    def replace(match):
+        filename = match.group('filename')
+        if filename not in figures:
+            missing.append(filename)
+            return match.group(0).replace(f'src="{OUTPUT_DIR}/', f'src="{figure_dir}/', 1)
+        figure_id = _figure_id(filename)
+        bundled.append(filename)
+        scripts.append(_json_script(figure_id, figures[filename]))
+        title = match.group('title') or figure_id.replace('_', ' ')
+        return f'<div class="chart-lazy" data-figure="{figure_id}" role="img" aria-label="{title}"></div>'
+
+    html = IFRAME_RE.sub(replace, html)
+    if bundled:
+        loader = LOADER_SCRIPT % {'root_margin': LAZY_ROOT_MARGIN, 'topojson_url': json.dumps(topojson_url)}
+        if any(f'"{META_KEY}"' in figures[filename] for filename in bundled):
+            loader = f'<script>{EXPAND_SCRIPT}</script>\n' + loader
+        tail = ''.join(scripts) + plotlyjs + loader
+        html = html.replace('</body>', tail + '</body>', 1)
+    return html, bundled, missing
+
+def bundle_dashboards(dashboards=DASHBOARDS, bundle_dir=BUNDLE_DIR, max_workers=None):
+    """Write single-page versions of the dashboards to bundle_dir; returns {page: bytes}."""
+    start = time.perf_counter()
+    if not os.path.exists(bundle_dir):
+        os.makedirs(bundle_dir)
+    for directory in STATIC_DIRS:
+        if os.path.isdir(directory):
+            shutil.copytree(directory, os.path.join(bundle_dir, directory), dirs_exist_ok=True)
+
+    pages = {}
+    for page in dashboards:
+        with open(page, 'r', encoding='utf-8') as f:
+            pages[page] = f.read()
+
+    # Only build the figures the pages actually reference
+    referenced = {m.group('filename') for html in pages.values() for m in IFRAME_RE.finditer(html)}
+    jobs = [job for name, job in dashboard_figure_jobs().items() if name in referenced]
+    print(f"Building {len(jobs)} figures for {len(pages)} dashboards...")
+    figures = build_figures(jobs, max_workers)
+    plotlyjs = plotlyjs_tags(bundle_dir)
+    topojson_url = install_geometry(bundle_dir)
+    figure_dir = os.path.relpath(OUTPUT_DIR, bundle_dir).replace(os.sep, '/')
+
+    sizes = {}
+    for page, html in pages.items():
+        html, bundled, missing = bundle_page(html, figures, plotlyjs, topojson_url, figure_dir)
+        path = os.path.join(bundle_dir, page)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(html)
+        os.replace(tmp_path, path)
+        sizes[page] = os.path.getsize(path)
+        note = f", kept {len(missing)} iframes ({', '.join(missing)})" if missing else ""
+        print(f"  {path}: {len(bundled)} charts, {sizes[page] / 1024:.1f} KiB{note}")
+
+    print(f"Bundled {len(pages)} dashboards in {time.perf_counter() - start:.2f}s")
+    return sizes
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Bundle the dashboards into single pages with lazily rendered charts.")
+    parser.add_argument('--out', default=BUNDLE_DIR, help=f"output directory (default: {BUNDLE_DIR})")
+    parser.add_argument('--workers', type=int, default=None, help='figure build processes (default: one per CPU)')
+    parser.add_argument('dashboards', nargs='*', default=DASHBOARDS, help='dashboard pages to bundle')
+    args = parser.parse_args()
+    bundle_dashboards(args.dashboards, args.out, args.workers)
@@ -0,0 +1,265 @@
+import os
+import gzip
+import argparse
+import sys
+import importlib
+import threading
+import time
+import traceback
+from collections import OrderedDict, namedtuple
+from concurrent.futures import Future
+from http import HTTPStatus
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import unquote
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+import plot_utils
+from build_manifest import job_hash
+from dashboard_bundler import BUNDLE_DIR, DASHBOARDS, STATIC_DIRS
+from data_store import STORE_PATH
+from instrumentation import stage
+from plot_utils import OUTPUT_DIR
+
+# Development server for the dashboards. Pages and static files are served from
+# the project directory; every interactive_plots/<figure>.html is built on first
+# request from the generators' figure jobs and kept in memory, so editing one
+# chart's data or builder only rebuilds that chart.
+ROOT_DIR = os.path.dirname(os.path.abspath(__file__))
+GENERATOR_MODULES = ['gdp_debt_analysis', 'bangladesh_analysis', 'financial_history_analysis']
+CACHE_SIZE = int(os.environ.get('SERVER_CACHE_SIZE', 64))
+# Seconds between checks of the data store and generator sources for changes
+CHECK_INTERVAL = float(os.environ.get('SERVER_CHECK_INTERVAL', 1.0))
+# Responses smaller than this are not worth compressing
+MIN_COMPRESS_BYTES = 1024
+# The only files served from the project directory: the dashboard pages and the
+# directories they load from (the topojson copies live in interactive_plots/ and
+# site/). Everything else, such as token.json or .git/, is a 404.
+SERVED_FILES = set(DASHBOARDS)
+SERVED_DIRS = set(STATIC_DIRS) | {OUTPUT_DIR, BUNDLE_DIR}
+
+# One built figure page: ETag plus the body in each available encoding
+CachedFigure = namedtuple('CachedFigure', ['etag', 'bodies', 'seconds'])
+
+def encode_bodies(body):
+    """{content-encoding: bytes} for a response body; '' is the identity encoding."""
+    bodies = {'': body}
+    if len(body) >= MIN_COMPRESS_BYTES:
+        bodies['gzip'] = gzip.compress(body, compresslevel=6)
+        if brotli is not None:
+            bodies['br'] = brotli.compress(body, quality=5)
+    return bodies
+
+def choose_encoding(accept_encoding, available):
+    """Best content encoding the client accepts: br, then gzip, then identity."""
+    accepted = set()
+    for part in (accept_encoding or '').split(','):
+        name, _, params = part.partition(';')
+        params = params.replace(' ', '')
+        try:
+            quality = float(params[2:]) if params.startswith('q=') else 1.0
+        except ValueError:
+            quality = 1.0
+        if quality > 0:
+            accepted.add(name.strip().lower())
+    for encoding in ('br', 'gzip'):
+        if encoding in available and (encoding in accepted or '*' in accepted):
+            return encoding
+    return ''
+
+class FigureCache:
+    """LRU of built figure pages keyed by the figure job's content hash.
+
+    The job list is rebuilt when the data store or a generator module changes;
+    entries whose job hash changed are simply never requested again and age
+    out of the LRU.
+    """
+
+    def __init__(self, max_entries=CACHE_SIZE):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        # Guards the entries, jobs and in-flight builds; never held while building
+        self._lock = threading.Lock()
+        # digest -> Future of a build in progress, so a figure is never built twice at once
+        self._building = {}
+        self._jobs = None
+        self._digests = {}
+        self._state = None
+        self._checked = 0.0
+
+    def _source_state(self):
+        """mtimes of the data store and generator sources."""
+        paths = [STORE_PATH] + [os.path.join(ROOT_DIR, f"{name}.py") for name in GENERATOR_MODULES]
+        return tuple(os.stat(p).st_mtime_ns if os.path.exists(p) else None for p in paths)
+
+    def _refresh_jobs(self):
+        """Reload the figure jobs if their inputs changed since the last check."""
+        now = time.monotonic()
+        if self._jobs is not None and now - self._checked < CHECK_INTERVAL:
+            return
+        self._checked = now
+        state = self._source_state()
+        if state == self._state:
+            return
+        if self._state is not None:
+            print("Sources changed, reloading figure jobs...")
+            for name in GENERATOR_MODULES:
+                module = sys.modules.get(name)
+                if module is not None:
+                    importlib.reload(module)
+        from dashboard_bundler import dashboard_figure_jobs
+        self._jobs = dashboard_figure_jobs()
+        self._digests = {name: job_hash(job) for name, job in self._jobs.items()}
+        self._state = state
+
+    def get(self, filename):
+        """Cached (or freshly built) figure page, or None if no job produces filename.
+
+        The lock only covers the lookups; figures build outside it, and a
+        request for a figure that is already being built waits for that build.
+        """
+        with self._lock:
+            self._refresh_jobs()
+            if filename not in self._jobs:
+                return None
+            digest = self._digests[filename]
+            entry = self._entries.get(digest)
+            if entry is not None:
+                self._entries.move_to_end(digest)
+                return entry
+            pending = self._building.get(digest)
+            if pending is None:
+                pending = self._building[digest] = Future()
+                job = self._jobs[filename]
+            else:
+                job = None
+        if job is None:
+            return pending.result()
+
+        try:
+            entry = self._build(filename, digest, job)
+        except BaseException as e:
+            with self._lock:
+                del self._building[digest]
+            pending.set_exception(e)
+            raise
+        with self._lock:
+            self._entries[digest] = entry
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            del self._building[digest]
+        pending.set_result(entry)
+        return entry
+
+    def _build(self, filename, digest, job):
+        start = time.perf_counter()
+        with stage('build', figure=filename):
+            fig = job.build(*job.args)
+        with stage('serialize', figure=filename) as span:
+            html = plot_utils.figure_html(fig)
+            span['bytes'] = len(html)
+        entry = CachedFigure(f'"{digest[:32]}"', encode_bodies(html.encode('utf-8')),
+                             time.perf_counter() - start)
+        print(f"  built {filename} in {entry.seconds:.2f}s")
+        return entry
+
+def is_served(url_path):
+    """True if a request path names a dashboard page or a file in one of SERVED_DIRS."""
+    path = unquote(url_path.split('?', 1)[0].split('#', 1)[0])
+    parts = [part for part in path.split('/') if part]
+    if any(part.startswith('.') or '\\' in part for part in parts):
+        return False  # dotfiles, '..' and Windows separators
+    if not parts:
+        return True  # / serves index.html
+    if len(parts) == 1:
+        return parts[0] in SERVED_FILES or parts[0] in SERVED_DIRS
+    return parts[0] in SERVED_DIRS
+
+class DashboardHandler(SimpleHTTPRequestHandler):
+    """Dashboard pages and their assets from the project directory, figure pages from the FigureCache."""
+
+    cache = None
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, directory=ROOT_DIR, **kwargs)
+
+    def do_GET(self):
+        if not is_served(self.path):
+            self.send_error(HTTPStatus.NOT_FOUND)
+        elif not self._send_figure(head=False):
+            super().do_GET()
+
+    def do_HEAD(self):
+        if not is_served(self.path):
+            self.send_error(HTTPStatus.NOT_FOUND)
+        elif not self._send_figure(head=True):
+            super().do_HEAD()
+
+    def _figure_name(self):
+        path = self.path.split('?', 1)[0].split('#', 1)[0]
+        prefix = f"/{OUTPUT_DIR}/"
+        if not path.startswith(prefix) or not path.endswith('.html'):
+            return None
+        name = path[len(prefix):]
+        return name if '/' not in name else None
+
+    def _send_figure(self, head):
+        """Serve a figure page from the cache; False lets the static handler take the request."""
+        filename = self._figure_name()
+        if filename is None:
+            return False
+        try:
+            entry = self.cache.get(filename)
+        except Exception:
+            self.send_error(HTTPStatus.INTERNAL_SERVER_ERROR, f"Building {filename} failed")
+            traceback.print_exc()
+            return True
+        if entry is None:
+            return False
+
+        if self.headers.get('If-None-Match') == entry.etag:
+            self.send_response(HTTPStatus.NOT_MODIFIED)
+            self.send_header('ETag', entry.etag)
+            self.end_headers()
+            return True
+        encoding = choose_encoding(self.headers.get('Accept-Encoding'), entry.bodies)
+        body = entry.bodies[encoding]
+        self.send_response(HTTPStatus.OK)
+        self.send_header('Content-Type', 'text/html; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.send_header('ETag', entry.etag)
+        self.send_header('Cache-Control', 'no-cache')
+        self.send_header('Vary', 'Accept-Encoding')
+        if encoding:
+            self.send_header('Content-Encoding', encoding)
+        self.end_headers()
+        if not head:
+            self.wfile.write(body)
+        return True
+
+def make_server(host='127.0.0.1', port=8000, cache_size=CACHE_SIZE):
+    """ThreadingHTTPServer serving the dashboards with an on-demand figure cache."""
+    plot_utils.write_shared_plotlyjs()
+    handler = type('Handler', (DashboardHandler,), {'cache': FigureCache(cache_size)})
+    return ThreadingHTTPServer((host, port), handler)
+
+def serve(host='127.0.0.1', port=8000, cache_size=CACHE_SIZE):
+    server = make_server(host, port, cache_size)
+    print(f"Serving dashboards on http://{host}:{port}/ (figures built on request; Ctrl+C to stop)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve the dashboards, building figures on request.")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8000)
+    parser.add_argument('--cache-size', type=int, default=CACHE_SIZE, help='figure pages kept in memory')
+    args = parser.parse_args()
+    serve(args.host, args.port, args.cache_size)
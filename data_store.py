@@ -0,0 +1,228 @@
+import os
+import argparse
+from collections import namedtuple
+from contextlib import contextmanager
+
+import pandas as pd
+
+from panel import Panel
+
+try:
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+
+# One long-format Parquet table shared by every ingest path and figure:
+#   source, indicator, country_code, country, year, value
+# Rows are sorted by (source, indicator, country_code, year) so row-group
+# statistics let filters on source/indicator skip most of the file.
+STORE_PATH = os.path.join('data', 'economic_data.parquet')
+STORE_COLUMNS = ['source', 'indicator', 'country_code', 'country', 'year', 'value']
+KEY_COLUMNS = ['source', 'indicator', 'country_code', 'year']
+ROW_GROUP_SIZE = 64 * 1024
+
+USE_STORE = os.environ.get('USE_DATA_STORE', '1') != '0'
+
+# (path, source) -> (store mtime, Panel); every reader in a process shares one panel per source
+_PANELS = {}
+
+# One wide column of a dataset: the store indicator behind it and the dtype the
+# built-in literal dataset gives it, so both paths build identical frames
+Column = namedtuple('Column', ['indicator', 'dtype'], defaults=['float64'])
+
+def _schema():
+    return pa.schema([
+        ('source', pa.string()),
+        ('indicator', pa.string()),
+        ('country_code', pa.string()),
+        ('country', pa.string()),
+        ('year', pa.int16()),
+        ('value', pa.float64()),
+    ])
+
+def store_available(path=STORE_PATH):
+    """True if the store can be read (pyarrow installed, enabled, file present)."""
+    return pa is not None and USE_STORE and os.path.exists(path)
+
+@contextmanager
+def store_disabled():
+    """Temporarily make readers fall back to the built-in literal datasets."""
+    global USE_STORE
+    previous = USE_STORE
+    USE_STORE = False
+    try:
+        yield
+    finally:
+        USE_STORE = previous
+
+def _require_pyarrow():
+    if pa is None:
+        raise ImportError("pyarrow is required for the data store: pip install pyarrow")
+
+def write_store(df, path=STORE_PATH):
+    """Replace the store with df (long format), written atomically."""
+    _require_pyarrow()
+    df = df[STORE_COLUMNS].sort_values(KEY_COLUMNS, ignore_index=True)
+    table = pa.Table.from_pandas(df, schema=_schema(), preserve_index=False)
+
+    directory = os.path.dirname(path)
+    if directory and not os.path.exists(directory):
+        os.makedirs(directory)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    pq.write_table(table, tmp_path, row_group_size=ROW_GROUP_SIZE, compression='zstd')
+    os.replace(tmp_path, path)
+
+def update_store(df, path=STORE_PATH):
+    """Upsert long-format rows; new rows win on (source, indicator, country_code, year)."""
+    _require_pyarrow()
+    df = df.copy()
+    if 'country' not in df:
+        df['country'] = df['country_code']
+    if os.path.exists(path):
+        existing = pq.read_table(path).to_pandas()
+        df = pd.concat([existing, df[STORE_COLUMNS]], ignore_index=True)
+        df = df.drop_duplicates(subset=KEY_COLUMNS, keep='last')
+    write_store(df, path)
+    print(f"Data store updated: {path} ({len(df)} rows)")
+
+def read_store(columns=None, sources=None, indicators=None, countries=None, years=None, path=STORE_PATH):
+    """Load a projection of the store, pushing the filters down into the Parquet scan."""
+    _require_pyarrow()
+    expression = None
+    for field, values in (('source', sources), ('indicator', indicators),
+                          ('country_code', countries), ('year', years)):
+        if values is None:
+            continue
+        values = [int(v) for v in values] if field == 'year' else list(values)
+        condition = ds.field(field).isin(values)
+        expression = condition if expression is None else expression & condition
+
+    table = ds.dataset(path, format='parquet').to_table(columns=columns, filter=expression)
+    return table.to_pandas(split_blocks=True, self_destruct=True)
+
+def _indicators(columns):
+    return {name: column.indicator for name, column in columns.items()}
+
+def _apply_dtypes(df, columns):
+    """Cast the value columns (stored as float64) to their declared dtypes."""
+    return df.astype({name: column.dtype for name, column in columns.items()})
+
+def load_panel(source, path=STORE_PATH):
+    """In-memory Panel of one source, loaded once per process and reloaded when the store changes."""
+    _require_pyarrow()
+    mtime = os.stat(path).st_mtime_ns
+    cached = _PANELS.get((path, source))
+    if cached is None or cached[0] != mtime:
+        df = read_store(['country_code', 'country', 'indicator', 'year', 'value'], sources=[source], path=path)
+        cached = (mtime, Panel.from_long(df))
+        _PANELS[(path, source)] = cached
+    return cached[1]
+
+def read_time_series(source, country_code, columns, years=None, path=STORE_PATH):
+    """Wide {'Year', *columns} frame for one country, or None if the store lacks it.
+
+    columns maps output column name -> Column.
+    """
+    if not store_available(path):
+        return None
+    df = load_panel(source, path).frame(country_code, _indicators(columns), years)
+    if df is None:
+        return None
+    return _apply_dtypes(df, columns)
+
+def read_cross_section(source, countries, columns, year, path=STORE_PATH):
+    """Wide {'Country', *columns} frame for one year, in the order of countries.
+
+    countries maps country code -> display name, columns output column name -> Column;
+    returns None if any value is missing.
+    """
+    if not store_available(path):
+        return None
+    panel = load_panel(source, path)
+    indicators = list(_indicators(columns).values())
+    if not panel.covers(countries, [year], indicators):
+        return None
+    values = panel.select(countries, [year], indicators).values[:, 0, :]
+    if pd.isna(values).any():
+        return None
+    wide = pd.DataFrame(values, columns=list(columns))
+    wide.insert(0, 'Country', list(countries.values()))
+    return _apply_dtypes(wide, columns)
+
+def latest_values(indicator, years, sources, path=STORE_PATH):
+    """Latest available value per country, preferring earlier years and earlier sources.
+
+    Returns columns Country Code, Country, Year, Value, or None without a store.
+    """
+    if not store_available(path):
+        return None
+    df = read_store(['source', 'country_code', 'country', 'year', 'value'], sources=sources,
+                    indicators=[indicator], years=years, path=path)
+    if df.empty:
+        return None
+    df['source_rank'] = df['source'].map({s: i for i, s in enumerate(sources)})
+    df['year_rank'] = df['year'].map({int(y): i for i, y in enumerate(years)})
+    df = df.sort_values(['source_rank', 'year_rank']).drop_duplicates('country_code')
+    df = df.sort_values('country_code')
+    return pd.DataFrame({
+        'Country Code': df['country_code'].to_numpy(),
+        'Country': df['country'].to_numpy(),
+        'Year': df['year'].astype(int).to_numpy(),
+        'Value': df['value'].to_numpy(),
+    })
+
+def melt_time_series(df, source, country_code, columns, country=None):
+    """Long-format store rows from a wide {'Year', *columns} frame."""
+    frames = []
+    for name, column in columns.items():
+        frames.append(pd.DataFrame({
+            'source': source,
+            'indicator': column.indicator,
+            'country_code': country_code,
+            'country': country or country_code,
+            'year': df['Year'].astype(int),
+            'value': df[name].astype(float),
+        }))
+    return pd.concat(frames, ignore_index=True)
+
+def melt_cross_section(df, source, countries, columns, year):
+    """Long-format store rows from a wide {'Country', *columns} frame ordered like countries."""
+    frames = []
+    for name, column in columns.items():
+        frames.append(pd.DataFrame({
+            'source': source,
+            'indicator': column.indicator,
+            'country_code': list(countries),
+            'country': list(countries.values()),
+            'year': year,
+            'value': df[name].astype(float).to_numpy(),
+        }))
+    return pd.concat(frames, ignore_index=True)
+
+def seed_store(path=STORE_PATH):
+    """Write every built-in dashboard dataset into the store."""
+    import gdp_debt_analysis
+    import bangladesh_analysis
+    import financial_history_analysis
+
+    with store_disabled():
+        frames = (
+            gdp_debt_analysis.store_records()
+            + bangladesh_analysis.store_records()
+            + financial_history_analysis.store_records()
+        )
+    update_store(pd.concat(frames, ignore_index=True), path)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Manage the columnar economic data store.")
+    parser.add_argument('command', choices=['seed', 'info'])
+    args = parser.parse_args()
+    if args.command == 'seed':
+        seed_store()
+    elif store_available():
+        summary = read_store(['source', 'indicator', 'year'])
+        print(summary.groupby(['source', 'indicator'])['year'].agg(['min', 'max', 'count']).to_string())
+    else:
+        print(f"No data store at {STORE_PATH}")
@@ -0,0 +1,69 @@
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+
+# One debt-to-GDP risk tier; lower is the tier's lower bound in percent (None for
+# the first tier) and lower_inclusive whether a ratio equal to it belongs to the tier
+DebtTier = namedtuple('DebtTier', ['label', 'color', 'risk', 'lower', 'lower_inclusive'])
+
+TIER_COLORS = ['#2ecc71', '#388e3c', '#f57c00', '#d32f2f', '#8b0000'] # Light Green -> Dark Red
+RISK_TIERS = ['low', 'moderate', 'elevated', 'high', 'critical']
+
+def build_tiers(low=30, moderate=60, high=90, critical=200):
+    """Debt tiers for the given thresholds (% of GDP), labelled like the dashboards.
+
+    A ratio below low is Low and one above a threshold belongs to the next
+    tier up; a ratio exactly at low counts as Moderate.
+    """
+    if not low < moderate < high < critical:
+        raise ValueError("Debt thresholds must be strictly increasing")
+    return [
+        DebtTier(f'Low (<{low}%)', TIER_COLORS[0], RISK_TIERS[0], None, False),
+        DebtTier(f'Moderate ({low}-{moderate}%)', TIER_COLORS[1], RISK_TIERS[1], low, True),
+        DebtTier(f'High ({moderate}-{high}%)', TIER_COLORS[2], RISK_TIERS[2], moderate, False),
+        DebtTier(f'High (>{high}%)', TIER_COLORS[3], RISK_TIERS[3], high, False),
+        DebtTier(f'Critical (>{critical}%)', TIER_COLORS[4], RISK_TIERS[4], critical, False),
+    ]
+
+DEBT_TIERS = build_tiers()
+
+def category_colors(tiers=DEBT_TIERS):
+    """Category label -> hex color from highest to lowest risk, for plotly's color_discrete_map."""
+    return {tier.label: tier.color for tier in reversed(tiers)}
+
+def category_order(tiers=DEBT_TIERS):
+    """Category labels from highest to lowest risk."""
+    return [tier.label for tier in reversed(tiers)]
+
+def tier_index(ratios, tiers=DEBT_TIERS):
+    """Tier position (0 = lowest) for each ratio in one searchsorted pass; -1 for missing values."""
+    values = np.asarray(ratios, dtype=float)
+    edges = np.array([tier.lower for tier in tiers[1:]], dtype=float)
+    inclusive = np.array([tier.lower_inclusive for tier in tiers[1:]])
+
+    left = np.searchsorted(edges, values, side='left')
+    right = np.searchsorted(edges, values, side='right')
+    # Values sitting exactly on an edge move up only if that edge is inclusive
+    on_edge = right > left
+    index = np.where(on_edge & inclusive[np.minimum(left, len(edges) - 1)], right, left)
+    return np.where(np.isnan(values), -1, index)
+
+def categorize(ratios, tiers=DEBT_TIERS):
+    """Debt Category, Debt Color and Risk Tier columns for a ratio column (% of GDP).
+
+    The columns are categoricals sharing the tier codes, so no per-row strings are built.
+    """
+    codes = tier_index(ratios, tiers)
+    index = ratios.index if isinstance(ratios, pd.Series) else None
+    return pd.DataFrame({
+        'Debt Category': pd.Categorical.from_codes(codes, [tier.label for tier in tiers]),
+        'Debt Color': pd.Categorical.from_codes(codes, [tier.color for tier in tiers]),
+        'Risk Tier': pd.Categorical.from_codes(codes, [tier.risk for tier in tiers], ordered=True),
+    }, index=index)
+
+def debt_category(ratios, tiers=DEBT_TIERS):
+    """Debt Category labels for a ratio column (% of GDP), as plain strings."""
+    categories = categorize(ratios, tiers)['Debt Category']
+    # Let pandas infer the string dtype it would give a column of literal labels
+    return pd.Series(categories.to_numpy(dtype=object), index=categories.index, name=categories.name)
@@ -0,0 +1,317 @@
+import os
+import argparse
+import time
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+
+from debt_categories import DEBT_TIERS
+from figure_theme import LIGHT_THEME
+from render_scheduler import FigureJob
+
+# Debt dynamics: d[t+1] = d[t] * (1 + i) / (1 + g) - pb, with debt d and the
+# primary balance pb in % of GDP, i the nominal effective interest rate and g
+# nominal GDP growth. Every country and path advances together as one
+# country x path array per year; blocks of paths run in a process pool and are
+# reduced to fixed-width debt histograms and threshold counts, so memory stays
+# bounded by the block size whatever the number of paths.
+HORIZON = 10
+PATHS = 10000
+BLOCK_PATHS = 2000  # paths per worker task
+HISTORY_YEARS = 20  # years of growth and inflation the shocks are estimated from
+MIN_HISTORY = 5
+REAL_RATE = float(os.environ.get('DEBT_SIM_REAL_RATE', 2.0))  # real effective interest rate (%)
+RATE_STD = 1.0  # yearly shock to the real rate (pp)
+PRIMARY_BALANCE_STD = 1.0  # yearly shock to the primary balance (pp of GDP)
+# Debt thresholds whose crossing probability is reported: the High (>90%) and Critical (>200%) tiers
+THRESHOLD_TIERS = [tier for tier in DEBT_TIERS if tier.risk in ('high', 'critical')]
+THRESHOLDS = tuple(tier.lower for tier in THRESHOLD_TIERS)
+QUANTILES = (0.05, 0.25, 0.5, 0.75, 0.95)
+BIN_WIDTH = 0.5  # debt histogram resolution (pp of GDP)
+DEBT_CAP = 600  # paths above this share the histogram's last bin
+# Draws are clipped so a hyperinflation history cannot produce a negative price level
+GROWTH_RANGE = (-50.0, 50.0)
+INFLATION_RANGE = (-50.0, 1000.0)
+
+# Generated table, kept next to the data store (data/ is not tracked)
+OUTPUT_CSV = os.path.join('data', 'debt_sustainability.csv')
+FAN_COUNTRIES = ['USA', 'CHN', 'JPN', 'DEU', 'IND', 'GBR', 'FRA', 'ITA', 'BRA', 'CAN',
+                 'BGD', 'PAK', 'EGY', 'TUR', 'IDN', 'NGA']
+FAN_HISTORY_YEARS = 15
+
+# Columns of the parameter frame, in the order the workers receive them
+PARAMETERS = ['debt', 'base_year', 'growth', 'growth_std', 'inflation', 'inflation_std', 'correlation',
+              'real_rate', 'primary_balance']
+
+Simulation = namedtuple('Simulation', ['parameters', 'horizon', 'paths', 'histogram', 'crossings', 'thresholds'])
+
+def _last_observed(matrix, years):
+    """(last value, its year) per row of a country x year matrix."""
+    observed = ~np.isnan(matrix)
+    last = matrix.shape[1] - 1 - np.argmax(observed[:, ::-1], axis=1)
+    rows = np.arange(matrix.shape[0])
+    return np.where(observed.any(axis=1), matrix[rows, last], np.nan), years[last]
+
+def _recent(matrix, end_positions, years):
+    """Matrix with everything outside the years up to each row's end position masked."""
+    steps = np.arange(matrix.shape[1])
+    window = (steps <= end_positions[:, None]) & (steps > end_positions[:, None] - years)
+    return np.where(window, matrix, np.nan)
+
+def country_parameters(panel, history_years=HISTORY_YEARS, real_rate=REAL_RATE):
+    """Per-country starting debt and shock distributions from the panel (one row per country).
+
+    Growth and inflation are centred on their recent medians with their
+    recent spread and correlation. The primary balance is the panel's
+    GGXONLB_NGDP if present, otherwise the one implied by the last five years
+    of debt under real_rate. Countries with too little history get the
+    cross-country median.
+    """
+    debt = panel.matrix('GGXWDG_NGDP')
+    has_debt = ~np.isnan(debt).all(axis=1)
+    debt = debt[has_debt]
+    countries = [c for c, keep in zip(panel.countries, has_debt) if keep]
+    base, base_year = _last_observed(debt, panel.years)
+    end = np.searchsorted(panel.years, base_year)
+
+    growth = _recent(panel.matrix('NGDP_RPCH')[has_debt], end, history_years)
+    inflation = _recent(panel.matrix('PCPIPCH')[has_debt], end, history_years)
+    enough = ((~np.isnan(growth) & ~np.isnan(inflation)).sum(axis=1) >= MIN_HISTORY)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        frame = pd.DataFrame({
+            'debt': base,
+            'base_year': base_year,
+            'growth': np.nanmedian(growth, axis=1),
+            'growth_std': np.nanstd(growth, axis=1),
+            'inflation': np.nanmedian(inflation, axis=1),
+            'inflation_std': np.nanstd(inflation, axis=1),
+        }, index=pd.Index(countries, name='country_code'))
+        both = ~(np.isnan(growth) | np.isnan(inflation))
+        dg = np.where(both, growth - np.nanmean(np.where(both, growth, np.nan), axis=1, keepdims=True), 0.0)
+        dp = np.where(both, inflation - np.nanmean(np.where(both, inflation, np.nan), axis=1, keepdims=True), 0.0)
+        frame['correlation'] = (dg * dp).sum(axis=1) / np.sqrt((dg * dg).sum(axis=1) * (dp * dp).sum(axis=1))
+        frame['real_rate'] = real_rate
+
+        if 'GGXONLB_NGDP' in panel.indicators:
+            primary, _ = _last_observed(panel.matrix('GGXONLB_NGDP')[has_debt], panel.years)
+        else:
+            # pb[t] = d[t-1] * (1 + r) / (1 + g[t]) - d[t], inflation passing through to interest
+            implied = debt[:, :-1] * (1 + real_rate / 100) / (1 + panel.matrix('NGDP_RPCH')[has_debt, 1:] / 100) - debt[:, 1:]
+            primary = np.nanmedian(_recent(implied, end - 1, 5), axis=1)
+        frame['primary_balance'] = np.clip(primary, -10, 10)
+
+    estimated = ['growth', 'growth_std', 'inflation', 'inflation_std', 'correlation']
+    frame.loc[~enough, estimated] = np.nan
+    frame = frame.fillna(frame.median(numeric_only=True))
+    frame['correlation'] = frame['correlation'].clip(-0.99, 0.99)
+    frame['country'] = [panel.names.get(code, code) for code in countries]
+    return frame
+
+def _bins():
+    return int(DEBT_CAP / BIN_WIDTH) + 1
+
+def _simulate_block(parameters, horizon, paths, thresholds, seed):
+    """Debt histograms (country x year x bin) and threshold crossing counts for one block of paths."""
+    rng = np.random.default_rng(seed)
+    p = {name: parameters[:, i, None].astype(np.float32) for i, name in enumerate(PARAMETERS)}
+    countries, bins = parameters.shape[0], _bins()
+    rows = np.arange(countries, dtype=np.int64)[:, None] * bins
+    independent = np.sqrt(1 - p['correlation'] ** 2)
+    # Interest reacts to expected inflation only, so inflation surprises erode the debt
+    expected_rate = (1 + p['real_rate'] / 100) * (1 + p['inflation'] / 100)
+
+    debt = np.repeat(p['debt'], paths, axis=1)
+    # Highest projected debt; the observed starting level does not count as a crossing
+    peak = np.full_like(debt, -np.inf)
+    histogram = np.zeros((countries, horizon, bins), dtype=np.int32)
+    for t in range(horizon):
+        z = rng.standard_normal((4, countries, paths), dtype=np.float32)
+        growth = np.clip(p['growth'] + p['growth_std'] * z[0], *GROWTH_RANGE)
+        inflation = np.clip(p['inflation'] + p['inflation_std'] * (p['correlation'] * z[0] + independent * z[1]),
+                            *INFLATION_RANGE)
+        rate = expected_rate + RATE_STD / 100 * z[2] * (1 + p['inflation'] / 100)
+        nominal_growth = (1 + growth / 100) * (1 + inflation / 100)
+        primary = p['primary_balance'] + PRIMARY_BALANCE_STD * z[3]
+        debt = np.maximum(debt * rate / nominal_growth - primary, 0)
+        np.maximum(peak, debt, out=peak)
+        index = rows + np.minimum(debt / BIN_WIDTH, bins - 1).astype(np.int64)
+        histogram[:, t] = np.bincount(index.ravel(), minlength=countries * bins).reshape(countries, bins)
+    crossings = (peak[:, :, None] > np.asarray(thresholds, dtype=np.float32)).sum(axis=1)
+    return histogram, crossings
+
+def simulate(parameters, horizon=HORIZON, paths=PATHS, thresholds=THRESHOLDS, seed=0, max_workers=None):
+    """Run paths stochastic debt paths per country over horizon years.
+
+    Blocks of paths are independent (SeedSequence.spawn) and run in a process
+    pool; a run is reproducible for a given seed and block size.
+    """
+    values = parameters[PARAMETERS].to_numpy(dtype=float)
+    blocks = [min(BLOCK_PATHS, paths - start) for start in range(0, paths, BLOCK_PATHS)]
+    seeds = np.random.SeedSequence(seed).spawn(len(blocks))
+    args = (values, horizon)
+    histogram = np.zeros((len(values), horizon, _bins()), dtype=np.int64)
+    crossings = np.zeros((len(values), len(thresholds)), dtype=np.int64)
+
+    max_workers = max_workers or os.cpu_count() or 1
+    if max_workers == 1 or len(blocks) == 1:
+        results = (_simulate_block(*args, size, thresholds, s) for size, s in zip(blocks, seeds))
+        for block_histogram, block_crossings in results:
+            histogram += block_histogram
+            crossings += block_crossings
+    else:
+        with ProcessPoolExecutor(max_workers=min(max_workers, len(blocks))) as executor:
+            futures = [executor.submit(_simulate_block, *args, size, thresholds, s) for size, s in zip(blocks, seeds)]
+            for future in futures:
+                block_histogram, block_crossings = future.result()
+                histogram += block_histogram
+                crossings += block_crossings
+    return Simulation(parameters, horizon, paths, histogram, crossings, tuple(thresholds))
+
+def quantiles(simulation, probabilities=QUANTILES):
+    """Debt quantiles (country x year x probability), interpolated within histogram bins."""
+    counts = simulation.histogram
+    cumulative = np.cumsum(counts, axis=-1)
+    result = np.empty(counts.shape[:2] + (len(probabilities),))
+    for k, probability in enumerate(probabilities):
+        target = probability * simulation.paths
+        position = np.minimum((cumulative < target).sum(axis=-1, keepdims=True), counts.shape[-1] - 1)
+        below = np.take_along_axis(cumulative, position, axis=-1) - np.take_along_axis(counts, position, axis=-1)
+        within = np.take_along_axis(counts, position, axis=-1)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            fraction = np.where(within > 0, (target - below) / within, 0.0)
+        result[:, :, k] = ((position + fraction) * BIN_WIDTH)[..., 0]
+    return np.minimum(result, DEBT_CAP)
+
+def fan_frame(simulation, probabilities=QUANTILES):
+    """Long frame of projected quantiles: country_code, year, then one column per probability."""
+    q = quantiles(simulation, probabilities)
+    countries, horizon = q.shape[:2]
+    base_years = simulation.parameters['base_year'].to_numpy()
+    frame = pd.DataFrame({
+        'country_code': np.repeat(simulation.parameters.index, horizon),
+        'year': (base_years[:, None] + np.arange(1, horizon + 1)).ravel(),
+    })
+    for k, probability in enumerate(probabilities):
+        frame[f"q{round(probability * 100):02d}"] = q[:, :, k].ravel().round(1)
+    return frame
+
+def crossing_table(simulation):
+    """Per-country starting debt, end-of-horizon median and band, and threshold crossing probabilities."""
+    q = quantiles(simulation, (0.05, 0.5, 0.95))
+    parameters = simulation.parameters
+    table = pd.DataFrame({
+        'Country': parameters['country'],
+        'Base Year': parameters['base_year'].astype(int),
+        'Debt-to-GDP (%)': parameters['debt'].round(1),
+        'Median End (%)': q[:, -1, 1].round(1),
+        'P5 End (%)': q[:, -1, 0].round(1),
+        'P95 End (%)': q[:, -1, 2].round(1),
+    }, index=parameters.index)
+    for k, threshold in enumerate(simulation.thresholds):
+        table[f"P(>{threshold}%)"] = (simulation.crossings[:, k] / simulation.paths).round(3)
+    return table.sort_values([f"P(>{t}%)" for t in simulation.thresholds][::-1], ascending=False)
+
+def write_table(table, path=OUTPUT_CSV):
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    table.to_csv(tmp_path)
+    os.replace(tmp_path, path)
+    print(f"Wrote {len(table)} countries to {path}")
+
+def build_debt_fan_chart(fan, history, names):
+    """Projected debt fan (5-95% and 25-75% bands, median) with a country dropdown."""
+    fig = go.Figure()
+    countries = list(dict.fromkeys(fan['country_code']))
+    traces_per_country = 6
+    for n, code in enumerate(countries):
+        rows = fan[fan['country_code'] == code]
+        past = history.loc[code].dropna()
+        visible = n == 0
+        for low, high, opacity in (('q05', 'q95', 0.15), ('q25', 'q75', 0.3)):
+            fig.add_trace(go.Scatter(x=rows['year'], y=rows[low], mode='lines', line=dict(width=0),
+                                     hoverinfo='skip', showlegend=False, visible=visible))
+            fig.add_trace(go.Scatter(x=rows['year'], y=rows[high], mode='lines', line=dict(width=0),
+                                     fill='tonexty', fillcolor=f'rgba(211, 47, 47, {opacity})',
+                                     name=f"{low[1:]}-{high[1:]}% of paths", visible=visible,
+                                     hovertemplate='%{x}: %{y:.1f}%<extra></extra>'))
+        fig.add_trace(go.Scatter(x=rows['year'], y=rows['q50'], mode='lines', line=dict(color='#d32f2f', width=2),
+                                 name='Median path', visible=visible, hovertemplate='%{x}: %{y:.1f}%<extra></extra>'))
+        fig.add_trace(go.Scatter(x=past.index, y=past.values, mode='lines', line=dict(color='#1f77b4', width=2),
+                                 name='History', visible=visible, hovertemplate='%{x}: %{y:.1f}%<extra></extra>'))
+
+    buttons = []
+    for n, code in enumerate(countries):
+        visibility = [n == k // traces_per_country for k in range(len(countries) * traces_per_country)]
+        buttons.append(dict(label=names.get(code, code), method='update',
+                            args=[{'visible': visibility}, {'title': f"Debt-to-GDP Projection: {names.get(code, code)}"}]))
+    for tier in THRESHOLD_TIERS:
+        fig.add_hline(y=tier.lower, line=dict(color=tier.color, dash='dash', width=1),
+                      annotation_text=f"{tier.lower}%", annotation_position='top left')
+    fig.update_layout(
+        template=LIGHT_THEME,
+        title=f"Debt-to-GDP Projection: {names.get(countries[0], countries[0])}",
+        xaxis_title='Year',
+        yaxis_title='Debt-to-GDP Ratio (%)',
+        updatemenus=[dict(buttons=buttons, x=1, xanchor='right', y=1.15, yanchor='top')],
+        legend=dict(orientation='h', y=-0.2)
+    )
+    return fig
+
+def build_crossing_table(table):
+    """Table of the probability of crossing each threshold within the horizon."""
+    columns = ['Country'] + [c for c in table.columns if c != 'Country']
+    formats = [None, 'd', '.1f', '.1f', '.1f', '.1f'] + ['.1%'] * (len(columns) - 6)
+    fig = go.Figure(go.Table(
+        header=dict(values=[f"<b>{c}</b>" for c in columns], align='left'),
+        cells=dict(values=[table[c] for c in columns], format=formats, align='left')
+    ))
+    fig.update_layout(template=LIGHT_THEME, title='Probability of Crossing Debt Thresholds')
+    return fig
+
+def simulation_figure_jobs(simulation, panel, countries=FAN_COUNTRIES):
+    """Figure jobs for the fan chart and crossing table of a simulation run."""
+    fan = fan_frame(simulation)
+    fan = fan[fan['country_code'].isin(countries)]
+    fan = fan.iloc[np.argsort([countries.index(c) for c in fan['country_code']], kind='stable')]
+    debt = panel.matrix('GGXWDG_NGDP')
+    history = pd.DataFrame(debt, index=panel.countries, columns=panel.years).loc[
+        fan['country_code'].unique()]
+    history = history.loc[:, (history.columns > history.columns.max() - FAN_HISTORY_YEARS)]
+    names = simulation.parameters['country'].to_dict()
+    return [
+        FigureJob("debt_fan_chart.html", build_debt_fan_chart, (fan, history, names)),
+        FigureJob("debt_crossing_table.html", build_crossing_table, (crossing_table(simulation),)),
+    ]
+
+def run(panel, horizon=HORIZON, paths=PATHS, seed=0, max_workers=None, force=False):
+    """Simulate every country, write the crossing table CSV and render the figures."""
+    from plot_utils import check_output_dir
+    from render_scheduler import render_jobs
+
+    start = time.perf_counter()
+    parameters = country_parameters(panel)
+    simulation = simulate(parameters, horizon, paths, seed=seed, max_workers=max_workers)
+    print(f"Simulated {len(parameters)} countries x {paths} paths x {horizon} years "
+          f"in {time.perf_counter() - start:.2f}s")
+    table = crossing_table(simulation)
+    write_table(table)
+    print(table.head(15).to_string())
+    check_output_dir()
+    render_jobs(simulation_figure_jobs(simulation, panel), max_workers=1, force=force)
+    return simulation
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Monte Carlo debt-dynamics simulation over the IMF panel.")
+    parser.add_argument('--source', default='imf', help='data store source (default: imf)')
+    parser.add_argument('--horizon', type=int, default=HORIZON, help='years to project')
+    parser.add_argument('--paths', type=int, default=PATHS, help='stochastic paths per country')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--workers', type=int, default=None, help='simulation processes (default: one per CPU)')
+    parser.add_argument('--force', action='store_true', help='rewrite the figures even if unchanged')
+    args = parser.parse_args()
+
+    from data_store import load_panel
+    run(load_panel(args.source), args.horizon, args.paths, args.seed, args.workers, args.force)
@@ -0,0 +1,147 @@
+import base64
+
+import numpy as np
+
+# Animation frames shipped as deltas. A figure carries, in layout.meta.deltaFrames,
+# each animated series (one value per item, e.g. per country) as its first year
+# plus, for every later year, only the items whose value changed. The page
+# rebuilds the full frames once with Plotly.addFrames, so the payload grows with
+# the number of changes rather than with years x items.
+META_KEY = 'deltaFrames'
+
+# numpy dtype -> plotly.js typed-array code (the same {dtype, bdata} layout as compact_json)
+DTYPE_CODES = {np.dtype(np.float32): 'f4', np.dtype(np.uint8): 'u1', np.dtype(np.uint16): 'u2',
+               np.dtype(np.uint32): 'u4'}
+CODE_DTYPES = {code: dtype for dtype, code in DTYPE_CODES.items()}
+
+def _typed(values, dtype):
+    arr = np.ascontiguousarray(values, dtype=dtype)
+    return {'dtype': DTYPE_CODES[arr.dtype], 'bdata': base64.b64encode(arr).decode('ascii')}
+
+def _untyped(spec):
+    return np.frombuffer(base64.b64decode(spec['bdata']), dtype=CODE_DTYPES[spec['dtype']])
+
+def _index_dtype(size):
+    return np.uint8 if size <= 256 else np.uint16 if size <= 65536 else np.uint32
+
+def encode_series(matrix, dtype=np.float32):
+    """Delta-encode an items x years matrix: the first year, then per year the changed items.
+
+    offsets[t] is where year t's changes start in index/values (year 0 has none);
+    NaN counts as a value, so an item that stays missing is not repeated.
+    """
+    matrix = np.asarray(matrix, dtype=dtype)
+    previous, current = matrix[:, :-1], matrix[:, 1:]
+    same = previous == current
+    if matrix.dtype.kind == 'f':
+        same |= np.isnan(previous) & np.isnan(current)
+    changed = ~same.T  # years-1 x items, so nonzero() runs year by year
+    years, items = np.nonzero(changed)
+    offsets = np.concatenate([[0, 0], np.cumsum(changed.sum(axis=1))])
+    return {
+        'base': _typed(matrix[:, 0], dtype),
+        'offsets': _typed(offsets, np.uint32),
+        'index': _typed(items, _index_dtype(matrix.shape[0])),
+        'values': _typed(current.T[changed], dtype),
+    }
+
+def decode_series(encoded):
+    """Full items x years matrix from encode_series output."""
+    state = _untyped(encoded['base']).copy()
+    offsets, index, values = (_untyped(encoded[key]) for key in ('offsets', 'index', 'values'))
+    columns = [state.copy()]
+    for year in range(1, len(offsets) - 1):
+        start, end = offsets[year], offsets[year + 1]
+        state[index[start:end]] = values[start:end]
+        columns.append(state.copy())
+    return np.column_stack(columns)
+
+def delta_frames_meta(years, series, traces, ranking=None):
+    """layout.meta entry describing the frames.
+
+    series maps a name to an encode_series() result; traces lists
+    {'trace': position, <attribute>: <series name>, ...} updates per frame, and
+    ranking optionally turns a series into a sorted top-N bar trace
+    ({'trace', 'series', 'labels', 'size', 'colorSeries', 'palette'}).
+    """
+    meta = {'years': [int(y) for y in years], 'series': series, 'traces': traces}
+    if ranking is not None:
+        meta['ranking'] = ranking
+    return meta
+
+def has_delta_frames(fig):
+    """True if a figure (or figure dict) carries delta-encoded frames."""
+    layout = fig['layout'] if isinstance(fig, dict) else fig.layout.to_plotly_json()
+    meta = layout.get('meta')
+    return isinstance(meta, dict) and META_KEY in meta
+
+# Defines expandDeltaFrames(gd): decodes the series, replays the deltas year by
+# year and registers one frame per year. Missing values (NaN, or 0 for integer
+# series such as category codes) become null so plotly leaves the item blank.
+EXPAND_SCRIPT = """
+function expandDeltaFrames(gd) {
+    var spec = gd.layout.meta && gd.layout.meta.%(key)s;
+    if (!spec || gd._deltaFramesExpanded) {
+        return;
+    }
+    gd._deltaFramesExpanded = true;
+    var types = {f4: Float32Array, u1: Uint8Array, u2: Uint16Array, u4: Uint32Array};
+    function decode(a) {
+        var bin = atob(a.bdata), bytes = new Uint8Array(bin.length);
+        for (var i = 0; i < bin.length; i++) {
+            bytes[i] = bin.charCodeAt(i);
+        }
+        return new types[a.dtype](bytes.buffer);
+    }
+    function present(v, isFloat) {
+        return isFloat ? !isNaN(v) : v !== 0;
+    }
+    var series = {};
+    Object.keys(spec.series).forEach(function (name) {
+        var s = spec.series[name];
+        series[name] = {state: Array.from(decode(s.base)), offsets: decode(s.offsets), index: decode(s.index),
+                        values: decode(s.values), isFloat: s.base.dtype === 'f4'};
+    });
+    function snapshot(s) {
+        return s.state.map(function (v) { return present(v, s.isFloat) ? v : null; });
+    }
+    var frames = [];
+    spec.years.forEach(function (year, t) {
+        var data = [], traces = [];
+        Object.keys(series).forEach(function (name) {
+            var s = series[name];
+            for (var k = s.offsets[t]; k < s.offsets[t + 1]; k++) {
+                s.state[s.index[k]] = s.values[k];
+            }
+        });
+        spec.traces.forEach(function (update) {
+            var trace = {};
+            Object.keys(update).forEach(function (attr) {
+                if (attr !== 'trace') {
+                    trace[attr] = snapshot(series[update[attr]]);
+                }
+            });
+            data.push(trace);
+            traces.push(update.trace);
+        });
+        if (spec.ranking) {
+            var r = spec.ranking, s = series[r.series], colors = series[r.colorSeries];
+            var order = s.state.map(function (v, i) { return i; })
+                .filter(function (i) { return present(s.state[i], s.isFloat); })
+                .sort(function (a, b) { return s.state[b] - s.state[a]; })
+                .slice(0, r.size);
+            data.push({
+                x: order.map(function (i) { return s.state[i]; }),
+                y: order.map(function (i) { return r.labels[i]; }),
+                marker: {color: order.map(function (i) { return r.palette[colors.state[i]]; })}
+            });
+            traces.push(r.trace);
+        }
+        frames.push({name: String(year), data: data, traces: traces});
+    });
+    return Plotly.addFrames(gd, frames);
+}
+""" % {'key': META_KEY}
+
+# Standalone pages: runs after the plot is created; {plot_id} is the figure div
+POST_SCRIPT = EXPAND_SCRIPT + "expandDeltaFrames(document.getElementById('{plot_id}'));"
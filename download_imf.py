@@ -1,29 +1,175 @@
 import requests
 import json
 import os
+import argparse
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
-def download_data():
+from instrumentation import stage
+
+IMF_API_URL = os.environ.get('IMF_API_URL', "https://www.imf.org/external/datamapper/api/v1")
+
+# Datamapper indicators to fetch; the debt series keeps its historical file name
+INDICATORS = {
+    'GGXWDG_NGDP': "imf_debt_data.json",  # General government gross debt (% of GDP)
+    'NGDPD': "imf_ngdpd.json",            # GDP, current prices (USD billions)
+    'NGDP_RPCH': "imf_ngdp_rpch.json",    # Real GDP growth (%)
+    'PCPIPCH': "imf_pcpipch.json",        # Inflation, average consumer prices (%)
+}
+COUNTRIES_FILE = "imf_countries.json"
+CACHE_FILE = "imf_http_cache.json"
+
+MAX_WORKERS = 8
+TIMEOUT = (10, 60)  # connect, read (seconds)
+CHUNK_SIZE = 1 << 16
+
+def create_session(retries=5, backoff_factor=0.5, pool_size=MAX_WORKERS):
+    """Pooled session that retries connection errors and 429/5xx responses with backoff."""
+    retry = Retry(
+        total=retries,
+        backoff_factor=backoff_factor,
+        status_forcelist=[429, 500, 502, 503, 504],
+        allowed_methods=['GET'],
+        respect_retry_after_header=True,
+    )
+    adapter = HTTPAdapter(max_retries=retry, pool_connections=pool_size, pool_maxsize=pool_size)
+    session = requests.Session()
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    # Use a user agent to avoid 403/405 if possible, though API should be open
+    session.headers.update({'User-Agent': 'Mozilla/5.0', 'Accept-Encoding': 'gzip, deflate'})
+    return session
+
+def load_cache():
+    """Validators (ETag / Last-Modified) of previously downloaded files, keyed by URL."""
+    if not os.path.exists(CACHE_FILE):
+        return {}
     try:
-        print("Downloading IMF Debt Data...")
-        url = "https://www.imf.org/external/datamapper/api/v1/GGXWDG_NGDP"
-        # Use a user agent to avoid 403/405 if possible, though API should be open
-        headers = {'User-Agent': 'Mozilla/5.0'}
-        r = requests.get(url, headers=headers)
-        r.raise_for_status()
-        with open("imf_debt_data.json", "w", encoding='utf-8') as f:
-            f.write(r.text)
-        print("Debt data saved.")
+        with open(CACHE_FILE, "r", encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def save_cache(cache):
+    """Write the validator cache atomically."""
+    tmp_path = f"{CACHE_FILE}.{os.getpid()}.tmp"
+    with open(tmp_path, "w", encoding='utf-8') as f:
+        json.dump(cache, f, indent=2, sort_keys=True)
+    os.replace(tmp_path, CACHE_FILE)
+
+class PartialDownloadError(Exception):
+    """A transfer was interrupted; the .part file holds the bytes received so far."""
+
+    def __init__(self, error, etag):
+        super().__init__(str(error))
+        self.etag = etag
+
+def download_file(session, url, path, cached=None):
+    """Fetch url into path; returns (status, validators).
+
+    status is 'not modified' when the cached copy is still valid (304),
+    'resumed' when a previous partial download was completed with a Range
+    request, or 'downloaded'. The file only appears at path once complete.
+    """
+    cached = cached or {}
+    part_path = f"{path}.part"
+    headers = {}
 
-        print("Downloading IMF Country Metadata...")
-        url_countries = "https://www.imf.org/external/datamapper/api/v1/countries"
-        r = requests.get(url_countries, headers=headers)
+    if os.path.exists(path) and not os.path.exists(part_path):
+        if cached.get('etag'):
+            headers['If-None-Match'] = cached['etag']
+        if cached.get('last_modified'):
+            headers['If-Modified-Since'] = cached['last_modified']
+
+    # Resume an interrupted download only if it is still the same representation.
+    # Byte ranges refer to the encoded body, so resumable transfers are uncompressed.
+    offset = os.path.getsize(part_path) if os.path.exists(part_path) else 0
+    if offset and cached.get('partial_etag'):
+        headers['Range'] = f"bytes={offset}-"
+        headers['If-Range'] = cached['partial_etag']
+        headers['Accept-Encoding'] = 'identity'
+
+    with session.get(url, headers=headers, timeout=TIMEOUT, stream=True) as r:
+        if r.status_code == 304:
+            return 'not modified', cached
+        if r.status_code == 416:
+            os.remove(part_path)
         r.raise_for_status()
-        with open("imf_countries.json", "w", encoding='utf-8') as f:
-            f.write(r.text)
-        print("Country data saved.")
-        
-    except Exception as e:
-        print(f"Error downloading: {e}")
+
+        resumed = r.status_code == 206 and offset > 0
+        if resumed and not r.headers.get('Content-Range', '').startswith(f"bytes {offset}-"):
+            os.remove(part_path)
+            raise ValueError(f"Unexpected Content-Range for {url}: {r.headers.get('Content-Range')}")
+        validators = {
+            'etag': r.headers.get('ETag') or (cached.get('partial_etag') if resumed else None),
+            'last_modified': r.headers.get('Last-Modified'),
+        }
+
+        # Only an uncompressed, validated body can be resumed later
+        resumable_etag = validators['etag'] if r.headers.get('Content-Encoding', 'identity') == 'identity' else None
+        try:
+            with open(part_path, "ab" if resumed else "wb") as f:
+                for chunk in r.iter_content(CHUNK_SIZE):
+                    f.write(chunk)
+        except (requests.RequestException, OSError) as e:
+            raise PartialDownloadError(e, resumable_etag) from e
+
+    os.replace(part_path, path)
+    return ('resumed' if resumed else 'downloaded'), validators
+
+def download_data(indicators=None, base_url=None, max_workers=MAX_WORKERS, session=None, on_complete=None):
+    """Download the datamapper indicators and country metadata concurrently.
+
+    Returns {path: status} for every requested file; failures are reported
+    and leave any previous copy of the file untouched. on_complete(path, status)
+    is called as soon as each file is settled, while the others are still in flight.
+    """
+    indicators = INDICATORS if indicators is None else indicators
+    base_url = (base_url or IMF_API_URL).rstrip('/')
+    targets = {f"{base_url}/{code}": path for code, path in indicators.items()}
+    targets[f"{base_url}/countries"] = COUNTRIES_FILE
+
+    session = session or create_session(pool_size=max_workers)
+    cache = load_cache()
+    results = {}
+
+    def fetch(url, path):
+        entry = cache.get(url, {})
+        try:
+            with stage('download', path=path) as span:
+                status, validators = download_file(session, url, path, entry)
+                span['result'] = status
+                if status != 'not modified':
+                    span['bytes'] = os.path.getsize(path)
+            return url, path, status, validators, None
+        except PartialDownloadError as e:
+            # Remember the partial download's ETag so the next run can resume it
+            return url, path, 'failed', dict(entry, partial_etag=e.etag), e
+        except Exception as e:
+            return url, path, 'failed', entry, e
+
+    print(f"Downloading {len(targets)} IMF datasets...")
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = [executor.submit(fetch, url, path) for url, path in targets.items()]
+        for future in as_completed(futures):
+            url, path, status, validators, error = future.result()
+            results[path] = status
+            if error is not None:
+                cache[url] = validators
+                print(f"  Error downloading {url}: {error}")
+            else:
+                cache[url] = {k: v for k, v in validators.items() if v and k != 'partial_etag'}
+                print(f"  {path}: {status}")
+            if on_complete is not None:
+                on_complete(path, status)
+
+    save_cache(cache)
+    return results
 
 if __name__ == "__main__":
-    download_data()
+    parser = argparse.ArgumentParser(description="Download IMF datamapper indicators.")
+    parser.add_argument('--base-url', default=None, help=f"datamapper API root (default: {IMF_API_URL})")
+    parser.add_argument('--workers', type=int, default=MAX_WORKERS, help="concurrent downloads")
+    args = parser.parse_args()
+    download_data(base_url=args.base_url, max_workers=args.workers)
@@ -0,0 +1,49 @@
+import functools
+
+import plotly.graph_objects as go
+import plotly.io as pio
+from plotly.subplots import make_subplots
+
+# Layout every dashboard figure shares. It is registered once per process as a
+# plotly template, so figures name the theme instead of re-validating the same
+# layout dict on every build.
+THEME_LAYOUT = dict(
+    autosize=True,
+    margin=dict(l=10, r=10, t=30, b=10),
+    title_font_size=14,
+    font=dict(size=10)
+)
+DARK_BACKGROUND = '#1e1e1e'
+
+LIGHT_THEME = 'dashboard_light'
+DARK_THEME = 'dashboard_dark'
+
+# Theme name -> (base plotly template, layout applied on top)
+THEMES = {
+    LIGHT_THEME: ('plotly_white', THEME_LAYOUT),
+    DARK_THEME: ('plotly_dark', dict(THEME_LAYOUT, paper_bgcolor=DARK_BACKGROUND, plot_bgcolor=DARK_BACKGROUND)),
+}
+
+def register_themes():
+    """Register the dashboard themes with plotly.io (once per process)."""
+    for name, (base, layout) in THEMES.items():
+        if name not in pio.templates:
+            template = go.layout.Template(pio.templates[base])
+            template.layout.update(layout)
+            pio.templates[name] = template
+
+register_themes()
+
+def themed_figure(*traces, theme=LIGHT_THEME):
+    """Empty (or trace-seeded) figure with the theme applied at construction."""
+    return go.Figure(data=list(traces), layout=dict(template=theme))
+
+@functools.lru_cache(maxsize=None)
+def _dual_axis_skeleton(theme):
+    fig = make_subplots(specs=[[{"secondary_y": True}]])
+    fig.update_layout(template=theme)
+    return fig
+
+def dual_axis_figure(theme=LIGHT_THEME):
+    """Secondary-y figure cloned from a cached, prebuilt skeleton."""
+    return go.Figure(_dual_axis_skeleton(theme))
@@ -1,30 +1,63 @@
+import numpy as np
 import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
-from plotly.subplots import make_subplots
-import os
+from data_store import Column, melt_time_series, read_time_series
+from figure_theme import DARK_THEME, dual_axis_figure, themed_figure
+from instrumentation import stage
+from macro_math import rebase
+from plot_utils import check_output_dir
+from render_scheduler import FigureJob, build_arg_parser, render_jobs
 
-def check_output_dir():
-    """Ensure the interactive_plots directory exists."""
-    if not os.path.exists('interactive_plots'):
-        os.makedirs('interactive_plots')
+# Store indicators and dtypes behind each dataset
+M2_COLUMNS = {'M2 (Billions)': Column('M2_USD', 'int64')} # country USA
+OIL_GOLD_COLUMNS = {'Oil (USD/bbl)': Column('OIL_USD'), 'Gold (USD/oz)': Column('GOLD_USD', 'int64')} # country WLD
+PURCHASING_POWER_COLUMNS = {'Purchasing Power': Column('PURCHASING_POWER_1913')} # country USA
 
-def analyze_financial_history():
-    """Generate interactive visualizations for Financial History Dashboard."""
-    check_output_dir()
-    
-    print("Generating M2 Money Supply Plot...")
-    
-    # 1. US M2 Money Supply (Billions USD)
+def create_m2_dataframe():
+    """US M2 Money Supply (Billions USD)."""
+    df = read_time_series('financial_history', 'USA', M2_COLUMNS)
+    if df is not None:
+        return df
     # Extrapolated data back to 1914 for context
     m2_years = [1914, 1929, 1939, 1945, 1950, 1960, 1970, 1980, 1990, 2000, 2010, 2020, 2025]
     m2_values = [15, 26, 46, 110, 150, 290, 627, 1600, 3284, 4942, 8779, 19392, 22298]
-    
-    df_m2 = pd.DataFrame({'Year': m2_years, 'M2 (Billions)': m2_values})
-    
-    fig_m2 = go.Figure()
+
+    return pd.DataFrame({'Year': m2_years, 'M2 (Billions)': m2_values})
+
+def create_oil_gold_dataframe():
+    """Crude Oil vs Gold prices (1970-2025)."""
+    df = read_time_series('financial_history', 'WLD', OIL_GOLD_COLUMNS)
+    if df is not None:
+        return df
+    # Data Sources: Macrotrends, EIA
+    years = [1970, 1975, 1980, 1985, 1990, 1995, 2000, 2005, 2010, 2015, 2020, 2023, 2025]
+    oil_prices = [3.86, 7.67, 36.8, 27.5, 24.5, 18.4, 30.3, 56.6, 79.6, 48.7, 39.7, 77.7, 76.0]
+    gold_prices = [36, 160, 615, 317, 383, 384, 279, 444, 1224, 1160, 1769, 1940, 3380]
+
+    return pd.DataFrame({
+        'Year': years,
+        'Oil (USD/bbl)': oil_prices,
+        'Gold (USD/oz)': gold_prices
+    })
+
+def create_purchasing_power_dataframe():
+    """Purchasing Power of $1 (1913-2025)."""
+    df = read_time_series('financial_history', 'USA', PURCHASING_POWER_COLUMNS)
+    if df is not None:
+        return df
+    # Inverse of CPI. Base 1913 = $1.00 (Fed Created)
+    pp_years = [1913, 1920, 1930, 1940, 1950, 1960, 1970, 1980, 1990, 2000, 2010, 2020, 2025]
+    # BLS CPI-U annual averages (1982-84 = 100); 2025 is an estimate
+    cpi = np.array([9.9, 20.0, 16.7, 14.0, 24.1, 29.6, 38.8, 82.4, 130.7, 172.2, 218.1, 258.8, 321.0])
+
+    return pd.DataFrame({'Year': pp_years, 'Purchasing Power': rebase(1 / cpi, pp_years, 1913).round(3)})
+
+def build_m2_supply(df_m2):
+    """US M2 Money Supply."""
+    fig_m2 = themed_figure(theme=DARK_THEME)
     fig_m2.add_trace(go.Scatter(
-        x=df_m2['Year'], 
+        x=df_m2['Year'],
         y=df_m2['M2 (Billions)'],
         mode='lines+markers',
         name='M2 Money Supply',
@@ -32,7 +65,7 @@ def analyze_financial_history():
         fill='tozeroy',
         fillcolor='rgba(46, 204, 113, 0.2)'
     ))
-    
+
     # Add annotations for key events with better spacing
     fig_m2.add_annotation(x=1914, y=20, text="Fed Created<br>(1913)", showarrow=True, arrowhead=1, ay=-40)
     fig_m2.add_annotation(x=1929, y=26, text="Great Depression", showarrow=True, arrowhead=1, ay=-60)
@@ -40,38 +73,19 @@ def analyze_financial_history():
     fig_m2.add_annotation(x=1971, y=650, text="Nixon Shock<br>(1971)", showarrow=True, arrowhead=1, ay=-60, ax=40)
     fig_m2.add_annotation(x=2008, y=8000, text="2008 Crisis<br>(QE Begins)", showarrow=True, arrowhead=1, ay=-50, ax=-50)
     fig_m2.add_annotation(x=2021, y=21000, text="Pandemic<br>Stimulus", showarrow=True, arrowhead=1, ay=40, ax=-80)
-    
+
     fig_m2.update_layout(
         title='US Money Supply Explosion (1914-2025)',
         xaxis_title='Year',
         yaxis_title='M2 ($B)',
-        template='plotly_dark',
-        paper_bgcolor='#1e1e1e',
-        plot_bgcolor='#1e1e1e',
-        autosize=True,
-        margin=dict(l=10, r=10, t=30, b=10),
-        hovermode='x unified',
-        title_font_size=14,
-        font=dict(size=10)
+        hovermode='x unified'
     )
-    fig_m2.write_html("interactive_plots/us_m2_supply.html")
-    
-    print("Generating Oil vs Gold Plot...")
-    
-    # 2. Crude Oil vs Gold (The Petrodollar Story)
-    # Data Sources: Macrotrends, EIA
-    years = [1970, 1975, 1980, 1985, 1990, 1995, 2000, 2005, 2010, 2015, 2020, 2023, 2025]
-    oil_prices = [3.86, 7.67, 36.8, 27.5, 24.5, 18.4, 30.3, 56.6, 79.6, 48.7, 39.7, 77.7, 76.0]
-    gold_prices = [36, 160, 615, 317, 383, 384, 279, 444, 1224, 1160, 1769, 1940, 3380]
-    
-    df_compare = pd.DataFrame({
-        'Year': years, 
-        'Oil (USD/bbl)': oil_prices,
-        'Gold (USD/oz)': gold_prices
-    })
-    
-    fig_compare = make_subplots(specs=[[{"secondary_y": True}]])
-    
+    return fig_m2
+
+def build_oil_vs_gold(df_compare):
+    """Crude Oil vs Gold (The Petrodollar Story)."""
+    fig_compare = dual_axis_figure(DARK_THEME)
+
     fig_compare.add_trace(
         go.Scatter(
             x=df_compare['Year'], y=df_compare['Oil (USD/bbl)'],
@@ -81,7 +95,7 @@ def analyze_financial_history():
         ),
         secondary_y=False
     )
-    
+
     fig_compare.add_trace(
         go.Scatter(
             x=df_compare['Year'], y=df_compare['Gold (USD/oz)'],
@@ -91,63 +105,70 @@ def analyze_financial_history():
         ),
         secondary_y=True
     )
-    
+
     fig_compare.update_layout(
         title='Black Gold vs Real Gold (1970-2025)',
-        template='plotly_dark',
-        paper_bgcolor='#1e1e1e',
-        plot_bgcolor='#1e1e1e',
-        autosize=True,
-        margin=dict(l=10, r=10, t=30, b=10),
         hovermode='x unified',
-        legend=dict(orientation="h", yanchor="bottom", y=-0.2, xanchor="center", x=0.5),
-        title_font_size=14,
-        font=dict(size=10)
+        legend=dict(orientation="h", yanchor="bottom", y=-0.2, xanchor="center", x=0.5)
     )
-    
+
     fig_compare.update_yaxes(title_text="Oil ($/bbl)", color='#bdc3c7', secondary_y=False)
     fig_compare.update_yaxes(title_text="Gold ($/oz)", color='#f39c12', secondary_y=True)
-    
-    fig_compare.write_html("interactive_plots/oil_vs_gold.html")
-    
-    print("Generating Purchasing Power Plot...")
-    
-    # 3. Purchasing Power of $1 (1913-2025)
-    # Inverse of CPI. Base 1913 = $1.00 (Fed Created)
-    pp_years = [1913, 1920, 1930, 1940, 1950, 1960, 1970, 1980, 1990, 2000, 2010, 2020, 2025]
-    # Calculated using CPI Inflation Calculator
-    purchasing_power = [1.00, 0.50, 0.60, 0.70, 0.42, 0.35, 0.26, 0.12, 0.08, 0.06, 0.04, 0.035, 0.03]
-    
-    fig_pp = go.Figure()
+    return fig_compare
+
+def build_purchasing_power(df_pp):
+    """Purchasing Power of $1 (1913 Base)."""
+    fig_pp = themed_figure(theme=DARK_THEME)
     fig_pp.add_trace(go.Scatter(
-        x=pp_years, 
-        y=purchasing_power,
+        x=df_pp['Year'],
+        y=df_pp['Purchasing Power'],
         mode='lines+markers',
         name='Purchasing Power',
         line=dict(color='#e74c3c', width=4),
         fill='tozeroy',
         fillcolor='rgba(231, 76, 60, 0.2)'
     ))
-    
+
     fig_pp.add_annotation(x=1913, y=1.0, text="Fed Reserve<br>(1913)", showarrow=True, arrowhead=1, ay=-40)
     fig_pp.add_annotation(x=1971, y=0.26, text="Gold End<br>(1971)", showarrow=True, arrowhead=1, ay=-40, ax=40)
-    
+
     fig_pp.update_layout(
         title='Purchasing Power of $1 (1913 Base)',
         xaxis_title='Year',
         yaxis_title='Value ($)',
-        template='plotly_dark',
-        paper_bgcolor='#1e1e1e',
-        plot_bgcolor='#1e1e1e',
-        autosize=True,
-        margin=dict(l=10, r=10, t=30, b=10),
-        yaxis_tickformat='$.2f',
-        title_font_size=14,
-        font=dict(size=10)
+        yaxis_tickformat='$.2f'
     )
-    fig_pp.write_html("interactive_plots/purchasing_power.html")
-    
+    return fig_pp
+
+def store_records():
+    """Long-format data store rows for the Financial History datasets."""
+    return [
+        melt_time_series(create_m2_dataframe(), 'financial_history', 'USA', M2_COLUMNS, 'United States'),
+        melt_time_series(create_oil_gold_dataframe(), 'financial_history', 'WLD', OIL_GOLD_COLUMNS, 'World'),
+        melt_time_series(create_purchasing_power_dataframe(), 'financial_history', 'USA',
+                         PURCHASING_POWER_COLUMNS, 'United States'),
+    ]
+
+def financial_history_figure_jobs():
+    """Independent figure jobs for the Financial History dashboard."""
+    return [
+        FigureJob("us_m2_supply.html", build_m2_supply, (create_m2_dataframe(),)),
+        FigureJob("oil_vs_gold.html", build_oil_vs_gold, (create_oil_gold_dataframe(),)),
+        FigureJob("purchasing_power.html", build_purchasing_power, (create_purchasing_power_dataframe(),)),
+    ]
+
+def analyze_financial_history(max_workers=None, force=False):
+    """Generate interactive visualizations for Financial History Dashboard."""
+    check_output_dir()
+
+    print("Generating financial history plots...")
+    with stage('load', script='financial_history_analysis'):
+        jobs = financial_history_figure_jobs()
+    results = render_jobs(jobs, max_workers=max_workers, force=force)
+
     print("Done generating financial history plots.")
+    return results
 
 if __name__ == "__main__":
-    analyze_financial_history()
+    args = build_arg_parser("Build the Financial History dashboard figures.").parse_args()
+    analyze_financial_history(max_workers=args.workers, force=args.force)
@@ -1,4 +1,5 @@
 import os
+import json
 import pandas as pd
 import matplotlib.pyplot as plt
 import seaborn as sns
@@ -18,36 +19,131 @@ SHEET_NAMES = {
     'muslim_countries': '149729867'  # Top Muslim Countries
 }
 
+# SHEET_ID is the published-to-web id used by the CSV export; the Sheets API
+# needs the spreadsheet's own id, read from the environment
+SPREADSHEET_ID = os.environ.get('SPREADSHEET_ID')
+SCOPES = [
+    'https://www.googleapis.com/auth/spreadsheets.readonly',
+    'https://www.googleapis.com/auth/drive.metadata.readonly',  # revision lookup
+]
+CSV_EXPORT_URL = 'https://docs.google.com/spreadsheets/d/e/{sheet_id}/pub?gid={gid}&single=true&output=csv'
+SHEETS_CACHE_FILE = 'sheets_cache.json'
 
-
-def get_google_sheets_service():
-    """Authenticate and return the Google Sheets API service."""
+def get_credentials():
+    """Load the service account credentials from token.json."""
     creds = None
     # The file token.json stores the user's access and refresh tokens
     if os.path.exists('token.json'):
-        creds = service_account.Credentials.from_service_account_file(
-            'token.json', 
-            scopes=['https://www.googleapis.com/auth/spreadsheets.readonly']
-        )
-    
+        creds = service_account.Credentials.from_service_account_file('token.json', scopes=SCOPES)
+
     if not creds:
         raise Exception('Failed to obtain credentials')
-    
-    return build('sheets', 'v4', credentials=creds)
+    return creds
+
+def get_google_sheets_service(creds=None):
+    """Authenticate and return the Google Sheets API service."""
+    return build('sheets', 'v4', credentials=creds or get_credentials())
 
-def get_sheet_data(service, sheet_id, range_name):
-    """Get data from a specific sheet and range."""
+def get_drive_service(creds=None):
+    """Authenticate and return the Google Drive API service (spreadsheet revisions)."""
+    return build('drive', 'v3', credentials=creds or get_credentials())
+
+def get_spreadsheet_revision(drive_service, spreadsheet_id):
+    """Current revision (Drive file version) of the spreadsheet, or None if unavailable."""
     try:
-        sheet = service.spreadsheets()
-        result = sheet.values().get(
-            spreadsheetId=SHEET_ID,
-            range=f"{sheet_id}!{range_name}"
-        ).execute()
-        return result.get('values', [])
+        meta = drive_service.files().get(fileId=spreadsheet_id, fields='version').execute()
+        return meta.get('version')
     except Exception as e:
-        print(f"Error getting data: {e}")
+        print(f"Could not read spreadsheet revision: {e}")
         return None
 
+def load_sheets_cache(cache_file=SHEETS_CACHE_FILE):
+    """Load the cached sheet values ({spreadsheet_id, revision, sheets})."""
+    if not os.path.exists(cache_file):
+        return {}
+    try:
+        with open(cache_file, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        print("Ignoring unreadable Sheets cache.")
+        return {}
+
+def save_sheets_cache(cache, cache_file=SHEETS_CACHE_FILE):
+    """Write the Sheets cache atomically."""
+    tmp_path = f"{cache_file}.{os.getpid()}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(cache, f)
+    os.replace(tmp_path, cache_file)
+
+def batch_get_sheet_data(service, spreadsheet_id, sheet_names=SHEET_NAMES):
+    """Values of every sheet in one round trip; {name: rows}.
+
+    SHEET_NAMES holds sheet ids (gids) rather than titles, so the ranges are
+    selected with batchGetByDataFilter grid ranges instead of A1 notation.
+    """
+    body = {
+        'dataFilters': [{'gridRange': {'sheetId': int(gid)}} for gid in sheet_names.values()],
+        'majorDimension': 'ROWS',
+    }
+    result = service.spreadsheets().values().batchGetByDataFilter(
+        spreadsheetId=spreadsheet_id,
+        body=body
+    ).execute()
+
+    names_by_gid = {int(gid): name for name, gid in sheet_names.items()}
+    data = {}
+    for matched in result.get('valueRanges', []):
+        for data_filter in matched.get('dataFilters', []):
+            gid = data_filter.get('gridRange', {}).get('sheetId')
+            if gid in names_by_gid:
+                data[names_by_gid[gid]] = matched.get('valueRange', {}).get('values', [])
+    return data
+
+def read_public_sheet(gid, sheet_id=SHEET_ID):
+    """Read one sheet through the published CSV export (no credentials needed)."""
+    try:
+        return pd.read_csv(CSV_EXPORT_URL.format(sheet_id=sheet_id, gid=gid))
+    except Exception as e:
+        print(f"Error reading published sheet {gid}: {e}")
+        return None
+
+def fetch_sheets(service=None, drive_service=None, spreadsheet_id=SPREADSHEET_ID,
+                 sheet_names=SHEET_NAMES, cache_file=SHEETS_CACHE_FILE):
+    """DataFrames for every sheet in SHEET_NAMES; {name: DataFrame or None}.
+
+    The Sheets API is read with a single batch call and cached on disk keyed by
+    the spreadsheet revision, so an unchanged spreadsheet is not fetched again.
+    Without credentials or a SPREADSHEET_ID the published CSV export is used.
+    """
+    if service is None and spreadsheet_id and os.path.exists('token.json'):
+        try:
+            creds = get_credentials()
+            service = get_google_sheets_service(creds)
+            drive_service = drive_service or get_drive_service(creds)
+        except Exception as e:
+            print(f"Could not connect to the Sheets API: {e}")
+
+    if service is not None and spreadsheet_id:
+        revision = get_spreadsheet_revision(drive_service, spreadsheet_id) if drive_service else None
+        cache = load_sheets_cache(cache_file)
+        cached = cache.get('sheets', {})
+        if (revision is not None and cache.get('spreadsheet_id') == spreadsheet_id
+                and cache.get('revision') == revision and all(name in cached for name in sheet_names)):
+            print(f"Spreadsheet unchanged (revision {revision}), using cached sheets.")
+            return {name: process_sheet_data(cached[name]) for name in sheet_names}
+        try:
+            data = batch_get_sheet_data(service, spreadsheet_id, sheet_names)
+            print(f"Fetched {len(data)} sheets in one batch request.")
+            if revision is not None:
+                save_sheets_cache({'spreadsheet_id': spreadsheet_id, 'revision': revision, 'sheets': data},
+                                  cache_file)
+            return {name: process_sheet_data(data.get(name)) for name in sheet_names}
+        except Exception as e:
+            print(f"Error getting data: {e}")
+
+    print("Reading the published CSV export instead.")
+    return {name: read_public_sheet(gid) for name, gid in sheet_names.items()}
+
 def process_sheet_data(data):
     """Convert sheet data to a pandas DataFrame."""
     if not data:
@@ -81,13 +177,11 @@ def analyze_data(df, sheet_name):
 def main():
     """Main function to fetch and analyze data from the public Google Sheet."""
     try:
-        # Public Google Sheet URL
-        sheet_url = "https://docs.google.com/spreadsheets/d/1RqFZrORVk1bo_gRiaub0FPRxIAk2MV85i1z3aXeGiOJZKEXt0zwkkkVywkizoZ4O2mvmQoaGM4qJLa/edit#gid=880828924"
-        
-        # Read the main sheet
+        # Read every sheet; the TWC chart sheet is the main dataset
         print("Fetching data from Google Sheet...")
-        df = read_public_sheet(sheet_url)
-        
+        sheets = fetch_sheets()
+        df = sheets.get('twc')
+
         if df is not None and not df.empty:
             print("\nFirst few rows of the data:")
             print(df.head())
@@ -1,48 +1,65 @@
 import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
-from plotly.subplots import make_subplots
 import numpy as np
 import os
+from plotly.subplots import make_subplots
+from countries import country_names, display_names, to_iso3
+from data_store import (Column, latest_values, load_panel, melt_cross_section, melt_time_series,
+                        read_cross_section, read_time_series, store_available)
+from debt_categories import DEBT_TIERS, categorize, category_colors, debt_category, tier_index
+from delta_frames import delta_frames_meta, encode_series
+from figure_theme import LIGHT_THEME, dual_axis_figure, themed_figure
+from instrumentation import stage
+from large_scatter import density_figure, scatter_mode
+from macro_math import purchasing_power
+from plot_utils import check_output_dir
+from render_scheduler import FigureJob, build_arg_parser, render_jobs
 
-def check_output_dir():
-    """Ensure the interactive_plots directory exists."""
-    if not os.path.exists('interactive_plots'):
-        os.makedirs('interactive_plots')
+# Define logical colors for risk levels
+DEBT_CATEGORY_COLORS = category_colors()
 
-def create_visualizations(df):
-    """Create various interactive visualizations from the dataframe."""
-    check_output_dir()
-    
-    # Define logical colors for risk levels
-    color_map = {
-        'Critical (>200%)': '#8b0000', # Dark Red
-        'High (>90%)': '#d32f2f',      # Red
-        'High (60-90%)': '#f57c00',    # Orange
-        'Moderate (30-60%)': '#388e3c', # Green
-        'Low (<30%)': '#2ecc71'        # Light Green
-    }
-    
-    # 1. GDP Bar Plot
+# Country codes (in display order) and store indicators and dtypes behind each dataset
+GLOBAL_COUNTRIES = display_names(['USA', 'CHN', 'OIC', 'JPN', 'DEU', 'IND', 'GBR', 'FRA', 'ITA', 'BRA', 'CAN'])
+GLOBAL_COLUMNS = {
+    'GDP (USD) Billion': Column('NGDPD', 'int64'),
+    'Total Debt (USD) Billion': Column('GGXWDG_USD', 'int64'),
+    'Debt-to-GDP Ratio (%)': Column('GGXWDG_NGDP')
+}
+OIC_COUNTRIES = display_names(['IDN', 'SAU', 'TUR', 'IRN', 'ARE', 'MYS', 'EGY', 'BGD', 'PAK', 'NGA', 'KAZ', 'QAT'])
+OIC_COLUMNS = {'GDP (USD) Billion': Column('NGDPD', 'int64'), 'Debt-to-GDP Ratio (%)': Column('GGXWDG_NGDP')}
+OIC_POPULATION_COUNTRIES = display_names(['IDN', 'PAK', 'NGA', 'BGD', 'EGY', 'OIC_OTHERS'])
+OIC_POPULATION_COLUMNS = {'Population (Millions)': Column('LP', 'int64')}
+OIC_GROWTH_COUNTRIES = display_names(['GUY', 'SEN', 'BGD', 'IDN', 'SAU', 'TUR', 'EGY'])
+OIC_GROWTH_COLUMNS = {'GDP Growth 2024 (%)': Column('NGDP_RPCH')}
+INFLATION_COLUMNS = {'Inflation Rate (%)': Column('PCPIPCH')}
+COMMODITIES_COLUMNS = {'Gold (USD/oz)': Column('GOLD_USD', 'int64'), 'Silver (USD/oz)': Column('SILVER_USD')}
+MAP_YEARS = [2024, 2023, 2022, 2021, 2020]
+# Countries in the animated ranking and decimals kept for the animated ratios
+ANIMATION_RANKING_SIZE = 15
+ANIMATION_PRECISION = 1
+MISSING_COLOR = '#d9d9d9'
+
+def build_gdp_bar(df):
+    """GDP Bar Plot."""
     fig_gdp = px.bar(
         df.sort_values('GDP (USD) Billion', ascending=False),
-        x='Country', 
+        x='Country',
         y='GDP (USD) Billion',
         title='GDP by Country (USD Billion)',
         text='GDP (USD) Billion',
         color='GDP (USD) Billion',
-        color_continuous_scale='Viridis'
-    )
-    fig_gdp.update_layout(
-        template='plotly_white',
-        autosize=True,
-        margin=dict(l=10, r=10, t=30, b=10),
-        title_font_size=14,
-        font=dict(size=10)
+        color_continuous_scale='Viridis',
+        template=LIGHT_THEME
     )
-    fig_gdp.write_html("interactive_plots/gdp_by_country.html")
+    return fig_gdp
 
-    # 2. Scatter Plot: GDP vs Debt
+def build_gdp_debt_scatter(df, title='GDP Size vs Debt Levels (Log Scale)'):
+    """Scatter Plot: GDP vs Debt (WebGL or binned for large panels, see large_scatter.py)."""
+    mode = scatter_mode(len(df))
+    if mode == 'binned':
+        return density_figure(df['GDP (USD) Billion'], df['Debt-to-GDP Ratio (%)'], title,
+                              'GDP (USD) Billion', 'Debt-to-GDP Ratio (%)', log_x=True)
     fig_scatter = px.scatter(
         df,
         x='GDP (USD) Billion',
@@ -50,96 +67,90 @@ def create_visualizations(df):
         color='Debt Category',
         size='GDP (USD) Billion',
         hover_name='Country',
+        hover_data=[c for c in ['Year'] if c in df],
         log_x=True,
-        size_max=60,
-        title='GDP Size vs Debt Levels (Log Scale)',
-        color_discrete_map=color_map
-    )
-    
-    fig_scatter.update_layout(
-        template='plotly_white',
-        autosize=True,
-        margin=dict(l=10, r=10, t=30, b=10),
-        legend=dict(orientation="h", yanchor="bottom", y=-0.2, xanchor="center", x=0.5),
-        title_font_size=14,
-        font=dict(size=10)
+        size_max=60 if mode == 'svg' else 20,
+        title=title,
+        color_discrete_map=DEBT_CATEGORY_COLORS,
+        render_mode=mode,
+        template=LIGHT_THEME
     )
-    fig_scatter.write_html("interactive_plots/gdp_vs_debt_scatter.html")
 
-    # 3. Bar Chart: Debt Ratios
+    fig_scatter.update_layout(legend=dict(orientation="h", yanchor="bottom", y=-0.2, xanchor="center", x=0.5))
+    return fig_scatter
+
+def build_debt_ratio_bar(df):
+    """Bar Chart: Debt Ratios."""
     fig_bar = px.bar(
         df.sort_values('Debt-to-GDP Ratio (%)', ascending=False).head(20),
         x='Country',
         y='Debt-to-GDP Ratio (%)',
         color='Debt Category',
         title='Top 20 Countries by Debt Ratio',
-        color_discrete_map=color_map
-    )
-    
-    fig_bar.update_layout(
-        template='plotly_white',
-        autosize=True,
-        margin=dict(l=10, r=10, t=30, b=10),
-        legend=dict(orientation="h", yanchor="bottom", y=-0.3, xanchor="center", x=0.5),
-        title_font_size=14,
-        font=dict(size=10)
+        color_discrete_map=DEBT_CATEGORY_COLORS,
+        template=LIGHT_THEME
     )
-    fig_bar.write_html("interactive_plots/debt_to_gdp_ratio.html")
 
-    # 4. Correlation Heatmap
+    fig_bar.update_layout(legend=dict(orientation="h", yanchor="bottom", y=-0.3, xanchor="center", x=0.5))
+    return fig_bar
+
+def build_correlation_heatmap(df):
+    """Correlation Heatmap."""
     numeric_df = df.select_dtypes(include=[np.number])
     correlation = numeric_df.corr()
-    
+
     fig_corr = px.imshow(
         correlation,
         text_auto=True,
         aspect="auto",
         color_continuous_scale='RdBu_r',
-        title='Correlation Heatmap'
-    )
-    fig_corr.update_layout(
-        template='plotly_white',
-        autosize=True,
-        margin=dict(l=10, r=10, t=30, b=10),
-        title_font_size=14,
-        font=dict(size=10)
+        title='Correlation Heatmap',
+        template=LIGHT_THEME
     )
-    fig_corr.write_html("interactive_plots/correlation_heatmap.html")
+    return fig_corr
 
-    # 5. Box Plot
+def build_debt_boxplot(df):
+    """Box Plot."""
     fig_box = px.box(
         df,
         x='Debt Category',
         y='Debt-to-GDP Ratio (%)',
         color='Debt Category',
         title='Debt Distribution by Category',
-        color_discrete_map=color_map
-    )
-    
-    fig_box.update_layout(
-        template='plotly_white',
-        autosize=True,
-        margin=dict(l=10, r=10, t=30, b=10),
-        showlegend=False,
-        title_font_size=14,
-        font=dict(size=10)
+        color_discrete_map=DEBT_CATEGORY_COLORS,
+        template=LIGHT_THEME
     )
-    fig_box.write_html("interactive_plots/gdp_debt_boxplot.html")
-    
-    # 6. Global Map
-    map_df = df
-    locations_col = 'Country'
-    location_mode = 'country names'
-    
+
+    fig_box.update_layout(showlegend=False)
+    return fig_box
+
+def load_map_dataframe(df):
+    """Pick the comprehensive global dataset for the map if it is available.
+
+    Every source is located by ISO-3 code; names in the fallback frame are
+    resolved through the precomputed index instead of plotly's name matching.
+    """
+    latest = latest_values('GGXWDG_NGDP', MAP_YEARS, sources=['imf', 'estimates'])
+    if latest is not None:
+        map_df = latest.rename(columns={'Value': 'Debt-to-GDP Ratio (%)'})
+        map_df['Debt-to-GDP Ratio (%)'] = map_df['Debt-to-GDP Ratio (%)'].round(2)
+        map_df['Debt Category'] = debt_category(map_df['Debt-to-GDP Ratio (%)'])
+        print("Using data store for map.")
+        return map_df, 'Country Code', 'ISO-3'
+
     if os.path.exists('global_debt_data_2024.csv'):
         try:
             map_df = pd.read_csv('global_debt_data_2024.csv')
-            locations_col = 'Country Code'
-            location_mode = 'ISO-3'
             print("Using comprehensive global dataset for map.")
+            return map_df, 'Country Code', 'ISO-3'
         except Exception as e:
             print(f"Could not load global data: {e}")
 
+    map_df = df.assign(**{'Country Code': to_iso3(df['Country']).to_numpy()})
+    return map_df.dropna(subset=['Country Code']), 'Country Code', 'ISO-3'
+
+def build_debt_category_map(map_df, locations_col, location_mode):
+    """Global Map."""
     fig_map = px.choropleth(
         map_df,
         locations=locations_col,
@@ -147,26 +158,123 @@ def create_visualizations(df):
         color='Debt Category',
         hover_name='Country',
         hover_data=['Debt-to-GDP Ratio (%)'],
-        color_discrete_map=color_map,
-        title='Global Debt Risk Map (2024)'
+        color_discrete_map=DEBT_CATEGORY_COLORS,
+        title='Global Debt Risk Map (2024)',
+        template=LIGHT_THEME
     )
-    
+
     fig_map.update_layout(
-        template='plotly_white',
-        autosize=True,
         margin=dict(l=0, r=0, t=30, b=0),
         legend=dict(orientation="h", yanchor="bottom", y=0, xanchor="left", x=0),
-        title_font_size=14,
-        font=dict(size=10),
         geo=dict(
             showframe=False,
             showcoastlines=True,
             projection_type='equirectangular'
-        )
     )
-    fig_map.write_html("interactive_plots/debt_category_map.html")
-    
-    # 7. Horizontal Bar Plot (Overview)
+    )
+    return fig_map
+
+def load_debt_history():
+    """Debt-to-GDP ratios of every IMF year (country x year) and country names, or None without a store."""
+    if not store_available():
+        return None
+    panel = load_panel('imf')
+    if 'GGXWDG_NGDP' not in panel.indicators:
+        return None
+    matrix = panel.matrix('GGXWDG_NGDP')
+    observed = ~np.isnan(matrix)
+    rows, cols = observed.any(axis=1), observed.any(axis=0)
+    codes = [code for code, keep in zip(panel.countries, rows) if keep]
+    history = pd.DataFrame(matrix[rows][:, cols], index=pd.Index(codes, name='Country Code'),
+                           columns=panel.years[cols])
+    names = pd.Series([panel.names.get(code, code) for code in codes], index=history.index, name='Country')
+    return history, names
+
+def latest_debt_history(map_df):
+    """One-year stand-in for load_debt_history() built from the map frame's latest ratios."""
+    map_df = map_df.dropna(subset=['Country Code', 'Debt-to-GDP Ratio (%)']).drop_duplicates('Country Code')
+    year = int(map_df['Year'].max()) if 'Year' in map_df else MAP_YEARS[0]
+    history = pd.DataFrame({year: map_df['Debt-to-GDP Ratio (%)'].to_numpy(dtype=float)},
+                           index=pd.Index(map_df['Country Code'], name='Country Code'))
+    labels = map_df['Country'] if 'Country' in map_df else country_names(map_df['Country Code'])
+    return history, pd.Series(labels.to_numpy(), index=history.index, name='Country')
+
+def _ranking(values, labels, colors, size=ANIMATION_RANKING_SIZE):
+    order = [i for i in np.argsort(-values, kind='stable') if not np.isnan(values[i])][:size]
+    return values[order], [labels[i] for i in order], [colors[i] for i in order]
+
+def build_debt_map_animation(history, names):
+    """Animated debt category map and top-debt ranking over every year.
+
+    The figure holds the latest year; the other years travel as delta-encoded
+    frames (delta_frames.py) that the page expands on load.
+    """
+    values = history.to_numpy(dtype=float).round(ANIMATION_PRECISION)
+    categories = tier_index(values) + 1  # 0 = no data
+    years = [int(y) for y in history.columns]
+    codes, labels = history.index.tolist(), names.tolist()
+    palette = [MISSING_COLOR] + [tier.color for tier in DEBT_TIERS]
+    tiers = len(DEBT_TIERS)
+    colorscale = [[edge / tiers, tier.color] for k, tier in enumerate(DEBT_TIERS) for edge in (k, k + 1)]
+
+    latest, latest_categories = values[:, -1], categories[:, -1]
+    fig = make_subplots(rows=1, cols=2, column_widths=[0.62, 0.38], horizontal_spacing=0.12,
+                        specs=[[{'type': 'geo'}, {'type': 'bar'}]])
+    fig.add_trace(go.Choropleth(
+        locations=codes,
+        locationmode='ISO-3',
+        z=np.where(latest_categories > 0, latest_categories, np.nan),
+        customdata=latest,
+        text=labels,
+        zmin=0.5,
+        zmax=tiers + 0.5,
+        colorscale=colorscale,
+        colorbar=dict(tickvals=list(range(1, tiers + 1)), ticktext=[tier.label for tier in DEBT_TIERS],
+                      x=0.56, len=0.8),
+        hovertemplate='%{text}<br>%{customdata:.1f}% of GDP<extra></extra>'
+    ), row=1, col=1)
+    bar_x, bar_y, bar_colors = _ranking(latest, labels, [palette[c] for c in latest_categories])
+    fig.add_trace(go.Bar(
+        x=bar_x, y=bar_y, orientation='h', marker_color=bar_colors,
+        hovertemplate='%{y}: %{x:.1f}% of GDP<extra></extra>'
+    ), row=1, col=2)
+
+    frame_args = dict(mode='immediate', frame=dict(duration=0, redraw=True), transition=dict(duration=0))
+    fig.update_layout(
+        template=LIGHT_THEME,
+        title=f'Government Debt-to-GDP, {years[0]}' + (f'-{years[-1]}' if len(years) > 1 else ''),
+        showlegend=False,
+        geo=dict(showframe=False, showcoastlines=True, projection_type='equirectangular'),
+        meta={'deltaFrames': delta_frames_meta(
+            years,
+            {'value': encode_series(values), 'category': encode_series(categories, np.uint8)},
+            traces=[{'trace': 0, 'z': 'category', 'customdata': 'value'}],
+            ranking={'trace': 1, 'series': 'value', 'labels': labels, 'size': ANIMATION_RANKING_SIZE,
+                     'colorSeries': 'category', 'palette': palette},
+        )},
+        sliders=[dict(
+            active=len(years) - 1,
+            currentvalue=dict(prefix='Year: '),
+            pad=dict(t=30),
+            steps=[dict(method='animate', label=str(year), args=[[str(year)], frame_args]) for year in years]
+        )],
+        updatemenus=[dict(
+            type='buttons', showactive=False, x=0, y=0, xanchor='right', yanchor='top', pad=dict(t=30, r=10),
+            buttons=[
+                dict(label='Play', method='animate',
+                     args=[None, dict(frame=dict(duration=300, redraw=True), fromcurrent=True,
+                                      transition=dict(duration=0))]),
+                dict(label='Pause', method='animate', args=[[None], frame_args]),
+            ]
+        )]
+    )
+    # Fixed axis so scrubbing through the years does not rescale the bars
+    fig.update_xaxes(range=[0, np.nanmax(values) * 1.05], title_text='% of GDP', row=1, col=2)
+    fig.update_yaxes(autorange='reversed', row=1, col=2)
+    return fig
+
+def build_debt_ratio_horizontal(df):
+    """Horizontal Bar Plot (Overview)."""
     df_sorted_asc = df.sort_values('Debt-to-GDP Ratio (%)', ascending=True)
     fig_horiz = px.bar(
         df_sorted_asc,
@@ -176,25 +284,73 @@ def create_visualizations(df):
         title='Debt-to-GDP Ratio Overview',
         text='Debt-to-GDP Ratio (%)',
         color='Debt-to-GDP Ratio (%)',
-        color_continuous_scale='RdYlGn_r'
+        color_continuous_scale='RdYlGn_r',
+        template=LIGHT_THEME
     )
     fig_horiz.add_vline(x=60, line_dash="dash", line_color="orange", annotation_text="Warning")
     fig_horiz.add_vline(x=90, line_dash="dash", line_color="red", annotation_text="Danger")
-    fig_horiz.update_layout(
-        template='plotly_white',
-        autosize=True,
-        margin=dict(l=10, r=10, t=30, b=10),
-        title_font_size=14,
-        font=dict(size=10)
-    )
-    fig_horiz.write_html("interactive_plots/debt_ratio_horizontal.html")
+    return fig_horiz
 
+def global_figure_jobs(df):
+    """Independent figure jobs for the global overview dashboard."""
+    map_args = load_map_dataframe(df)
+    return [
+        FigureJob("gdp_by_country.html", build_gdp_bar, (df,)),
+        FigureJob("gdp_vs_debt_scatter.html", build_gdp_debt_scatter, (df,)),
+        FigureJob("debt_to_gdp_ratio.html", build_debt_ratio_bar, (df,)),
+        FigureJob("correlation_heatmap.html", build_correlation_heatmap, (df,)),
+        FigureJob("gdp_debt_boxplot.html", build_debt_boxplot, (df,)),
+        FigureJob("debt_category_map.html", build_debt_category_map, map_args),
+        FigureJob("debt_ratio_horizontal.html", build_debt_ratio_horizontal, (df,)),
+    ] + panel_figure_jobs(df, map_args[0])
 
-def create_oic_visualizations(df):
-    """Generate OIC specific interactive visualizations."""
+def load_gdp_debt_panel():
+    """Every IMF country-year with both GDP and a debt ratio, in the scatter layout; None without a store."""
+    if not store_available():
+        return None
+    panel = load_panel('imf')
+    if not {'NGDPD', 'GGXWDG_NGDP'} <= set(panel.indicators):
+        return None
+    gdp, debt = panel.matrix('NGDPD'), panel.matrix('GGXWDG_NGDP')
+    rows, cols = np.nonzero(~(np.isnan(gdp) | np.isnan(debt)))
+    codes = np.asarray(panel.countries, dtype=object)[rows]
+    df = pd.DataFrame({
+        'Country': [panel.names.get(code, code) for code in codes],
+        'Year': panel.years[cols],
+        'GDP (USD) Billion': gdp[rows, cols].round(1),
+        'Debt-to-GDP Ratio (%)': debt[rows, cols].round(1),
+    })
+    df['Debt Category'] = debt_category(df['Debt-to-GDP Ratio (%)'])
+    return df
+
+def panel_figure_jobs(df, map_df):
+    """Figures over every IMF country and year.
+
+    index.html always links them, so without the IMF history in the data
+    store they are built from the latest year instead: the map from map_df's
+    ratios, the scatter from df.
+    """
+    history = load_debt_history()
+    if history is None:
+        print("No IMF history in the data store; the animated map and panel scatter show the latest year only.")
+        history = latest_debt_history(map_df)
+    scatter, title = load_gdp_debt_panel(), 'GDP Size vs Debt Levels, All Years (Log Scale)'
+    if scatter is None:
+        scatter = df.assign(Year=MAP_YEARS[0])
+        title = f'GDP Size vs Debt Levels, {MAP_YEARS[0]} (Log Scale)'
+    return [
+        FigureJob("debt_map_animated.html", build_debt_map_animation, history),
+        FigureJob("gdp_vs_debt_panel.html", build_gdp_debt_scatter, (scatter, title)),
+    ]
+
+def create_visualizations(df, max_workers=None, force=False):
+    """Create various interactive visualizations from the dataframe."""
     check_output_dir()
-    
-    # 1. OIC GDP Bar
+    return render_jobs(global_figure_jobs(df), max_workers=max_workers, force=force)
+
+
+def build_oic_gdp_bar(df):
+    """OIC GDP Bar."""
     fig_oic_gdp = px.bar(
         df.sort_values('GDP (USD) Billion', ascending=True),
         x='GDP (USD) Billion',
@@ -203,28 +359,18 @@ def create_oic_visualizations(df):
         title='Top 10 OIC Economies by GDP (2024)',
         text='GDP (USD) Billion',
         color='GDP (USD) Billion',
-        color_continuous_scale='Viridis'
-    )
-    fig_oic_gdp.update_layout(
-        template='plotly_white',
-        autosize=True,
-        margin=dict(l=10, r=10, t=30, b=10),
-        title_font_size=14,
-        font=dict(size=10)
+        color_continuous_scale='Viridis',
+        template=LIGHT_THEME
     )
-    fig_oic_gdp.write_html("interactive_plots/oic_gdp_bar.html")
-    
-    # 2. OIC Debt Ratio
+    return fig_oic_gdp
+
+def build_oic_debt_ratio(df):
+    """OIC Debt Ratio."""
     df_sorted = df.sort_values('Debt-to-GDP Ratio (%)', ascending=True)
-    
-    # Custom colors mapping
-    colors = []
-    for val in df_sorted['Debt-to-GDP Ratio (%)']:
-        if val < 30: colors.append('green')
-        elif val < 60: colors.append('orange')
-        else: colors.append('red')
-        
-    fig_oic_debt = go.Figure(go.Bar(
+    # Bars take the colour of their debt tier, like the map and the category charts
+    colors = categorize(df_sorted['Debt-to-GDP Ratio (%)'])['Debt Color'].to_numpy(dtype=object)
+
+    fig_oic_debt = themed_figure(go.Bar(
         x=df_sorted['Debt-to-GDP Ratio (%)'],
         y=df_sorted['Country'],
         orientation='h',
@@ -232,73 +378,79 @@ def create_oic_visualizations(df):
         text=[f"{val}%" for val in df_sorted['Debt-to-GDP Ratio (%)']],
         textposition='auto'
     ))
-    
+
     fig_oic_debt.update_layout(
         title='OIC Members Debt-to-GDP Ratio (2024)',
-        xaxis_title='Debt Ratio (%)',
-        template='plotly_white',
-        autosize=True,
-        margin=dict(l=10, r=10, t=30, b=10),
-        title_font_size=14,
-        font=dict(size=10)
+        xaxis_title='Debt Ratio (%)'
     )
-    fig_oic_debt.write_html("interactive_plots/oic_debt_ratio.html")
-    
-    # 3. OIC Scatter
+    return fig_oic_debt
+
+def build_oic_scatter(df):
+    """OIC Scatter (WebGL or binned for large panels, see large_scatter.py)."""
+    mode = scatter_mode(len(df))
+    if mode == 'binned':
+        return density_figure(df['GDP (USD) Billion'], df['Debt-to-GDP Ratio (%)'], 'OIC: Size vs Debt Risk',
+                              'GDP (USD) Billion', 'Debt-to-GDP Ratio (%)')
     fig_oic_scatter = px.scatter(
         df,
         x='GDP (USD) Billion',
         y='Debt-to-GDP Ratio (%)',
         color='Country',
         size='GDP (USD) Billion',
-        text='Country',
+        # Labels only while every point gets one; large panels label on hover
+        text='Country' if mode == 'svg' else None,
+        hover_name='Country',
         size_max=40,
         opacity=0.8,
-        title='OIC: Size vs Debt Risk'
-    )
-    fig_oic_scatter.update_traces(textposition='top center')
-    fig_oic_scatter.update_layout(
-        template='plotly_white',
-        autosize=True,
-        margin=dict(l=10, r=10, t=30, b=10),
-        legend=dict(orientation="h", yanchor="bottom", y=-0.15, xanchor="center", x=0.5),
-        title_font_size=14,
-        font=dict(size=10)
+        title='OIC: Size vs Debt Risk',
+        render_mode=mode,
+        template=LIGHT_THEME
     )
-    fig_oic_scatter.write_html("interactive_plots/oic_scatter.html")
+    if mode == 'svg':
+        fig_oic_scatter.update_traces(textposition='top center')
+    fig_oic_scatter.update_layout(legend=dict(orientation="h", yanchor="bottom", y=-0.15, xanchor="center", x=0.5))
+    return fig_oic_scatter
 
-    # 4. OIC Population Distribution
-    print("Generating OIC Population Chart...")
+def create_oic_population_dataframe():
+    """OIC population share of the largest members."""
+    df = read_cross_section('oic', OIC_POPULATION_COUNTRIES, OIC_POPULATION_COLUMNS, 2024)
+    if df is not None:
+        return df
     pop_data = {
         'Country': ['Indonesia', 'Pakistan', 'Nigeria', 'Bangladesh', 'Egypt', 'Others'],
         'Population (Millions)': [279, 245, 229, 173, 114, 860]
     }
+    return pd.DataFrame(pop_data)
+
+def build_oic_population_pie(pop_data):
+    """OIC Population Distribution."""
     fig_pop = px.pie(
-        pop_data, 
-        values='Population (Millions)', 
+        pop_data,
+        values='Population (Millions)',
         names='Country',
         title='OIC Demographics: Population Share',
-        hole=0.4
+        hole=0.4,
+        template=LIGHT_THEME
     )
     fig_pop.update_traces(textposition='inside', textinfo='percent+label')
-    fig_pop.update_layout(
-        template='plotly_white',
-        autosize=True,
-        margin=dict(l=10, r=10, t=30, b=10),
-        legend=dict(orientation="h", yanchor="bottom", y=-0.1, xanchor="center", x=0.5),
-        title_font_size=14,
-        font=dict(size=10)
-    )
-    fig_pop.write_html("interactive_plots/oic_population_pie.html")
+    fig_pop.update_layout(legend=dict(orientation="h", yanchor="bottom", y=-0.1, xanchor="center", x=0.5))
+    return fig_pop
 
-    # 5. OIC GDP Growth Rates
-    print("Generating OIC Growth Chart...")
+def create_oic_growth_dataframe():
+    """GDP growth of the fastest growing OIC economies."""
+    df = read_cross_section('oic', OIC_GROWTH_COUNTRIES, OIC_GROWTH_COLUMNS, 2024)
+    if df is not None:
+        return df
     growth_data = {
         'Country': ['Guyana', 'Senegal', 'Bangladesh', 'Indonesia', 'Saudi Arabia', 'Turkey', 'Egypt'],
         'GDP Growth 2024 (%)': [33.9, 8.8, 5.7, 5.0, 2.7, 3.1, 3.0]
     }
-    df_growth = pd.DataFrame(growth_data).sort_values('GDP Growth 2024 (%)', ascending=False)
-    
+    return pd.DataFrame(growth_data)
+
+def build_oic_growth_bar(df_growth):
+    """OIC GDP Growth Rates."""
+    df_growth = df_growth.sort_values('GDP Growth 2024 (%)', ascending=False)
+
     fig_growth = px.bar(
         df_growth,
         x='Country',
@@ -306,23 +458,39 @@ def create_oic_visualizations(df):
         color='GDP Growth 2024 (%)',
         color_continuous_scale='Viridis',
         text_auto=True,
-        title='Fastest Growing OIC Economies (2024)'
-    )
-    
-    fig_growth.update_layout(
-        template='plotly_white',
-        autosize=True,
-        margin=dict(l=10, r=10, t=30, b=10),
-        title_font_size=14,
-        font=dict(size=10),
-        coloraxis_showscale=False
+        title='Fastest Growing OIC Economies (2024)',
+        template=LIGHT_THEME
     )
-    fig_growth.write_html("interactive_plots/oic_growth_bar.html")
 
-def analyze_global_inflation():
-    """Analyze and visualize Global/US Dollar Inflation interactively."""
+    fig_growth.update_layout(coloraxis_showscale=False)
+    return fig_growth
+
+def oic_figure_jobs(df):
+    """Independent figure jobs for the OIC dashboard."""
+    return [
+        FigureJob("oic_gdp_bar.html", build_oic_gdp_bar, (df,)),
+        FigureJob("oic_debt_ratio.html", build_oic_debt_ratio, (df,)),
+        FigureJob("oic_scatter.html", build_oic_scatter, (df,)),
+        FigureJob("oic_population_pie.html", build_oic_population_pie, (create_oic_population_dataframe(),)),
+        FigureJob("oic_growth_bar.html", build_oic_growth_bar, (create_oic_growth_dataframe(),)),
+    ]
+
+def create_oic_visualizations(df, max_workers=None, force=False):
+    """Generate OIC specific interactive visualizations."""
     check_output_dir()
-    
+    return render_jobs(oic_figure_jobs(df), max_workers=max_workers, force=force)
+
+def create_inflation_dataframe():
+    """US Dollar inflation rates (1970-2024) with the resulting purchasing power."""
+    df = read_time_series('inflation', 'USA', INFLATION_COLUMNS)
+    if df is None:
+        df = create_inflation_rates_dataframe()
+
+    df['Purchasing Power ($)'] = purchasing_power(df['Inflation Rate (%)'], start=100.0)
+    return df
+
+def create_inflation_rates_dataframe():
+    """US Dollar inflation rates (1970-2024)."""
     years = list(range(1970, 2025))
     inflation_rates = [
         # 1970-1979
@@ -338,88 +506,91 @@ def analyze_global_inflation():
         # 2020-2024
         1.2, 4.7, 8.0, 4.1, 2.9
     ]
-    
+
     data = {'Year': years, 'Inflation Rate (%)': inflation_rates}
-    df = pd.DataFrame(data)
-    
-    # Calculate Purchasing Power
-    purchasing_power = []
-    val = 100.0
-    for rate in df['Inflation Rate (%)']:
-        val = val / (1 + rate/100)
-        purchasing_power.append(val)
-    df['Purchasing Power ($)'] = purchasing_power
-    
-    fig = make_subplots(specs=[[{"secondary_y": True}]])
-    
+    return pd.DataFrame(data)
+
+def build_global_inflation(df):
+    """US Dollar inflation vs purchasing power (dual axis)."""
+    fig = dual_axis_figure()
+
     fig.add_trace(
         go.Bar(name="Inflation %", x=df['Year'], y=df['Inflation Rate (%)'], marker_color='#e74c3c', opacity=0.4),
         secondary_y=False,
     )
-    
+
     fig.add_trace(
         go.Scatter(name="Purchasing Power ($)", x=df['Year'], y=df['Purchasing Power ($)'], marker_color='#2c3e50', line=dict(width=3)),
         secondary_y=True,
     )
-    
+
     fig.update_layout(
         title_text="US Dollar Erosion (1970-2024)",
-        template='plotly_white',
         hovermode='x unified',
-        legend=dict(orientation="h", yanchor="bottom", y=-0.15, xanchor="center", x=0.5),
-        autosize=True,
-        margin=dict(l=10, r=10, t=30, b=10),
-        title_font_size=14,
-        font=dict(size=10)
+        legend=dict(orientation="h", yanchor="bottom", y=-0.15, xanchor="center", x=0.5)
     )
-    
+
     fig.update_yaxes(title_text="Inflation (%)", secondary_y=False)
     fig.update_yaxes(title_text="Power ($)", secondary_y=True)
-    
-    fig.write_html("interactive_plots/global_inflation_trends.html")
+    return fig
+
+def inflation_figure_jobs():
+    """Figure jobs for the global inflation chart."""
+    return [FigureJob("global_inflation_trends.html", build_global_inflation, (create_inflation_dataframe(),))]
+
+def analyze_global_inflation(max_workers=None, force=False):
+    """Analyze and visualize Global/US Dollar Inflation interactively."""
+    check_output_dir()
+    return render_jobs(inflation_figure_jobs(), max_workers=max_workers, force=force)
 
 def create_dataframe():
     """Create the dataframe for analysis."""
+    df = read_cross_section('global', GLOBAL_COUNTRIES, GLOBAL_COLUMNS, 2024)
+    if df is not None:
+        df['Debt Category'] = debt_category(df['Debt-to-GDP Ratio (%)'])
+        return df
     data = {
         'Country': [
-            'United States', 'China', 'OIC (57 members)', 'Japan', 'Germany', 
+            'United States', 'China', 'OIC (57 members)', 'Japan', 'Germany',
             'India', 'United Kingdom', 'France', 'Italy', 'Brazil', 'Canada'
         ],
         'GDP (USD) Billion': [
-            28780, 19400, 9200, 4200, 4590, 
+            28780, 19400, 9200, 4200, 4590,
             4125, 3590, 3130, 2330, 2260, 2280
         ],
         'Total Debt (USD) Billion': [
-            35000, 14000, 3500, 11500, 2900, 
+            35000, 14000, 3500, 11500, 2900,
             3300, 3400, 3400, 3200, 1700, 2400
         ],
         'Debt-to-GDP Ratio (%)': [
-            123.0, 72.0, 38.0, 260.0, 63.0, 
+            123.0, 72.0, 38.0, 260.0, 63.0,
             80.0, 95.0, 110.0, 137.0, 75.0, 105.0
-        ],
-        'Debt Category': [
-            'High (>90%)', 'High (60-90%)', 'Moderate (30-60%)', 'Critical (>200%)', 'High (60-90%)', 
-            'High (60-90%)', 'High (>90%)', 'High (>90%)', 'High (>90%)', 'High (60-90%)', 'High (>90%)'
         ]
     }
-    return pd.DataFrame(data)
+    df = pd.DataFrame(data)
+    df['Debt Category'] = debt_category(df['Debt-to-GDP Ratio (%)'])
+    return df
 
 def create_oic_dataframe():
     """Create a dataframe specifically for OIC member countries analysis."""
+    df = read_cross_section('oic', OIC_COUNTRIES, OIC_COLUMNS, 2024)
+    if df is not None:
+        df['Total Debt (USD) Billion'] = df['GDP (USD) Billion'] * (df['Debt-to-GDP Ratio (%)'] / 100)
+        return df
     data = {
         'Country': [
-            'Indonesia', 'Saudi Arabia', 'Turkey', 'Iran', 'UAE', 
-            'Malaysia', 'Egypt', 'Bangladesh', 'Pakistan', 'Nigeria', 
+            'Indonesia', 'Saudi Arabia', 'Turkey', 'Iran', 'UAE',
+            'Malaysia', 'Egypt', 'Bangladesh', 'Pakistan', 'Nigeria',
             'Kazakhstan', 'Qatar'
         ],
         'GDP (USD) Billion': [
-            1396, 1240, 1320, 437, 537, 
-            422, 389, 450, 373, 188, 
+            1396, 1240, 1320, 437, 537,
+            422, 389, 450, 373, 188,
             288, 218
         ],
         'Debt-to-GDP Ratio (%)': [
-            38.8, 26.2, 24.7, 36.8, 31.3, 
-            70.4, 90.1, 21.8, 72.5, 46.6, 
+            38.8, 26.2, 24.7, 36.8, 31.3,
+            70.4, 90.1, 21.8, 72.5, 46.6,
             23.4, 43.0
         ]
     }
@@ -427,33 +598,35 @@ def create_oic_dataframe():
     df['Total Debt (USD) Billion'] = df['GDP (USD) Billion'] * (df['Debt-to-GDP Ratio (%)'] / 100)
     return df
 
-def analyze_commodities_usd():
-    """Analyze and visualize Gold and Silver prices in USD (1970-2025)."""
-    check_output_dir()
-    
+def create_commodities_dataframe():
+    """Gold and Silver prices in USD (1970-2025)."""
+    df = read_time_series('commodities', 'WLD', COMMODITIES_COLUMNS)
+    if df is not None:
+        return df
     # Historical Data Points (Approximate Annual Averages/Year-End)
     data = {
         'Year': [
-            1970, 1975, 1980, 1985, 1990, 1995, 2000, 2005, 2010, 
-            2011, 2012, 2013, 2014, 2015, 2016, 2017, 2018, 2019, 
+            1970, 1975, 1980, 1985, 1990, 1995, 2000, 2005, 2010,
+            2011, 2012, 2013, 2014, 2015, 2016, 2017, 2018, 2019,
             2020, 2021, 2022, 2023, 2024, 2025
         ],
         'Gold (USD/oz)': [
-            36, 160, 615, 317, 383, 384, 279, 444, 1224, 
-            1571, 1669, 1411, 1266, 1160, 1250, 1257, 1268, 1392, 
+            36, 160, 615, 317, 383, 384, 279, 444, 1224,
+            1571, 1669, 1411, 1266, 1160, 1250, 1257, 1268, 1392,
             1769, 1798, 1800, 1940, 2380, 3380
         ],
         'Silver (USD/oz)': [
-            1.8, 4.4, 21.0, 6.1, 4.8, 5.2, 4.9, 7.3, 20.2, 
-            35.1, 31.1, 23.8, 19.0, 15.7, 17.1, 17.0, 15.7, 16.2, 
+            1.8, 4.4, 21.0, 6.1, 4.8, 5.2, 4.9, 7.3, 20.2,
+            35.1, 31.1, 23.8, 19.0, 15.7, 17.1, 17.0, 15.7, 16.2,
             20.5, 25.1, 21.8, 23.4, 28.5, 38.2
         ]
     }
-    
-    df = pd.DataFrame(data)
-    
-    fig = make_subplots(specs=[[{"secondary_y": True}]])
-    
+    return pd.DataFrame(data)
+
+def build_commodities_usd(df):
+    """Gold and Silver prices in USD (dual axis)."""
+    fig = dual_axis_figure()
+
     # Gold Trace
     fig.add_trace(
         go.Scatter(
@@ -466,7 +639,7 @@ def analyze_commodities_usd():
         ),
         secondary_y=False
     )
-    
+
     # Silver Trace
     fig.add_trace(
         go.Scatter(
@@ -477,48 +650,67 @@ def analyze_commodities_usd():
         ),
         secondary_y=True
     )
-    
+
     fig.update_layout(
         title='Precious Metals (USD) 1970-2025',
-        template='plotly_white',
         hovermode='x unified',
-        legend=dict(orientation="h", yanchor="bottom", y=-0.15, xanchor="center", x=0.5),
-        autosize=True,
-        margin=dict(l=10, r=10, t=30, b=10),
-        title_font_size=14,
-        font=dict(size=10)
+        legend=dict(orientation="h", yanchor="bottom", y=-0.15, xanchor="center", x=0.5)
     )
-    
+
     fig.update_yaxes(title_text="Gold ($/oz)", color='#FFD700', secondary_y=False)
     fig.update_yaxes(title_text="Silver ($/oz)", color='#7f8c8d', secondary_y=True)
-    
-    fig.write_html("interactive_plots/global_commodities_usd.html")
+    return fig
+
+def commodities_figure_jobs():
+    """Figure jobs for the USD commodities chart."""
+    return [FigureJob("global_commodities_usd.html", build_commodities_usd, (create_commodities_dataframe(),))]
+
+def analyze_commodities_usd(max_workers=None, force=False):
+    """Analyze and visualize Gold and Silver prices in USD (1970-2025)."""
+    check_output_dir()
+    return render_jobs(commodities_figure_jobs(), max_workers=max_workers, force=force)
+
+def all_figure_jobs():
+    """Every figure job behind the global and OIC dashboards."""
+    return (
+        global_figure_jobs(create_dataframe())
+        + oic_figure_jobs(create_oic_dataframe())
+        + inflation_figure_jobs()
+        + commodities_figure_jobs()
+    )
 
-def main():
+def store_records():
+    """Long-format data store rows for the global, OIC, inflation and commodity datasets."""
+    return [
+        melt_cross_section(create_dataframe(), 'global', GLOBAL_COUNTRIES, GLOBAL_COLUMNS, 2024),
+        melt_cross_section(create_oic_dataframe(), 'oic', OIC_COUNTRIES, OIC_COLUMNS, 2024),
+        melt_cross_section(create_oic_population_dataframe(), 'oic', OIC_POPULATION_COUNTRIES,
+                           OIC_POPULATION_COLUMNS, 2024),
+        melt_cross_section(create_oic_growth_dataframe(), 'oic', OIC_GROWTH_COUNTRIES, OIC_GROWTH_COLUMNS, 2024),
+        melt_time_series(create_inflation_rates_dataframe(), 'inflation', 'USA', INFLATION_COLUMNS, 'United States'),
+        melt_time_series(create_commodities_dataframe(), 'commodities', 'WLD', COMMODITIES_COLUMNS, 'World'),
+    ]
+
+def main(max_workers=None, force=False):
     """Main function to analyze the GDP and debt data."""
     try:
-        print("Analyzing Global GDP and Debt Data...")
-        df = create_dataframe()
-        create_visualizations(df)
-        print("Global interactive visualizations created.")
-
-        print("Analyzing OIC Specific Data...")
-        oic_df = create_oic_dataframe()
-        create_oic_visualizations(oic_df)
-        print("OIC interactive visualizations created.")
-
-        print("Analyzing Global Inflation Data...")
-        analyze_global_inflation()
-        print("Global inflation visualization created.")
-
-        print("Analyzing Global Commodities Data...")
-        analyze_commodities_usd()
-        print("Commodities visualization created.")
-        
+        # Recorded (with any error) in the instrumentation log before being reported here
+        with stage('main', script='gdp_debt_analysis'):
+            print("Analyzing Global GDP, OIC, Inflation and Commodities Data...")
+            check_output_dir()
+            with stage('load', script='gdp_debt_analysis'):
+                jobs = all_figure_jobs()
+            results = render_jobs(jobs, max_workers=max_workers, force=force)
+            if any(r.error for r in results):
+                print("Some visualizations failed; see errors above.")
+            else:
+                print("Interactive visualizations created.")
+
     except Exception as e:
         print(f"An error occurred: {e}")
         import traceback
         traceback.print_exc()
 
 if __name__ == "__main__":
-    main()
+    args = build_arg_parser("Build the global and OIC GDP/debt figures.").parse_args()
+    main(max_workers=args.workers, force=args.force)
@@ -0,0 +1,258 @@
+import os
+import json
+import shutil
+import argparse
+import threading
+
+import numpy as np
+
+# World geometry for the choropleth maps. plotly.js fetches
+# <topojsonURL><scope>_<resolution>m.json from its CDN for every map it draws;
+# here the world topologies are downloaded once (or built from a local
+# Natural Earth shapefile), simplified, kept in geometry/ and copied next to
+# the figures, so maps load offline from one shared copy.
+GEOMETRY_DIR = 'geometry'
+TOPOJSON_SOURCE_URL = os.environ.get('TOPOJSON_SOURCE_URL', 'https://cdn.plot.ly/un/')
+# Directory name next to the figure pages; also the topojsonURL the figures use
+TOPOJSON_DIRNAME = 'topojson'
+
+# plotly.js resolution (1:N million scale) -> grid the simplified arcs are snapped to.
+# Only the default 1:110m is kept: a 1:50m file is only worth shipping when built
+# from 1:50m source data, and the figures never ask plotly.js for it.
+RESOLUTIONS = {110: 4000}
+SCOPE = 'world'
+
+def topojson_name(resolution, scope=SCOPE):
+    """File name plotly.js requests for a geo scope and resolution."""
+    return f"{scope}_{resolution}m.json"
+
+def _requantize_arc(arc, factor):
+    """Snap one delta-encoded arc onto a coarser grid, dropping repeated points."""
+    points = np.rint(np.cumsum(np.asarray(arc, dtype=np.int64), axis=0) / factor).astype(np.int64)
+    keep = np.ones(len(points), dtype=bool)
+    keep[1:] = (np.diff(points, axis=0) != 0).any(axis=1)
+    keep[-1] = True  # arcs must end where the neighbouring arc starts
+    points = points[keep]
+    if len(points) < 2:
+        points = np.vstack([points, points])
+    return np.vstack([points[:1], np.diff(points, axis=0)]).tolist()
+
+def _scale_points(geometry, factor):
+    """Point coordinates are absolute positions on the grid, not arcs."""
+    if geometry.get('type') == 'GeometryCollection':
+        return dict(geometry, geometries=[_scale_points(g, factor) for g in geometry['geometries']])
+    if geometry.get('type') in ('Point', 'MultiPoint'):
+        coordinates = np.rint(np.asarray(geometry['coordinates']) / factor).astype(np.int64).tolist()
+        return dict(geometry, coordinates=coordinates)
+    return geometry
+
+def simplify_topology(topology, quantization):
+    """Topology with its arcs snapped to a quantization x quantization grid.
+
+    Shared arcs stay shared, so country borders still meet exactly. A topology
+    that is already coarser than the grid is returned unchanged.
+    """
+    transform = topology.get('transform')
+    if transform is None:
+        raise ValueError("Only quantized topologies (with a 'transform') can be simplified")
+    arcs = topology['arcs']
+    extent = max(int(np.abs(np.cumsum(np.asarray(arc), axis=0)).max()) for arc in arcs if arc) + 1
+    factor = extent / quantization
+    if factor <= 1:
+        return topology
+    simplified = dict(topology)
+    simplified['arcs'] = [_requantize_arc(arc, factor) for arc in arcs]
+    simplified['objects'] = {name: _scale_points(obj, factor) for name, obj in topology['objects'].items()}
+    simplified['transform'] = dict(transform, scale=[s * factor for s in transform['scale']])
+    return simplified
+
+def fetch_geometry(source_url=TOPOJSON_SOURCE_URL, directory=GEOMETRY_DIR, resolutions=RESOLUTIONS):
+    """Download the world topologies once and store simplified copies in directory."""
+    import requests
+    os.makedirs(directory, exist_ok=True)
+    for resolution, quantization in resolutions.items():
+        name = topojson_name(resolution)
+        response = requests.get(source_url.rstrip('/') + '/' + name, timeout=60)
+        response.raise_for_status()
+        topology = simplify_topology(response.json(), quantization)
+        path = os.path.join(directory, name)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(topology, f, separators=(',', ':'))
+        os.replace(tmp_path, path)
+        print(f"  {path}: {len(response.content) / 1024:.0f} KiB -> {os.path.getsize(path) / 1024:.0f} KiB")
+
+def _signed_area(ring):
+    x, y = ring[:, 0].astype(float), ring[:, 1].astype(float)
+    return (x[:-1] * y[1:] - x[1:] * y[:-1]).sum() / 2
+
+def _polygons(shape, grid):
+    """Quantized polygons (lists of closed rings) of a shapefile shape.
+
+    Shapefile outer rings are clockwise, as d3-geo expects; each counterclockwise
+    ring is a hole of the outer ring before it.
+    """
+    bounds = list(shape.parts) + [len(shape.points)]
+    polygons = []
+    for start, end in zip(bounds[:-1], bounds[1:]):
+        ring = grid(np.asarray(shape.points[start:end], dtype=float))
+        keep = np.ones(len(ring), dtype=bool)
+        keep[1:] = (np.diff(ring, axis=0) != 0).any(axis=1)
+        ring = ring[keep]
+        if len(ring) < 4:
+            continue  # collapsed onto the grid
+        if _signed_area(ring) <= 0 or not polygons:
+            polygons.append([ring])
+        else:
+            polygons[-1].append(ring)
+    return polygons
+
+def _junctions(rings):
+    """Points where rings stop running alongside each other (arcs are cut there)."""
+    neighbours, junctions = {}, set()
+    for ring in rings:
+        points = [tuple(p) for p in ring[:-1].tolist()]
+        for i, point in enumerate(points):
+            pair = (points[i - 1], points[(i + 1) % len(points)])
+            seen = neighbours.setdefault(point, pair)
+            if seen != pair and seen != pair[::-1]:
+                junctions.add(point)
+    return junctions
+
+def _ring_arcs(ring, junctions, arcs, index):
+    """Arc references of one closed ring, adding its new arcs to arcs/index."""
+    points = [tuple(p) for p in ring[:-1].tolist()]
+    cuts = [i for i, p in enumerate(points) if p in junctions]
+    # Start at a junction, or at the lowest point so a ring shared whole (an enclave) matches itself
+    start = cuts[0] if cuts else points.index(min(points))
+    points = points[start:] + points[:start]
+    cuts = [i for i, p in enumerate(points) if p in junctions] or [0]
+    points.append(points[0])
+    references = []
+    for a, b in zip(cuts, cuts[1:] + [len(points) - 1]):
+        arc = tuple(points[a:b + 1])
+        if arc in index:
+            references.append(index[arc])
+        elif arc[::-1] in index:
+            references.append(~index[arc[::-1]])
+        else:
+            index[arc] = len(arcs)
+            references.append(len(arcs))
+            arcs.append(arc)
+    return references
+
+def _polygon_arcs(geometry):
+    return [geometry['arcs']] if geometry['type'] == 'Polygon' else geometry['arcs']
+
+def _rings(geometry):
+    return [ring for polygon in _polygon_arcs(geometry) for ring in polygon]
+
+def build_topology(shapefile_path, quantization=1000000):
+    """World topology in the layout plotly.js reads, from a Natural Earth admin-0 shapefile.
+
+    Countries carry their ISO-3 code as id (resolved by name where the
+    shapefile has none, as for Kosovo); borders are shared arcs, and arcs used
+    by a single country make up the coastlines.
+    """
+    import shapefile
+    from countries import to_iso3
+
+    reader = shapefile.Reader(shapefile_path)
+    fields = [f[0].lower() for f in reader.fields[1:]]
+    shapes, records = reader.shapes(), [dict(zip(fields, r)) for r in reader.records()]
+    boxes = np.array([shape.bbox for shape in shapes])
+    x0, y0 = boxes[:, :2].min(axis=0).tolist()
+    x1, y1 = boxes[:, 2:].max(axis=0).tolist()
+    scale = [(x1 - x0) / (quantization - 1), (y1 - y0) / (quantization - 1)]
+
+    def grid(points):
+        return np.rint((points - [x0, y0]) / scale).astype(np.int64)
+
+    names = [r.get('name') or r.get('admin') for r in records]
+    codes = [r.get('iso_a3') if str(r.get('iso_a3', '-99')) not in ('-99', '') else iso3
+             for r, iso3 in zip(records, to_iso3(names))]
+    countries = [(code, name, _polygons(shape, grid)) for code, name, shape in zip(codes, names, shapes)]
+    countries = [c for c in countries if c[0] and c[2]]
+    junctions = _junctions([ring for _, _, polygons in countries for polygon in polygons for ring in polygon])
+
+    arcs, index, geometries = [], {}, []
+    for code, name, polygons in countries:
+        rings = [[_ring_arcs(ring, junctions, arcs, index) for ring in polygon] for polygon in polygons]
+        if len(rings) == 1:
+            geometry = {'type': 'Polygon', 'arcs': rings[0]}
+        else:
+            geometry = {'type': 'MultiPolygon', 'arcs': rings}
+        geometries.append(dict(geometry, id=code, properties={'name': name}))
+
+    uses = np.zeros(len(arcs), dtype=np.int64)
+    for geometry in geometries:
+        for ring in _rings(geometry):
+            for arc in ring:
+                uses[arc if arc >= 0 else ~arc] += 1
+    empty = {'type': 'GeometryCollection', 'geometries': []}
+    return {
+        'type': 'Topology',
+        'bbox': [x0, y0, x1, y1],
+        'transform': {'scale': scale, 'translate': [x0, y0]},
+        'objects': {
+            'countries': {'type': 'GeometryCollection', 'geometries': geometries},
+            'land': {'type': 'MultiPolygon', 'arcs': [p for g in geometries for p in _polygon_arcs(g)]},
+            'coastlines': {'type': 'MultiLineString', 'arcs': [[i] for i in np.flatnonzero(uses == 1).tolist()]},
+            'ocean': empty, 'lakes': empty, 'rivers': empty, 'subunits': empty,
+        },
+        'arcs': [np.vstack([arc[:1], np.diff(arc, axis=0)]).tolist() for arc in map(np.array, arcs)],
+    }
+
+def write_topology(topology, path):
+    """Write a topology as compact JSON, atomically."""
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(topology, f, separators=(',', ':'))
+    os.replace(tmp_path, path)
+
+def build_geometry(shapefile_path, directory=GEOMETRY_DIR, resolutions=RESOLUTIONS):
+    """Build the world topologies from a local shapefile, for when the CDN cannot be reached."""
+    os.makedirs(directory, exist_ok=True)
+    topology = build_topology(shapefile_path)
+    for resolution, quantization in resolutions.items():
+        path = os.path.join(directory, topojson_name(resolution))
+        write_topology(simplify_topology(topology, quantization), path)
+        print(f"  {path}: {os.path.getsize(path) / 1024:.0f} KiB")
+
+def geometry_available(directory=GEOMETRY_DIR):
+    """True if every resolution has a local topology."""
+    return all(os.path.exists(os.path.join(directory, topojson_name(r))) for r in RESOLUTIONS)
+
+def install_geometry(target_dir, directory=GEOMETRY_DIR):
+    """Copy the local topologies to target_dir/topojson (once); returns the topojsonURL or None."""
+    if not geometry_available(directory):
+        return None
+    destination = os.path.join(target_dir, TOPOJSON_DIRNAME)
+    os.makedirs(destination, exist_ok=True)
+    for resolution in RESOLUTIONS:
+        name = topojson_name(resolution)
+        source, path = os.path.join(directory, name), os.path.join(destination, name)
+        if not os.path.exists(path) or os.path.getmtime(path) < os.path.getmtime(source):
+            tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            shutil.copyfile(source, tmp_path)
+            os.replace(tmp_path, path)
+    return f"{TOPOJSON_DIRNAME}/"
+
+def has_geo(fig):
+    """True if a figure (or figure dict) draws on a geo subplot."""
+    data = fig['data'] if isinstance(fig, dict) else fig.data
+    return any((trace['type'] if isinstance(trace, dict) else trace.type) in ('choropleth', 'scattergeo')
+               for trace in data)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Manage the local map geometry.")
+    sub = parser.add_subparsers(dest='command', required=True)
+    fetch = sub.add_parser('fetch', help='download and simplify the world topology into geometry/')
+    fetch.add_argument('--source-url', default=TOPOJSON_SOURCE_URL)
+    build = sub.add_parser('build', help='build the world topology from a local Natural Earth shapefile (needs pyshp)')
+    build.add_argument('shapefile', help='admin-0 countries .shp, e.g. ne_110m_admin_0_countries.shp')
+    args = parser.parse_args()
+    if args.command == 'build':
+        build_geometry(args.shapefile)
+    else:
+        fetch_geometry(args.source_url)
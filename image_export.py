@@ -0,0 +1,196 @@
+import os
+import pathlib
+import argparse
+import time
+import traceback
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+
+try:
+    import kaleido
+except ImportError:
+    kaleido = None
+
+import plot_utils
+from build_manifest import is_up_to_date, job_hash, load_manifest, save_manifest
+from geometry import GEOMETRY_DIR, geometry_available, has_geo
+from instrumentation import stage
+from render_scheduler import default_workers, input_rows
+
+# Static PNG/SVG/WebP copies of the dashboard figures. Every image of a run is
+# rendered by one Kaleido browser with a few tabs, so the renderer starts once
+# instead of once per write_image call.
+IMAGE_DIR = os.environ.get('IMAGE_DIR', 'images')
+IMAGE_MANIFEST = 'manifest.json'
+IMAGE_FORMATS = ('png', 'svg', 'webp')
+
+# Size name -> (width, height, scale); files of other sizes get a _<size> suffix
+IMAGE_SIZES = {
+    'default': (1200, 700, 1),
+    'thumbnail': (480, 280, 1),
+    'retina': (1200, 700, 2),
+}
+DEFAULT_FORMATS = os.environ.get('IMAGE_FORMATS', 'png').split(',')
+DEFAULT_SIZES = os.environ.get('IMAGE_SIZES', 'default').split(',')
+# Browser tabs rendering at once
+RENDER_TABS = int(os.environ.get('IMAGE_RENDER_TABS', 4))
+
+# One output file: figure job filename rendered at a named size in one format
+ImageTarget = namedtuple('ImageTarget', ['figure', 'image', 'format', 'size'])
+ImageResult = namedtuple('ImageResult', ['image', 'error', 'bytes'], defaults=[0])
+
+def image_name(figure, fmt, size):
+    """Image file name for a figure job filename, e.g. oic_scatter_thumbnail.png."""
+    stem = os.path.splitext(figure)[0]
+    suffix = '' if size == 'default' else f'_{size}'
+    return f"{stem}{suffix}.{fmt}"
+
+def image_targets(jobs, formats=DEFAULT_FORMATS, sizes=DEFAULT_SIZES):
+    """Every (figure, format, size) combination to export."""
+    for fmt in formats:
+        if fmt not in IMAGE_FORMATS:
+            raise ValueError(f"Unknown image format '{fmt}', expected one of {IMAGE_FORMATS}")
+    for size in sizes:
+        if size not in IMAGE_SIZES:
+            raise ValueError(f"Unknown image size '{size}', expected one of {sorted(IMAGE_SIZES)}")
+    return [ImageTarget(job.filename, image_name(job.filename, fmt, size), fmt, size)
+            for job in jobs for fmt in formats for size in sizes]
+
+def image_spec(target):
+    """Output settings hashed alongside the figure's inputs."""
+    version = getattr(kaleido, '__version__', None)
+    return f"image:{target.format}:{target.size}:{IMAGE_SIZES[target.size]}:kaleido {version}"
+
+def build_figure_dict(job):
+    """Build one figure job in a worker; returns (filename, figure dict, error)."""
+    try:
+        with stage('build', figure=job.filename, rows=input_rows(job.args)):
+            fig = job.build(*job.args)
+        return job.filename, fig.to_dict(), None
+    except Exception:
+        return job.filename, None, traceback.format_exc()
+
+def build_figure_dicts(jobs, max_workers=None):
+    """Figure dicts for the jobs, built in a process pool; ({filename: dict}, {filename: error})."""
+    max_workers = max_workers or default_workers()
+    if max_workers == 1 or len(jobs) <= 1:
+        built = [build_figure_dict(job) for job in jobs]
+    else:
+        with ProcessPoolExecutor(max_workers=min(max_workers, len(jobs))) as executor:
+            built = list(executor.map(build_figure_dict, jobs))
+    figures = {name: fig for name, fig, error in built if error is None}
+    errors = {name: error for name, _, error in built if error is not None}
+    return figures, errors
+
+def renderer_options(tabs):
+    """Kaleido options: tab count and the local plotly.js bundle the figures were written for."""
+    return dict(n=tabs, plotlyjs=os.path.abspath(plot_utils.write_shared_plotlyjs()))
+
+def render_images(specs, tabs=RENDER_TABS):
+    """Render Kaleido specs ({fig, path, opts}) in one browser session.
+
+    Kaleido writes each path; failures are detected afterwards from the files
+    that are missing, so one bad figure does not hide the others.
+    """
+    if kaleido is None or not hasattr(kaleido, 'write_fig_from_object_sync'):
+        raise RuntimeError("Image export needs kaleido>=1.0 (pip install -U kaleido) and Chrome "
+                           "(plotly_get_chrome).")
+    if specs:
+        with stage('render_images', images=len(specs), tabs=tabs):
+            kaleido.write_fig_from_object_sync(specs, kopts=renderer_options(tabs))
+
+def export_images(jobs, formats=DEFAULT_FORMATS, sizes=DEFAULT_SIZES, image_dir=IMAGE_DIR,
+                  max_workers=None, tabs=RENDER_TABS, force=False):
+    """Export every figure job to static images, skipping images whose inputs are unchanged.
+
+    Figures are built in a process pool, then rendered together by one warm
+    Kaleido browser. Returns a list of ImageResult.
+    """
+    start = time.perf_counter()
+    jobs = {job.filename: job for job in jobs}
+    targets = image_targets(jobs.values(), formats, sizes)
+    manifest_path = os.path.join(image_dir, IMAGE_MANIFEST)
+    digests = {t.image: job_hash(jobs[t.figure], image_spec(t)) for t in targets}
+    if not force:
+        manifest = load_manifest(manifest_path)
+        pending = [t for t in targets if not is_up_to_date(manifest, t.image, digests[t.image], image_dir)]
+        if len(pending) < len(targets):
+            print(f"Skipping {len(targets) - len(pending)} unchanged images (use --force to re-export).")
+        targets = pending
+    if not targets:
+        print(f"All images in {image_dir}/ are up to date.")
+        return []
+
+    figures, errors = build_figure_dicts([jobs[name] for name in dict.fromkeys(t.figure for t in targets)],
+                                         max_workers)
+    built = time.perf_counter()
+    os.makedirs(image_dir, exist_ok=True)
+
+    # Kaleido writes to temporary names that are renamed into place once complete
+    specs, tmp_paths = [], {}
+    topojson = pathlib.Path(GEOMETRY_DIR).resolve().as_uri() + '/' if geometry_available() else None
+    for target in targets:
+        if target.figure not in figures:
+            continue
+        width, height, scale = IMAGE_SIZES[target.size]
+        stem, ext = os.path.splitext(os.path.join(image_dir, target.image))
+        tmp_paths[target.image] = f"{stem}.{os.getpid()}.tmp{ext}"
+        spec = dict(fig=figures[target.figure], path=tmp_paths[target.image],
+                    opts=dict(format=target.format, width=width, height=height, scale=scale))
+        if topojson and has_geo(spec['fig']):
+            # Maps read the local world geometry instead of the plotly CDN
+            spec['topojson'] = topojson
+        specs.append(spec)
+    render_error = None
+    try:
+        render_images(specs, tabs)
+    except Exception:
+        render_error = traceback.format_exc()
+
+    results = []
+    for target in targets:
+        tmp_path = tmp_paths.get(target.image)
+        if target.figure in errors:
+            results.append(ImageResult(target.image, errors[target.figure]))
+        elif tmp_path is None or not os.path.exists(tmp_path):
+            results.append(ImageResult(target.image, render_error or "Renderer wrote no image"))
+        else:
+            path = os.path.join(image_dir, target.image)
+            os.replace(tmp_path, path)
+            results.append(ImageResult(target.image, None, os.path.getsize(path)))
+
+    exported = {r.image: digests[r.image] for r in results if r.error is None}
+    if exported:
+        save_manifest(exported, manifest_path)
+    report(results, built - start, time.perf_counter() - built)
+    return results
+
+def report(results, build_seconds, render_seconds):
+    """Print exported image sizes and failures."""
+    for result in sorted(results, key=lambda r: r.image):
+        status = "ok  " if result.error is None else "FAIL"
+        print(f"  {status} {result.bytes / 1024:8.1f} KiB  {result.image}")
+    failures = [r for r in results if r.error is not None]
+    for error in dict.fromkeys(r.error for r in failures):
+        names = ', '.join(r.image for r in failures if r.error == error)
+        print(f"\nError exporting {names}:\n{error}")
+    print(f"Exported {len(results) - len(failures)}/{len(results)} images "
+          f"(build {build_seconds:.2f}s, render {render_seconds:.2f}s)")
+
+if __name__ == "__main__":
+    from dashboard_bundler import dashboard_figure_jobs
+
+    parser = argparse.ArgumentParser(description="Export the dashboard figures as static images.")
+    parser.add_argument('figures', nargs='*', help='figure files to export (default: all), e.g. oic_scatter.html')
+    parser.add_argument('--formats', default=','.join(DEFAULT_FORMATS), help=f"comma-separated, from {IMAGE_FORMATS}")
+    parser.add_argument('--sizes', default=','.join(DEFAULT_SIZES), help=f"comma-separated, from {tuple(IMAGE_SIZES)}")
+    parser.add_argument('--out', default=IMAGE_DIR, help=f"output directory (default: {IMAGE_DIR})")
+    parser.add_argument('--workers', type=int, default=None, help='figure build processes (default: one per CPU)')
+    parser.add_argument('--tabs', type=int, default=RENDER_TABS, help=f"renderer tabs (default: {RENDER_TABS})")
+    parser.add_argument('--force', action='store_true', help='re-export every image even if unchanged')
+    args = parser.parse_args()
+
+    jobs = dashboard_figure_jobs()
+    selected = [jobs[name] for name in args.figures] if args.figures else list(jobs.values())
+    export_images(selected, args.formats.split(','), args.sizes.split(','), args.out,
+                  args.workers, args.tabs, args.force)
@@ -0,0 +1,44 @@
+import os
+import argparse
+from download_imf import COUNTRIES_FILE, MAX_WORKERS, download_data
+from process_imf_data import DEBT_FILE, OUTPUT_CSV, load_countries_map, parse_imf_file, process_parsed
+
+def run_pipeline(base_url=None, max_workers=MAX_WORKERS, force=False):
+    """Download -> parse -> categorize -> CSV/store in one process.
+
+    Each indicator file is parsed as soon as its download completes, while the
+    others are still in flight, and the parsed records are handed over in memory.
+    Returns the categorized frame, or None if nothing needed processing.
+    """
+    parsed = {}
+
+    def on_complete(path, status):
+        # Files are renamed into place only once complete, so a fresh one is whole here
+        if path != COUNTRIES_FILE and status in ('downloaded', 'resumed'):
+            parsed[path] = parse_imf_file(path)
+
+    results = download_data(base_url=base_url, max_workers=max_workers, on_complete=on_complete)
+
+    unchanged = all(status == 'not modified' for status in results.values())
+    if unchanged and not force and os.path.exists(OUTPUT_CSV):
+        print("IMF data not modified; outputs are up to date")
+        return None
+
+    # Unchanged or failed downloads keep their previous, complete copy
+    for path in results:
+        if path != COUNTRIES_FILE and path not in parsed and os.path.exists(path):
+            parsed[path] = parse_imf_file(path)
+    if DEBT_FILE not in parsed:
+        print(f"No {DEBT_FILE} available; nothing to process")
+        return None
+
+    print(f"Processing {len(parsed)} parsed IMF files...")
+    return process_parsed(parsed, load_countries_map(COUNTRIES_FILE))
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Download and process IMF datamapper data in one run.")
+    parser.add_argument('--base-url', default=None, help="datamapper API root (default: IMF_API_URL)")
+    parser.add_argument('--workers', type=int, default=MAX_WORKERS, help="concurrent downloads")
+    parser.add_argument('--force', action='store_true', help="reprocess even if nothing was modified")
+    args = parser.parse_args()
+    run_pipeline(base_url=args.base_url, max_workers=args.workers, force=args.force)
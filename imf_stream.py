@@ -0,0 +1,132 @@
+import json
+
+CHUNK_SIZE = 1 << 16
+WHITESPACE = ' \t\n\r'
+DELIMITERS = WHITESPACE + ',:]}'
+
+class _StreamReader:
+    """Chunked reader over a JSON text that only keeps the unparsed tail in memory."""
+
+    def __init__(self, f, chunk_size=CHUNK_SIZE):
+        self.f = f
+        self.chunk_size = chunk_size
+        self.buffer = ''
+        self.pos = 0
+        self.eof = False
+        self.decoder = json.JSONDecoder()
+
+    def _fill(self):
+        """Read another chunk, dropping the already consumed prefix of the buffer."""
+        if self.eof:
+            return False
+        chunk = self.f.read(self.chunk_size)
+        if not chunk:
+            self.eof = True
+            return False
+        self.buffer = self.buffer[self.pos:] + chunk
+        self.pos = 0
+        return True
+
+    def peek(self):
+        """Next non-whitespace character, or '' at end of input."""
+        while True:
+            while self.pos < len(self.buffer) and self.buffer[self.pos] in WHITESPACE:
+                self.pos += 1
+            if self.pos < len(self.buffer):
+                return self.buffer[self.pos]
+            if not self._fill():
+                return ''
+
+    def expect(self, char):
+        found = self.peek()
+        if found != char:
+            raise ValueError(f"Expected '{char}' in IMF payload, found '{found or 'EOF'}'")
+        self.pos += 1
+
+    def read_value(self):
+        """Decode one complete JSON value (a scalar or a small object) at the cursor."""
+        self.peek()
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self.buffer, self.pos)
+                # A value is only complete once a delimiter follows it; otherwise a
+                # number cut at the chunk boundary ('12' of '12.5') would be accepted
+                if (end < len(self.buffer) and self.buffer[end] in DELIMITERS) or self.eof:
+                    self.pos = end
+                    return value
+            except json.JSONDecodeError:
+                if self.eof:
+                    raise
+            self._fill()
+
+    def skip_value(self):
+        """Skip a value without materialising large containers."""
+        if self.peek() == '{':
+            for _ in self.iter_object():
+                self.skip_value()
+        elif self.peek() == '[':
+            self.pos += 1
+            if self.peek() == ']':
+                self.pos += 1
+                return
+            while True:
+                self.skip_value()
+                if self.peek() == ',':
+                    self.pos += 1
+                    continue
+                self.expect(']')
+                return
+        else:
+            self.read_value()
+
+    def iter_object(self):
+        """Yield each key of the object at the cursor, leaving the cursor on its value.
+
+        The caller must consume (read or skip) the value before advancing.
+        """
+        self.expect('{')
+        if self.peek() == '}':
+            self.pos += 1
+            return
+        while True:
+            key = self.read_value()
+            self.expect(':')
+            yield key
+            if self.peek() == ',':
+                self.pos += 1
+                continue
+            self.expect('}')
+            return
+
+def iter_imf_series(f, indicators=None, years=None, chunk_size=CHUNK_SIZE):
+    """Stream (indicator, country, {year: value}) records from an IMF datamapper payload.
+
+    Only the 'values' section is parsed; other indicators are skipped and each
+    country's year map is filtered to the requested years, so memory stays bounded
+    by a single country record rather than the whole file.
+    """
+    reader = _StreamReader(f, chunk_size)
+    wanted_indicators = set(indicators) if indicators is not None else None
+    wanted_years = {str(y) for y in years} if years is not None else None
+
+    for top_key in reader.iter_object():
+        if top_key != 'values' or reader.peek() != '{':
+            reader.skip_value()
+            continue
+        for indicator in reader.iter_object():
+            if reader.peek() != '{' or (wanted_indicators is not None and indicator not in wanted_indicators):
+                reader.skip_value()
+                continue
+            for country_code in reader.iter_object():
+                year_data = reader.read_value()
+                if not isinstance(year_data, dict):
+                    continue
+                if wanted_years is not None:
+                    year_data = {y: v for y, v in year_data.items() if y in wanted_years}
+                yield indicator, country_code, year_data
+
+def iter_imf_values(f, indicators=None, years=None, chunk_size=CHUNK_SIZE):
+    """Stream (indicator, country, year, value) triples from an IMF datamapper payload."""
+    for indicator, country_code, year_data in iter_imf_series(f, indicators, years, chunk_size):
+        for year, value in year_data.items():
+            yield indicator, country_code, year, value
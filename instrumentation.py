@@ -0,0 +1,222 @@
+import os
+import sys
+import json
+import atexit
+import argparse
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+# Stage timings for the pipeline. Each stage() records wall time, peak memory
+# and any rows/bytes the caller reports, and appends one JSON line per stage to
+# INSTRUMENT_LOG. Worker processes inherit the settings through the environment
+# and append to the same file. With INSTRUMENT_TRACE set, the run's stages are
+# also written as a Chrome trace (chrome://tracing, Perfetto) when the process
+# that started the run exits. With neither set, stages only time themselves.
+LOG_PATH = os.environ.get('INSTRUMENT_LOG')
+TRACE_PATH = os.environ.get('INSTRUMENT_TRACE')
+# Peak memory per stage from tracemalloc (Python allocations, slower) instead of
+# the peak RSS within the stage
+TRACE_MALLOC = os.environ.get('INSTRUMENT_TRACEMALLOC', '0') == '1'
+
+_write_lock = threading.Lock()
+_local = threading.local()
+
+def enabled():
+    return LOG_PATH is not None
+
+def _peak_rss_bytes():
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kilobytes on Linux, bytes on macOS
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+def _proc_rss_bytes(field='VmRSS'):
+    """Current (VmRSS) or peak (VmHWM) resident size from /proc; None where there is no /proc."""
+    try:
+        with open('/proc/self/status', 'r') as f:
+            for line in f:
+                if line.startswith(field + ':'):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    return None
+
+def _reset_peak_rss():
+    """Reset the kernel's peak RSS (VmHWM) so it covers one stage; False where not supported."""
+    try:
+        with open('/proc/self/clear_refs', 'w') as f:
+            f.write('5')
+        return True
+    except OSError:
+        return False
+
+def _stage_peak(start_rss, start_peak, reset):
+    """Peak RSS within a stage, rather than the process lifetime peak.
+
+    With a resettable VmHWM this is exact. Otherwise ru_maxrss is only
+    attributable to the stage when the stage raised it, and the larger of the
+    start and end RSS is the best bound left.
+    """
+    if reset:
+        return _proc_rss_bytes('VmHWM')
+    peak = _peak_rss_bytes()
+    if peak is not None and start_peak is not None and peak > start_peak:
+        return peak
+    current = [rss for rss in (start_rss, _proc_rss_bytes()) if rss is not None]
+    return max(current) if current else None
+
+def emit(record):
+    """Append one JSON record to the log."""
+    if LOG_PATH is None:
+        return
+    line = json.dumps(record, default=str) + '\n'
+    with _write_lock, open(LOG_PATH, 'a', encoding='utf-8') as f:
+        f.write(line)
+
+@contextmanager
+def stage(name, **fields):
+    """Time a pipeline stage; yields a dict for counters such as rows and bytes.
+
+    Stages nest: each record names its parent stage. An exception is recorded
+    with the stage and re-raised.
+    """
+    span = dict(fields)
+    stack = getattr(_local, 'stack', None)
+    if stack is None:
+        stack = _local.stack = []
+    peaks = getattr(_local, 'peaks', None)
+    if peaks is None:
+        peaks = _local.peaks = []
+    parent = stack[-1] if stack else None
+    stack.append(name)
+    measure_rss = enabled() and not TRACE_MALLOC
+    if measure_rss:
+        # Resetting VmHWM would lose the enclosing stage's peak so far; carry it up first
+        if peaks and getattr(_local, 'reset', False):
+            peaks[-1] = max(peaks[-1], _proc_rss_bytes('VmHWM') or 0)
+        start_rss, start_peak = _proc_rss_bytes(), _peak_rss_bytes()
+        reset = _local.reset = _reset_peak_rss()
+    peaks.append(0)
+    if TRACE_MALLOC and enabled():
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+        tracemalloc.reset_peak()
+    start_ns = time.time_ns()
+    start = time.perf_counter()
+    status = 'ok'
+    try:
+        yield span
+    except BaseException as e:
+        status = 'error'
+        span['error'] = f"{type(e).__name__}: {e}"
+        raise
+    finally:
+        stack.pop()
+        child_peak = peaks.pop()
+        span['seconds'] = time.perf_counter() - start
+        if enabled():
+            if measure_rss:
+                peak = _stage_peak(start_rss, start_peak, reset)
+                if peak is not None:
+                    peak = max(peak, child_peak)
+                    if peaks:
+                        peaks[-1] = max(peaks[-1], peak)
+                memory = {'peak_rss_bytes': peak, 'start_rss_bytes': start_rss,
+                          'rss_growth_bytes': None if peak is None or start_rss is None else peak - start_rss}
+            else:
+                memory = {'peak_traced_bytes': tracemalloc.get_traced_memory()[1]}
+            emit(dict(run=RUN_ID, stage=name, parent=parent, status=status, ts_us=start_ns // 1000,
+                      pid=os.getpid(), tid=threading.get_ident(), **memory, **span))
+
+def read_log(log_path=LOG_PATH, run=None):
+    """Records of the log, optionally only those of one run."""
+    records = []
+    if log_path is None or not os.path.exists(log_path):
+        return records
+    with open(log_path, 'r', encoding='utf-8') as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue  # a line cut short by a crashed writer
+            if run is None or record.get('run') == run:
+                records.append(record)
+    return records
+
+def trace_events(records):
+    """Chrome trace 'complete' events for stage records."""
+    events = []
+    for record in records:
+        args = {k: v for k, v in record.items() if k not in ('stage', 'ts_us', 'pid', 'tid', 'seconds', 'run')}
+        events.append(dict(name=record['stage'], cat=record.get('parent') or 'pipeline', ph='X',
+                           ts=record['ts_us'], dur=round(record['seconds'] * 1e6), pid=record['pid'],
+                           tid=record['tid'] % 2 ** 31, args=args))
+    return events
+
+def write_trace(trace_path, log_path=LOG_PATH, run=None):
+    """Write the stages of a run as a Chrome trace file."""
+    events = trace_events(read_log(log_path, run))
+    tmp_path = f"{trace_path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump({'traceEvents': events, 'displayTimeUnit': 'ms'}, f)
+    os.replace(tmp_path, trace_path)
+    print(f"Wrote {len(events)} trace events to {trace_path}")
+
+def summarize(records, top=15):
+    """Print total time, rows and bytes per stage, slowest first."""
+    totals = {}
+    for record in records:
+        total = totals.setdefault(record['stage'], dict(count=0, seconds=0.0, rows=0, bytes=0, errors=0))
+        total['count'] += 1
+        total['seconds'] += record['seconds']
+        total['rows'] += record.get('rows') or 0
+        total['bytes'] += record.get('bytes') or 0
+        total['errors'] += record['status'] != 'ok'
+    print(f"{'stage':<16} {'count':>6} {'seconds':>9} {'rows':>10} {'KiB':>10} errors")
+    for name, total in sorted(totals.items(), key=lambda item: item[1]['seconds'], reverse=True)[:top]:
+        print(f"{name:<16} {total['count']:>6} {total['seconds']:>9.3f} {total['rows']:>10} "
+              f"{total['bytes'] / 1024:>10.1f} {total['errors']}")
+    slowest = sorted(records, key=lambda r: r['seconds'], reverse=True)[:top]
+    print("\nSlowest stages:")
+    for record in slowest:
+        label = record.get('figure') or record.get('path') or ''
+        print(f"  {record['seconds']:8.3f}s  {record['stage']:<12} {label}")
+
+def _start_run():
+    """Run id shared with worker processes; the process that creates it writes the trace."""
+    global LOG_PATH
+    if TRACE_PATH and not LOG_PATH:
+        LOG_PATH = os.environ['INSTRUMENT_LOG'] = f"{TRACE_PATH}.jsonl"
+    if 'INSTRUMENT_RUN' in os.environ:
+        return os.environ['INSTRUMENT_RUN']
+    run = os.environ['INSTRUMENT_RUN'] = f"{os.getpid()}-{time.time_ns()}"
+    if TRACE_PATH:
+        atexit.register(write_trace, TRACE_PATH, LOG_PATH, run)
+    return run
+
+RUN_ID = _start_run() if (LOG_PATH or TRACE_PATH) else None
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Summarize an instrumentation log.")
+    parser.add_argument('log', nargs='?', default=LOG_PATH, help='JSON-lines log (default: INSTRUMENT_LOG)')
+    parser.add_argument('--run', default=None, help='only this run id (default: the last run in the log)')
+    parser.add_argument('--trace', default=None, help='also write the run as a Chrome trace to this path')
+    args = parser.parse_args()
+
+    records = read_log(args.log)
+    run = args.run or (records[-1]['run'] if records else None)
+    records = [r for r in records if r.get('run') == run]
+    if not records:
+        sys.exit(f"No stage records in {args.log}")
+    print(f"Run {run}: {len(records)} stages")
+    summarize(records)
+    if args.trace:
+        write_trace(args.trace, args.log, run)
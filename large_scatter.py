@@ -0,0 +1,94 @@
+import os
+
+import numpy as np
+import plotly.graph_objects as go
+
+from figure_theme import LIGHT_THEME
+
+# How scatter builders scale with the number of points. SVG draws one DOM node
+# per marker and stalls in the thousands; WebGL (scattergl) draws the same
+# markers on the GPU. Past the aggregation threshold even WebGL hover gets
+# heavy, so the points are binned in Python (np.histogram2d) and drawn as a
+# density heatmap of a few thousand cells with the median y per x bin on top.
+#   'auto'   - SVG, then WebGL above WEBGL_THRESHOLD, then binned above AGGREGATE_THRESHOLD
+#   'svg' / 'webgl' / 'binned' - always that mode
+SCATTER_MODES = ('auto', 'svg', 'webgl', 'binned')
+SCATTER_MODE = os.environ.get('SCATTER_MODE', 'auto')
+WEBGL_THRESHOLD = int(os.environ.get('SCATTER_WEBGL_THRESHOLD', 1000))
+AGGREGATE_THRESHOLD = int(os.environ.get('SCATTER_AGGREGATE_THRESHOLD', 50000))
+DENSITY_BINS = (80, 60)  # x, y
+DENSITY_COLORSCALE = 'Blues'
+
+def scatter_settings():
+    """Settings that change a scatter figure built from the same data (for the build manifest)."""
+    return (SCATTER_MODE, WEBGL_THRESHOLD, AGGREGATE_THRESHOLD, DENSITY_BINS)
+
+def scatter_mode(points, mode=None):
+    """'svg', 'webgl' or 'binned' for a scatter of this many points."""
+    mode = mode or SCATTER_MODE
+    if mode not in SCATTER_MODES:
+        raise ValueError(f"Unknown scatter mode '{mode}', expected one of {SCATTER_MODES}")
+    if mode != 'auto':
+        return mode
+    if points > AGGREGATE_THRESHOLD:
+        return 'binned'
+    return 'webgl' if points > WEBGL_THRESHOLD else 'svg'
+
+def bin_edges(values, bins, log=False):
+    """Edges spanning the finite values, evenly spaced (in log10 if log)."""
+    values = values[np.isfinite(values) & ((values > 0) if log else True)]
+    low, high = values.min(), values.max()
+    if high == low:
+        high = low + (abs(low) or 1.0)
+    return np.geomspace(low, high, bins + 1) if log else np.linspace(low, high, bins + 1)
+
+def binned_medians(x, y, edges):
+    """Median y of the points in each x bin (NaN for empty bins), from one sort."""
+    bins = np.clip(np.searchsorted(edges, x, side='right') - 1, 0, len(edges) - 2)
+    order = np.lexsort((y, bins))
+    bins, y = bins[order], y[order]
+    counts = np.bincount(bins, minlength=len(edges) - 1)
+    starts = np.concatenate([[0], np.cumsum(counts)[:-1]])
+    medians = np.full(len(counts), np.nan)
+    filled = counts > 0
+    low = starts[filled] + (counts[filled] - 1) // 2
+    high = starts[filled] + counts[filled] // 2
+    medians[filled] = (y[low] + y[high]) / 2
+    return medians
+
+def density_figure(x, y, title, x_title, y_title, log_x=False, bins=DENSITY_BINS, theme=LIGHT_THEME):
+    """Heatmap of point counts on a bins[0] x bins[1] grid with the median y per x bin."""
+    x, y = np.asarray(x, dtype=float), np.asarray(y, dtype=float)
+    keep = np.isfinite(x) & np.isfinite(y) & ((x > 0) if log_x else True)
+    x, y = x[keep], y[keep]
+    x_edges, y_edges = bin_edges(x, bins[0], log_x), bin_edges(y, bins[1])
+    counts, _, _ = np.histogram2d(x, y, bins=(x_edges, y_edges))
+    x_centers = np.sqrt(x_edges[:-1] * x_edges[1:]) if log_x else (x_edges[:-1] + x_edges[1:]) / 2
+
+    fig = go.Figure()
+    fig.add_trace(go.Heatmap(
+        # One more edge than cells: plotly reads them as cell bounds, which stay exact on a log axis
+        x=x_edges,
+        y=y_edges,
+        z=np.where(counts.T > 0, counts.T, np.nan),
+        colorscale=DENSITY_COLORSCALE,
+        colorbar=dict(title='Points'),
+        hovertemplate=f'{x_title}: %{{x:.3s}}<br>{y_title}: %{{y:.1f}}<br>%{{z}} points<extra></extra>'
+    ))
+    fig.add_trace(go.Scatter(
+        x=x_centers,
+        y=binned_medians(x, y, x_edges),
+        mode='lines',
+        line=dict(color='#d32f2f', width=2),
+        name=f'Median {y_title}',
+        connectgaps=True,
+        hovertemplate='Median: %{y:.1f}<extra></extra>'
+    ))
+    fig.update_layout(
+        template=theme,
+        title=f'{title} ({len(x):,} points, binned)',
+        xaxis=dict(title=x_title, type='log' if log_x else 'linear'),
+        yaxis_title=y_title,
+        showlegend=False
+    )
+    return fig
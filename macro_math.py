@@ -0,0 +1,84 @@
+import numpy as np
+import pandas as pd
+
+# Vectorized price-level arithmetic over country x year panels. Every function
+# accepts a 1-D series (one country), a 2-D array or a wide DataFrame with one
+# row per country and one column per year; years always run along the last axis.
+
+# Mass units in grams, for converting commodity prices between units
+UNIT_GRAMS = {
+    'gram': 1.0,
+    'kg': 1000.0,
+    'troy_oz': 31.1034768,
+    'bhori': 11.664,  # Bangladesh gold unit (1 bhori = 1 tola = 16 ana)
+}
+
+def panel_matrix(df, index='country_code', columns='year', values='value'):
+    """Wide country x year DataFrame from long-format store rows, years ascending."""
+    wide = df.pivot(index=index, columns=columns, values=values)
+    return wide.reindex(columns=sorted(wide.columns))
+
+def _wrap(result, like):
+    """Give a computed array the index/columns (or name) of the input it came from."""
+    if isinstance(like, pd.DataFrame):
+        return pd.DataFrame(result, index=like.index, columns=like.columns)
+    if isinstance(like, pd.Series):
+        return pd.Series(result, index=like.index, name=like.name)
+    return result
+
+def cumulative_deflator(rates):
+    """Cumulative price level implied by annual inflation rates (%), starting from 1.
+
+    Each year's factor includes that year's inflation, so the price level after
+    year t is prod(1 + rate / 100) up to and including t. A missing rate counts
+    as no inflation for the chain but stays missing in the result.
+    """
+    values = np.asarray(rates, dtype=float)
+    missing = np.isnan(values)
+    levels = np.cumprod(1 + np.where(missing, 0.0, values) / 100, axis=-1)
+    return _wrap(np.where(missing, np.nan, levels), rates)
+
+def purchasing_power(rates, start=1.0):
+    """Value of start units of money after each year's inflation (%)."""
+    return start / cumulative_deflator(rates)
+
+def rebase(levels, years, base_year, base_value=1.0):
+    """Rescale an index so that it equals base_value in base_year.
+
+    years labels the last axis of levels (a DataFrame's columns can be passed).
+    """
+    years = np.asarray(years)
+    position = np.flatnonzero(years == base_year)
+    if position.size == 0:
+        raise ValueError(f"Base year {base_year} is not in the series")
+    values = np.asarray(levels, dtype=float)
+    base = values[..., position[0], np.newaxis]
+    return _wrap(values / base * base_value, levels)
+
+def convert_currency(amounts, exchange_rates):
+    """Amounts in the base currency times aligned exchange rates (quote per base unit).
+
+    Pandas inputs are aligned on their labels (years for a Series or a DataFrame
+    indexed by year, country x year for wide panels); labels missing on either
+    side give NaN. Several amount columns can be converted with one rate series.
+    """
+    if isinstance(amounts, pd.DataFrame) and isinstance(exchange_rates, pd.Series):
+        return amounts.mul(exchange_rates, axis=0)
+    if isinstance(amounts, (pd.Series, pd.DataFrame)):
+        return amounts * exchange_rates
+    return np.asarray(amounts, dtype=float) * np.asarray(exchange_rates, dtype=float)
+
+def unit_factor(from_unit, to_unit):
+    """Number of to_unit in one from_unit."""
+    for unit in (from_unit, to_unit):
+        if unit not in UNIT_GRAMS:
+            raise ValueError(f"Unknown unit '{unit}', expected one of {sorted(UNIT_GRAMS)}")
+    return UNIT_GRAMS[from_unit] / UNIT_GRAMS[to_unit]
+
+def convert_units(quantities, from_unit, to_unit):
+    """Quantities measured in from_unit expressed in to_unit."""
+    return quantities * unit_factor(from_unit, to_unit)
+
+def price_per_unit(prices, from_unit, to_unit):
+    """Prices quoted per from_unit re-quoted per to_unit."""
+    return prices / unit_factor(from_unit, to_unit)
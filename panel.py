@@ -0,0 +1,210 @@
+import numpy as np
+import pandas as pd
+
+# Country groups for Panel.region(); ISO-3 codes
+REGIONS = {
+    # Organisation of Islamic Cooperation, 57 member states
+    'oic': [
+        'AFG', 'ALB', 'DZA', 'AZE', 'BHR', 'BGD', 'BEN', 'BRN', 'BFA', 'CMR', 'TCD', 'COM', 'DJI', 'EGY', 'GAB',
+        'GMB', 'GIN', 'GNB', 'GUY', 'IDN', 'IRN', 'IRQ', 'CIV', 'JOR', 'KAZ', 'KWT', 'KGZ', 'LBN', 'LBY', 'MYS',
+        'MDV', 'MLI', 'MRT', 'MAR', 'MOZ', 'NER', 'NGA', 'OMN', 'PAK', 'PSE', 'QAT', 'SAU', 'SEN', 'SLE', 'SOM',
+        'SDN', 'SUR', 'SYR', 'TJK', 'TGO', 'TUN', 'TUR', 'TKM', 'UGA', 'ARE', 'UZB', 'YEM',
+    ],
+    # MSCI Emerging Markets index constituents
+    'emerging': [
+        'BRA', 'CHL', 'CHN', 'COL', 'CZE', 'EGY', 'GRC', 'HUN', 'IND', 'IDN', 'KOR', 'KWT', 'MYS', 'MEX',
+        'PER', 'PHL', 'POL', 'QAT', 'SAU', 'ZAF', 'TWN', 'THA', 'TUR', 'ARE',
+    ],
+    'g7': ['CAN', 'FRA', 'DEU', 'ITA', 'JPN', 'GBR', 'USA'],
+}
+
+# How missing years are filled when a panel is moved onto another year grid:
+#   None          - leave them missing
+#   'ffill'       - carry the last observation forward
+#   'interpolate' - linear in the year between the surrounding observations
+FILL_POLICIES = (None, 'ffill', 'interpolate')
+JOIN_HOW = ('outer', 'inner', 'left', 'right')
+
+def _positions(labels):
+    return {label: i for i, label in enumerate(labels)}
+
+def _fill_years(values, years, fill):
+    """Fill NaNs along the year axis (axis 1) of a country x year x indicator array."""
+    if fill is None:
+        return values
+    if fill not in FILL_POLICIES:
+        raise ValueError(f"Unknown fill policy '{fill}', expected one of {FILL_POLICIES}")
+    series = np.moveaxis(values, 1, -1)  # country x indicator x year
+    steps = np.arange(series.shape[-1])
+    valid = ~np.isnan(series)
+
+    # Position of the last observation at or before each year (-1 if none)
+    prev = np.maximum.accumulate(np.where(valid, steps, -1), axis=-1)
+    before = np.take_along_axis(series, np.maximum(prev, 0), axis=-1)
+    if fill == 'ffill':
+        filled = np.where(prev >= 0, before, np.nan)
+    else:
+        # Position of the next observation at or after each year (len if none)
+        last = len(steps)
+        nxt = np.minimum.accumulate(np.where(valid, steps, last)[..., ::-1], axis=-1)[..., ::-1]
+        after = np.take_along_axis(series, np.minimum(nxt, last - 1), axis=-1)
+        x, x0, x1 = years.astype(float), years[np.maximum(prev, 0)], years[np.minimum(nxt, last - 1)]
+        span = np.where(x1 > x0, x1 - x0, 1)
+        filled = before + (after - before) * (x - x0) / span
+        filled = np.where((prev >= 0) & (nxt < last), filled, np.nan)
+    return np.ascontiguousarray(np.moveaxis(filled, -1, 1))
+
+class Panel:
+    """Country x year x indicator values in one contiguous float64 array.
+
+    Labels map to positions through dicts, so point lookups are O(1); slicing by
+    country, year or indicator is NumPy indexing on the shared array.
+    """
+
+    def __init__(self, values, countries, years, indicators, names=None):
+        self.values = np.ascontiguousarray(values, dtype=float)
+        self.countries = list(countries)
+        self.years = np.asarray(years, dtype=int)
+        self.indicators = list(indicators)
+        # Display name per country code, kept for long-format output
+        self.names = dict(names or {})
+        if self.values.shape != (len(self.countries), len(self.years), len(self.indicators)):
+            raise ValueError(f"Values of shape {self.values.shape} do not match the panel labels")
+        self._country_pos = _positions(self.countries)
+        self._year_pos = _positions(self.years.tolist())
+        self._indicator_pos = _positions(self.indicators)
+
+    def __repr__(self):
+        return (f"Panel({len(self.countries)} countries x {len(self.years)} years x "
+                f"{len(self.indicators)} indicators)")
+
+    @property
+    def shape(self):
+        return self.values.shape
+
+    @classmethod
+    def from_long(cls, df):
+        """Panel from long-format store rows (country_code, year, indicator, value)."""
+        country_codes, countries = pd.factorize(df['country_code'], sort=True)
+        year_codes, years = pd.factorize(df['year'].astype(int), sort=True)
+        indicator_codes, indicators = pd.factorize(df['indicator'], sort=True)
+        values = np.full((len(countries), len(years), len(indicators)), np.nan)
+        values[country_codes, year_codes, indicator_codes] = df['value'].to_numpy(dtype=float)
+        names = None
+        if 'country' in df:
+            names = dict(zip(df['country_code'], df['country']))
+        return cls(values, countries, years, indicators, names)
+
+    @classmethod
+    def from_frame(cls, df, country, columns=None):
+        """Single-country panel from a wide {'Year', *columns} frame; columns maps name -> indicator."""
+        columns = columns or {column: column for column in df.columns if column != 'Year'}
+        values = df[list(columns)].to_numpy(dtype=float)[np.newaxis]
+        return cls(values, [country], df['Year'], list(columns.values()))
+
+    def covers(self, countries=(), years=(), indicators=()):
+        """True if every given label is on the panel's axes."""
+        return (all(c in self._country_pos for c in countries)
+                and all(int(y) in self._year_pos for y in years)
+                and all(i in self._indicator_pos for i in indicators))
+
+    def get(self, country, year, indicator):
+        """One value by labels."""
+        return self.values[self._country_pos[country], self._year_pos[int(year)], self._indicator_pos[indicator]]
+
+    def matrix(self, indicator):
+        """Country x year view of one indicator."""
+        return self.values[:, :, self._indicator_pos[indicator]]
+
+    def series(self, country, indicator):
+        """Year-indexed Series of one indicator for one country (missing years as NaN)."""
+        values = self.values[self._country_pos[country], :, self._indicator_pos[indicator]]
+        return pd.Series(values, index=pd.Index(self.years, name='Year'), name=indicator)
+
+    def frame(self, country, columns=None, years=None):
+        """Wide {'Year', *columns} frame for one country, keeping only complete years.
+
+        columns maps output column name -> indicator (default: every indicator).
+        Returns None if the country or any indicator has no data at all.
+        """
+        columns = columns or {indicator: indicator for indicator in self.indicators}
+        if not self.covers([country], indicators=columns.values()):
+            return None
+        block = self.values[self._country_pos[country]][:, [self._indicator_pos[i] for i in columns.values()]]
+        keep = ~np.isnan(block).any(axis=1)
+        if years is not None:
+            keep &= np.isin(self.years, np.asarray(list(years), dtype=int))
+        if np.isnan(block).all(axis=0).any():
+            return None
+        df = pd.DataFrame(block[keep], columns=list(columns))
+        df.insert(0, 'Year', self.years[keep])
+        return df
+
+    def select(self, countries=None, years=None, indicators=None):
+        """Sub-panel for the given labels (all of an axis when None)."""
+        values = self.values
+        if countries is not None:
+            countries = list(countries)
+            values = values[[self._country_pos[c] for c in countries]]
+        if years is not None:
+            years = [int(y) for y in years]
+            values = values[:, [self._year_pos[y] for y in years]]
+        if indicators is not None:
+            indicators = list(indicators)
+            values = values[:, :, [self._indicator_pos[i] for i in indicators]]
+        return Panel(values,
+                     self.countries if countries is None else countries,
+                     self.years if years is None else years,
+                     self.indicators if indicators is None else indicators,
+                     self.names)
+
+    def region(self, name):
+        """Sub-panel of the members of a REGIONS group that the panel has data for."""
+        if name not in REGIONS:
+            raise ValueError(f"Unknown region '{name}', expected one of {sorted(REGIONS)}")
+        return self.select(countries=[c for c in REGIONS[name] if c in self._country_pos])
+
+    def reindex_years(self, years, fill=None):
+        """Panel moved onto another year grid, filling gaps with the given policy."""
+        years = np.asarray(sorted(int(y) for y in years), dtype=int)
+        grid = np.union1d(self.years, years)
+        values = np.full((len(self.countries), len(grid), len(self.indicators)), np.nan)
+        values[:, np.searchsorted(grid, self.years)] = self.values
+        values = _fill_years(values, grid, fill)
+        return Panel(values[:, np.searchsorted(grid, years)], self.countries, years, self.indicators, self.names)
+
+    def join(self, other, how='outer', fill=None):
+        """Combine two panels on one year grid; self's values win where both have one.
+
+        how picks the grid ('outer' union, 'inner' intersection, 'left'/'right'
+        one side's years) and fill how each side's gaps on it are filled.
+        """
+        if how not in JOIN_HOW:
+            raise ValueError(f"Unknown join '{how}', expected one of {JOIN_HOW}")
+        grid = {'outer': np.union1d(self.years, other.years),
+                'inner': np.intersect1d(self.years, other.years),
+                'left': self.years, 'right': other.years}[how]
+        countries = self.countries + [c for c in other.countries if c not in self._country_pos]
+        indicators = self.indicators + [i for i in other.indicators if i not in self._indicator_pos]
+        country_pos, indicator_pos = _positions(countries), _positions(indicators)
+
+        values = np.full((len(countries), len(grid), len(indicators)), np.nan)
+        for panel in (other, self):
+            aligned = panel.reindex_years(grid, fill).values
+            rows = [country_pos[c] for c in panel.countries]
+            cols = [indicator_pos[i] for i in panel.indicators]
+            target = values[np.ix_(rows, range(len(grid)), cols)]
+            values[np.ix_(rows, range(len(grid)), cols)] = np.where(np.isnan(aligned), target, aligned)
+        return Panel(values, countries, grid, indicators, {**other.names, **self.names})
+
+    def to_long(self):
+        """Long-format rows (country_code, country, year, indicator, value) without missing values."""
+        c, y, i = np.nonzero(~np.isnan(self.values))
+        codes = np.asarray(self.countries, dtype=object)[c]
+        return pd.DataFrame({
+            'country_code': codes,
+            'country': [self.names.get(code, code) for code in codes],
+            'year': self.years[y],
+            'indicator': np.asarray(self.indicators, dtype=object)[i],
+            'value': self.values[c, y, i],
+        })
@@ -0,0 +1,122 @@
+import os
+import threading
+import plotly.io as pio
+from plotly.offline import get_plotlyjs, get_plotlyjs_version
+from compact_json import DEFAULT_PRECISION, compact_figure
+from delta_frames import POST_SCRIPT as DELTA_FRAMES_SCRIPT, has_delta_frames
+from geometry import has_geo, install_geometry
+
+OUTPUT_DIR = 'interactive_plots'
+
+# How generated figures load plotly.js:
+#   'shared' - one versioned plotly.js file next to the plots, CDN fallback if it is missing
+#   'cdn'    - reference the plotly.js CDN only
+#   'inline' - embed a full copy in every file (fully self-contained, offline-safe)
+PLOTLYJS_MODES = ('shared', 'cdn', 'inline')
+PLOTLYJS_MODE = os.environ.get('PLOTLYJS_MODE', 'shared')
+
+# How figure data is serialized:
+#   'compact' - typed-array (bdata) trace data, rounded floats, pruned template
+#   'plain'   - plotly's own to_json output
+FIGURE_JSON_MODES = ('compact', 'plain')
+FIGURE_JSON_MODE = os.environ.get('FIGURE_JSON_MODE', 'compact')
+FIGURE_PRECISION = int(os.environ.get('FIGURE_PRECISION', DEFAULT_PRECISION))
+
+PLOTLYJS_VERSION = get_plotlyjs_version()
+PLOTLYJS_FILENAME = f"plotly-{PLOTLYJS_VERSION}.min.js"
+PLOTLYJS_CDN_URL = f"https://cdn.plot.ly/plotly-{PLOTLYJS_VERSION}.min.js"
+
+SHARED_SCRIPT_TAGS = (
+    '<script src="{src}"></script>\n'
+    '<script>window.Plotly || document.write(\'<script src="{cdn}"><\\/script>\')</script>\n'
+)
+
+def check_output_dir():
+    """Ensure the interactive_plots directory exists."""
+    if not os.path.exists(OUTPUT_DIR):
+        os.makedirs(OUTPUT_DIR)
+
+def set_plotlyjs_mode(mode):
+    """Select how subsequently written figures load plotly.js."""
+    global PLOTLYJS_MODE
+    if mode not in PLOTLYJS_MODES:
+        raise ValueError(f"Unknown plotly.js mode '{mode}', expected one of {PLOTLYJS_MODES}")
+    PLOTLYJS_MODE = mode
+
+def set_figure_json_mode(mode, precision=None):
+    """Select how subsequently written figures serialize their data."""
+    global FIGURE_JSON_MODE, FIGURE_PRECISION
+    if mode not in FIGURE_JSON_MODES:
+        raise ValueError(f"Unknown figure JSON mode '{mode}', expected one of {FIGURE_JSON_MODES}")
+    FIGURE_JSON_MODE = mode
+    if precision is not None:
+        FIGURE_PRECISION = precision
+
+def figure_payload(fig):
+    """(figure to serialize, bytes saved by compaction) in the configured figure JSON mode."""
+    if FIGURE_JSON_MODE == 'plain':
+        return fig, 0
+    if FIGURE_JSON_MODE != 'compact':
+        raise ValueError(f"Unknown figure JSON mode '{FIGURE_JSON_MODE}', expected one of {FIGURE_JSON_MODES}")
+    compact = compact_figure(fig, FIGURE_PRECISION)
+    saved = len(pio.to_json(fig, validate=False)) - len(pio.to_json(compact, validate=False))
+    return compact, saved
+
+def write_shared_plotlyjs():
+    """Write the shared, versioned plotly.js bundle next to the plots (once)."""
+    check_output_dir()
+    path = os.path.join(OUTPUT_DIR, PLOTLYJS_FILENAME)
+    if not os.path.exists(path):
+        # Unique per thread too: the dashboard server builds figures concurrently
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "w", encoding='utf-8') as f:
+            f.write(get_plotlyjs())
+        os.replace(tmp_path, path)
+    return path
+
+def page_options(fig):
+    """Extra to_html options a figure needs.
+
+    Map figures get the local world geometry; figures with delta-encoded
+    frames get the script expanding them.
+    """
+    options, scripts = {}, []
+    if has_delta_frames(fig):
+        scripts.append(DELTA_FRAMES_SCRIPT)
+    if has_geo(fig):
+        topojson_url = install_geometry(OUTPUT_DIR)
+        if topojson_url:
+            options['config'] = {'topojsonURL': topojson_url}
+    if scripts:
+        options['post_script'] = scripts
+    return options
+
+def figure_html(fig):
+    """HTML document for a figure (or a payload from figure_payload) in the configured plotly.js mode."""
+    if not isinstance(fig, dict):
+        fig, _ = figure_payload(fig)
+    options = page_options(fig)
+
+    if PLOTLYJS_MODE == 'inline':
+        return pio.to_html(fig, include_plotlyjs=True, validate=False, **options)
+    if PLOTLYJS_MODE == 'cdn':
+        return pio.to_html(fig, include_plotlyjs='cdn', validate=False, **options)
+    if PLOTLYJS_MODE != 'shared':
+        raise ValueError(f"Unknown plotly.js mode '{PLOTLYJS_MODE}', expected one of {PLOTLYJS_MODES}")
+
+    write_shared_plotlyjs()
+    tags = SHARED_SCRIPT_TAGS.format(src=PLOTLYJS_FILENAME, cdn=PLOTLYJS_CDN_URL)
+    html = pio.to_html(fig, include_plotlyjs=False, validate=False, **options)
+    return html.replace('</head>', tags + '</head>', 1)
+
+def write_figure_html(html, filename):
+    """Write an already serialized figure page to interactive_plots/."""
+    check_output_dir()
+    path = os.path.join(OUTPUT_DIR, filename)
+    with open(path, "w", encoding='utf-8') as f:
+        f.write(html)
+    return path
+
+def write_figure(fig, filename):
+    """Write a figure (or a payload from figure_payload) to interactive_plots/ using the configured plotly.js mode."""
+    return write_figure_html(figure_html(fig), filename)
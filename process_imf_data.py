@@ -2,96 +2,235 @@ import json
 import pandas as pd
 import time
 import os
+import argparse
+from data_store import update_store
+from debt_categories import debt_category
+from imf_stream import iter_imf_series
+from instrumentation import stage
 
-def process_data():
-    # Wait for file
-    print("Waiting for data file...")
-    timeout = 60
-    start = time.time()
-    while not os.path.exists("imf_debt_data.json"):
-        if time.time() - start > timeout:
-            print("Timeout waiting for imf_debt_data.json")
-            return
-        time.sleep(1)
-    
-    print("Loading JSON data...")
-    with open("imf_debt_data.json", "r", encoding='utf-8') as f:
-        data = json.load(f)
-        
+try:
+    from watchdog.observers import Observer
+    from watchdog.events import FileSystemEventHandler
+except ImportError:
+    Observer = None
+
+DEBT_INDICATOR = 'GGXWDG_NGDP'
+CANDIDATE_YEARS = ['2024', '2023', '2022', '2021', '2020']
+
+DEBT_FILE = "imf_debt_data.json"
+COUNTRIES_FILE = "imf_countries.json"
+OUTPUT_CSV = "global_debt_data_2024.csv"
+# Other datamapper downloads whose values also go to the data store
+EXTRA_FILES = ["imf_ngdpd.json", "imf_ngdp_rpch.json", "imf_pcpipch.json"]
+
+WATCH_INTERVAL = 2  # seconds between checks when watchdog is not installed
+
+def load_countries_map(path=COUNTRIES_FILE):
+    """Country code -> label from the datamapper countries payload.
+
+    These labels are the CSV and store country names, as published; codes
+    missing from the payload keep the code. countries.py resolves them for joins.
+    """
     countries_map = {}
-    if os.path.exists("imf_countries.json"):
-        with open("imf_countries.json", "r", encoding='utf-8') as f:
+    if os.path.exists(path):
+        with open(path, "r", encoding='utf-8') as f:
             c_data = json.load(f)
             # Structure might be complex, let's explore or handle gracefully
             if 'countries' in c_data:
                 for k, v in c_data['countries'].items():
                     if 'label' in v:
                         countries_map[k] = v['label']
-    
-    # Extract Debt Data
+    return countries_map
+
+def parse_imf_file(path):
+    """Stream one datamapper payload into (debt_data, store_rows).
+
+    debt_data holds the candidate years of the debt indicator per country,
+    store_rows every valid (indicator, country, year, value) for the data store.
+    """
     # Path: data['values']['GGXWDG_NGDP'] -> {CountryCode: {Year: Value}}
-    
-    if 'values' not in data or 'GGXWDG_NGDP' not in data['values']:
-        print("Invalid Data Format: GGXWDG_NGDP not found")
-        return
+    debt_data = []
+    store_rows = {'indicator': [], 'country_code': [], 'year': [], 'value': []}
+    with stage('parse', path=path, bytes=os.path.getsize(path)) as span, open(path, "r", encoding='utf-8') as f:
+        for indicator, country_code, year_data in iter_imf_series(f):
+            if indicator == DEBT_INDICATOR:
+                debt_data.append((country_code, {y: year_data[y] for y in CANDIDATE_YEARS if y in year_data}))
+            for year, value in year_data.items():
+                try:
+                    value = float(value)
+                    year = int(year)
+                except (TypeError, ValueError):
+                    continue
+                store_rows['indicator'].append(indicator)
+                store_rows['country_code'].append(country_code)
+                store_rows['year'].append(year)
+                store_rows['value'].append(value)
+        span['rows'] = len(store_rows['value'])
+    return debt_data, store_rows
 
-    debt_data = data['values']['GGXWDG_NGDP']
-    
+def categorize_debt(debt_data, countries_map):
+    """Latest debt ratio and category per country, in the CSV layout."""
     processed_list = []
-    
-    for country_code, year_data in debt_data.items():
+
+    for country_code, year_data in debt_data:
         # Get latest available data (prioritizing 2024, then 2023, 2022)
         val = None
         year_used = None
-        
-        for y in ['2024', '2023', '2022', '2021', '2020']:
+
+        for y in CANDIDATE_YEARS:
             if y in year_data:
                 val = year_data[y]
                 year_used = y
                 break
-        
+
         # Check if value is valid (sometimes it's string "no data" or null)
         try:
             val_float = float(val)
         except (TypeError, ValueError):
             continue
-            
+
         country_name = countries_map.get(country_code, country_code)
-        
-        # Categorize
-        category = "Moderate (30-60%)"
-        color_hex = "#388e3c" # Green
-        
-        if val_float > 200:
-            category = "Critical (>200%)"
-            color_hex = "#8b0000"
-        elif val_float > 90:
-            category = "High (>90%)"
-            color_hex = "#d32f2f"
-        elif val_float > 60:
-            category = "High (60-90%)"
-            color_hex = "#f57c00"
-        elif val_float < 30:
-            category = "Low (<30%)"
-            color_hex = "#2ecc71" # Light Green
-            
+
         # OIC Flag (approximation/manual list or from metadata if available)
-        # We leave OIC specific tagging to the other script if needed, 
+        # We leave OIC specific tagging to the other script if needed,
         # but for the global map we just need the list.
-        
+
         processed_list.append({
             'Country Code': country_code,
             'Country': country_name,
-            'Debt-to-GDP Ratio (%)': round(val_float, 2),
+            'Debt-to-GDP Ratio (%)': val_float,
             'Year': year_used,
-            'Debt Category': category
         })
-        
-    df = pd.DataFrame(processed_list)
+
+    df = pd.DataFrame(processed_list, columns=['Country Code', 'Country', 'Debt-to-GDP Ratio (%)', 'Year'])
+    # Categorize on the unrounded ratio, in one vectorized pass
+    df['Debt Category'] = debt_category(df['Debt-to-GDP Ratio (%)'])
+    # Python round() per value, as the CSV has always been written (Series.round differs at ties)
+    df['Debt-to-GDP Ratio (%)'] = df['Debt-to-GDP Ratio (%)'].map(lambda v: round(v, 2))
+    return df
+
+def merge_store_rows(parsed_rows, countries_map):
+    """Combine the store rows of several parsed files into one long-format frame."""
+    store_df = pd.concat([pd.DataFrame(rows) for rows in parsed_rows], ignore_index=True)
+    store_df.insert(0, 'source', 'imf')
+    store_df['country'] = store_df['country_code'].map(countries_map).fillna(store_df['country_code'])
+    return store_df
+
+def write_outputs(df, store_df, csv_path=OUTPUT_CSV):
+    """Write the categorized CSV and upsert the raw values into the data store."""
+    with stage('write_csv', path=csv_path, rows=len(df)) as span:
+        df.to_csv(csv_path, index=False)
+        span['bytes'] = os.path.getsize(csv_path)
+    print(f"Saved to {csv_path}")
+
+    try:
+        with stage('write_store', rows=len(store_df)):
+            update_store(store_df)
+    except ImportError as e:
+        print(f"Skipping data store: {e}")
+
+def process_parsed(parsed, countries_map, csv_path=OUTPUT_CSV):
+    """Categorize and write already parsed payloads ({path: (debt_data, store_rows)})."""
+    debt_data = [item for debt, _ in parsed.values() for item in debt]
+    if not debt_data:
+        print(f"Invalid Data Format: {DEBT_INDICATOR} not found")
+        return None
+
+    with stage('categorize', rows=len(debt_data)):
+        df = categorize_debt(debt_data, countries_map)
     print(f"Processed {len(df)} countries.")
-    
-    df.to_csv("global_debt_data_2024.csv", index=False)
-    print("Saved to global_debt_data_2024.csv")
+    with stage('merge', files=len(parsed)) as span:
+        store_df = merge_store_rows([rows for _, rows in parsed.values()], countries_map)
+        span['rows'] = len(store_df)
+    write_outputs(df, store_df, csv_path)
+    return df
+
+def process_data(debt_path=DEBT_FILE, extra_paths=EXTRA_FILES, countries_path=COUNTRIES_FILE):
+    """Process the downloaded IMF files; returns the categorized frame or None."""
+    if not os.path.exists(debt_path):
+        print(f"{debt_path} not found; run download_imf.py or imf_pipeline.py first")
+        return None
+
+    print("Streaming JSON data...")
+    parsed = {path: parse_imf_file(path) for path in [debt_path, *extra_paths] if os.path.exists(path)}
+    return process_parsed(parsed, load_countries_map(countries_path))
+
+def _file_signature(path):
+    """Identity of the file currently at path; download_imf.py renames complete files into place."""
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return (st.st_ino, st.st_mtime_ns, st.st_size)
+
+def wait_for_update(path, signature, timeout=None):
+    """Block until a different file is renamed to path; returns its signature or None on timeout.
+
+    Uses filesystem notifications via watchdog when installed, otherwise
+    checks the file's identity every WATCH_INTERVAL seconds.
+    """
+    deadline = None if timeout is None else time.monotonic() + timeout
+    directory = os.path.dirname(os.path.abspath(path))
+    name = os.path.basename(path)
+
+    def remaining():
+        return None if deadline is None else max(0.0, deadline - time.monotonic())
+
+    if Observer is not None:
+        import threading
+        changed = threading.Event()
+
+        class Handler(FileSystemEventHandler):
+            def on_any_event(self, event):
+                target = getattr(event, 'dest_path', '') or event.src_path
+                if os.path.basename(target) == name:
+                    changed.set()
+
+        observer = Observer()
+        observer.schedule(Handler(), directory)
+        observer.start()
+        try:
+            while True:
+                changed.clear()
+                if _file_signature(path) not in (signature, None):
+                    break
+                if not changed.wait(remaining()) and deadline is not None:
+                    return None
+        finally:
+            observer.stop()
+            observer.join()
+        return _file_signature(path)
+
+    while _file_signature(path) in (signature, None):
+        if deadline is not None and time.monotonic() >= deadline:
+            return None
+        time.sleep(WATCH_INTERVAL if deadline is None else min(WATCH_INTERVAL, remaining()))
+    return _file_signature(path)
+
+def watch_data(debt_path=DEBT_FILE, timeout=None):
+    """Reprocess every time a new debt payload is renamed into place."""
+    signature = _file_signature(debt_path)
+    if signature is not None:
+        process_data(debt_path)
+    print(f"Watching {debt_path} for updates (Ctrl+C to stop)...")
+    try:
+        while True:
+            signature = wait_for_update(debt_path, signature, timeout)
+            if signature is None:
+                print(f"Timeout waiting for {debt_path}")
+                return
+            process_data(debt_path)
+    except KeyboardInterrupt:
+        pass
 
 if __name__ == "__main__":
-    process_data()
+    parser = argparse.ArgumentParser(description="Process downloaded IMF datamapper files.")
+    parser.add_argument('--watch', action='store_true',
+                        help=f"reprocess whenever {DEBT_FILE} is replaced")
+    parser.add_argument('--timeout', type=float, default=None,
+                        help="with --watch, stop after this many seconds without an update")
+    args = parser.parse_args()
+    if args.watch:
+        watch_data(timeout=args.timeout)
+    else:
+        process_data()
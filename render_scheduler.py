@@ -0,0 +1,118 @@
+import argparse
+import os
+import time
+import traceback
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import pandas as pd
+
+import plot_utils
+from build_manifest import is_up_to_date, job_hash, load_manifest, save_manifest
+from instrumentation import stage
+from plot_utils import figure_html, figure_payload, write_figure_html, write_shared_plotlyjs
+
+# One independent figure: build(*args) returns a plotly figure written to filename
+FigureJob = namedtuple('FigureJob', ['filename', 'build', 'args'])
+# bytes is the written file size and saved the figure JSON bytes saved by compaction
+RenderResult = namedtuple('RenderResult', ['filename', 'seconds', 'error', 'bytes', 'saved'], defaults=[0, 0])
+
+def default_workers():
+    """Size the process pool to the machine."""
+    return os.cpu_count() or 1
+
+def build_arg_parser(description):
+    """Command-line options shared by the figure generator scripts."""
+    parser = argparse.ArgumentParser(description=description)
+    parser.add_argument('--force', action='store_true',
+                        help='rebuild every figure even if its inputs are unchanged')
+    parser.add_argument('--workers', type=int, default=None,
+                        help='number of render processes (default: one per CPU)')
+    return parser
+
+def input_rows(args):
+    """Rows of the DataFrame/Series inputs of a figure job."""
+    return sum(len(arg) for arg in args if isinstance(arg, (pd.DataFrame, pd.Series)))
+
+def render_job(job, plotlyjs_mode=None, json_mode=None, precision=None):
+    """Build, serialize and write a single figure job, capturing any failure."""
+    if plotlyjs_mode is not None:
+        plot_utils.set_plotlyjs_mode(plotlyjs_mode)
+    if json_mode is not None:
+        plot_utils.set_figure_json_mode(json_mode, precision)
+    start = time.perf_counter()
+    size = saved = 0
+    try:
+        with stage('build', figure=job.filename, rows=input_rows(job.args)):
+            fig = job.build(*job.args)
+        with stage('serialize', figure=job.filename) as span:
+            payload, saved = figure_payload(fig)
+            html = figure_html(payload)
+            span.update(bytes=len(html), saved=saved)
+        with stage('write', figure=job.filename) as span:
+            size = span['bytes'] = os.path.getsize(write_figure_html(html, job.filename))
+        error = None
+    except Exception:
+        error = traceback.format_exc()
+    return RenderResult(job.filename, time.perf_counter() - start, error, size, saved)
+
+def report(results, wall_seconds):
+    """Print per-figure timing and failures for a render run."""
+    for result in sorted(results, key=lambda r: r.seconds, reverse=True):
+        status = "ok  " if result.error is None else "FAIL"
+        print(f"  {status} {result.seconds:7.2f}s {result.bytes / 1024:8.1f} KiB "
+              f"(-{result.saved / 1024:.1f} KiB JSON)  {result.filename}")
+    failures = [r for r in results if r.error is not None]
+    for result in failures:
+        print(f"\nError rendering {result.filename}:\n{result.error}")
+    saved = sum(r.saved for r in results)
+    print(f"Rendered {len(results) - len(failures)}/{len(results)} figures in {wall_seconds:.2f}s"
+          f" ({plot_utils.FIGURE_JSON_MODE} JSON saved {saved / 1024:.1f} KiB)")
+
+def render_jobs(jobs, max_workers=None, force=False):
+    """Render figure jobs in parallel; a failing figure does not stop the others.
+
+    Figures whose input data and layout spec hash to the value recorded in the
+    build manifest are skipped unless force is True.
+    """
+    jobs = list(jobs)
+    mode = plot_utils.PLOTLYJS_MODE
+    json_mode, precision = plot_utils.FIGURE_JSON_MODE, plot_utils.FIGURE_PRECISION
+
+    if mode == 'shared':
+        # Written once up front so workers never race on the shared bundle
+        write_shared_plotlyjs()
+
+    start = time.perf_counter()
+    with stage('hash', figures=len(jobs)):
+        digests = {job.filename: job_hash(job) for job in jobs}
+    if not force:
+        manifest = load_manifest()
+        pending = [job for job in jobs if not is_up_to_date(manifest, job.filename, digests[job.filename])]
+        if len(pending) < len(jobs):
+            print(f"Skipping {len(jobs) - len(pending)} unchanged figures (use --force to rebuild).")
+        jobs = pending
+
+    if max_workers is None:
+        max_workers = default_workers()
+    max_workers = max(1, min(max_workers, len(jobs)))
+
+    if max_workers == 1:
+        results = [render_job(job) for job in jobs]
+    else:
+        results = []
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            futures = {executor.submit(render_job, job, mode, json_mode, precision): job for job in jobs}
+            for future in as_completed(futures):
+                try:
+                    results.append(future.result())
+                except Exception:
+                    # The worker itself died or the job could not be pickled
+                    results.append(RenderResult(futures[future].filename, 0.0, traceback.format_exc()))
+
+    built = {r.filename: digests[r.filename] for r in results if r.error is None}
+    if built:
+        save_manifest(built)
+
+    report(results, time.perf_counter() - start)
+    return results
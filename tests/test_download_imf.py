@@ -0,0 +1,103 @@
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from download_imf import create_session, download_file
+
+BODY = b'{"values": {"GGXWDG_NGDP": {"JPN": {"2024": 251.2}, "USA": {"2024": 121.0}}}}'
+
+class DatamapperHandler(BaseHTTPRequestHandler):
+    """Serves server.body under server.etag with conditional GET and If-Range byte ranges."""
+
+    def do_GET(self):
+        server = self.server
+        server.requests.append(dict(self.headers))
+        if self.headers.get('If-None-Match') == server.etag:
+            self.send_response(304)
+            self.send_header('ETag', server.etag)
+            self.end_headers()
+            return
+        body, start = server.body, 0
+        byte_range = self.headers.get('Range')
+        if byte_range and self.headers.get('If-Range') == server.etag:
+            start = int(byte_range[len('bytes='):].rstrip('-'))
+            self.send_response(206)
+            self.send_header('Content-Range', f"bytes {start}-{len(body) - 1}/{len(body)}")
+        else:
+            self.send_response(200)
+        self.send_header('ETag', server.etag)
+        self.send_header('Content-Length', str(len(body) - start))
+        self.end_headers()
+        self.wfile.write(body[start:])
+
+    def log_message(self, format, *args):
+        pass
+
+@pytest.fixture
+def server():
+    httpd = ThreadingHTTPServer(('127.0.0.1', 0), DatamapperHandler)
+    httpd.body, httpd.etag, httpd.requests = BODY, '"v1"', []
+    httpd.url = f"http://127.0.0.1:{httpd.server_address[1]}/GGXWDG_NGDP"
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield httpd
+    httpd.shutdown()
+    httpd.server_close()
+
+@pytest.fixture
+def session():
+    with create_session(retries=0) as s:
+        yield s
+
+def test_download_file_writes_complete_file(server, session, tmp_path):
+    path = tmp_path / 'imf_debt_data.json'
+
+    status, validators = download_file(session, server.url, str(path))
+
+    assert status == 'downloaded'
+    assert validators['etag'] == '"v1"'
+    assert path.read_bytes() == BODY
+    assert not (tmp_path / 'imf_debt_data.json.part').exists()
+
+def test_download_file_not_modified(server, session, tmp_path):
+    path = tmp_path / 'imf_debt_data.json'
+    path.write_bytes(b'previous copy')
+    cached = {'etag': '"v1"'}
+
+    status, validators = download_file(session, server.url, str(path), cached)
+
+    assert status == 'not modified'
+    assert validators == cached
+    assert server.requests[-1]['If-None-Match'] == '"v1"'
+    assert path.read_bytes() == b'previous copy'
+
+def test_download_file_resumes_partial_download(server, session, tmp_path):
+    path = tmp_path / 'imf_debt_data.json'
+    part_path = tmp_path / 'imf_debt_data.json.part'
+    part_path.write_bytes(BODY[:20])
+
+    status, validators = download_file(session, server.url, str(path), {'partial_etag': '"v1"'})
+
+    assert status == 'resumed'
+    assert validators['etag'] == '"v1"'
+    request = server.requests[-1]
+    assert request['Range'] == 'bytes=20-'
+    assert request['If-Range'] == '"v1"'
+    assert request['Accept-Encoding'] == 'identity'
+    assert path.read_bytes() == BODY
+    assert not part_path.exists()
+
+def test_download_file_restarts_when_partial_download_is_stale(server, session, tmp_path):
+    path = tmp_path / 'imf_debt_data.json'
+    part_path = tmp_path / 'imf_debt_data.json.part'
+    part_path.write_bytes(b'{"values": {"OLD"')
+    server.body, server.etag = BODY.replace(b'251.2', b'249.7'), '"v2"'
+
+    status, validators = download_file(session, server.url, str(path), {'partial_etag': '"v1"'})
+
+    assert status == 'downloaded'
+    assert validators['etag'] == '"v2"'
+    assert server.requests[-1]['If-Range'] == '"v1"'
+    assert path.read_bytes() == server.body
+    assert not part_path.exists()
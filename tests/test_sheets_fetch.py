@@ -0,0 +1,131 @@
+import os
+import importlib.util
+
+import pytest
+
+# The script imports the Google client, dotenv and the plotting stack at module level
+for _dependency in ('dotenv', 'google.oauth2', 'googleapiclient.discovery', 'matplotlib', 'seaborn'):
+    pytest.importorskip(_dependency)
+
+SCRIPT = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'gdp_debt_analysis copy.py')
+SPREADSHEET_ID = 'spreadsheet-1'
+SHEET_NAMES = {'twc': '880828924', 'world_states': '0'}
+SHEET_VALUES = {
+    880828924: [['Country', 'Debt'], ['Japan', '260'], ['Italy', '137']],
+    0: [['Country', 'GDP'], ['United States', '28780']],
+}
+
+def load_script():
+    spec = importlib.util.spec_from_file_location('sheets_script', SCRIPT)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+sheets = load_script()
+
+class _Request:
+    def __init__(self, respond):
+        self._respond = respond
+
+    def execute(self):
+        return self._respond()
+
+class FakeSheetsService:
+    """The slice of the Sheets v4 client fetch_sheets uses; records each batch request."""
+
+    def __init__(self, values=SHEET_VALUES, error=None):
+        self.values_by_gid = values
+        self.error = error
+        self.requests = []
+
+    def spreadsheets(self):
+        return self
+
+    def values(self):
+        return self
+
+    def batchGetByDataFilter(self, spreadsheetId, body):
+        self.requests.append((spreadsheetId, body))
+        return _Request(lambda: self._respond(body))
+
+    def _respond(self, body):
+        if self.error is not None:
+            raise self.error
+        value_ranges = []
+        for data_filter in body['dataFilters']:
+            gid = data_filter['gridRange']['sheetId']
+            value_ranges.append({
+                'valueRange': {'values': self.values_by_gid[gid]},
+                'dataFilters': [data_filter],
+            })
+        return {'valueRanges': value_ranges}
+
+class FakeDriveService:
+    """files().get(...).execute() returning the spreadsheet's current version."""
+
+    def __init__(self, version):
+        self.version = version
+
+    def files(self):
+        return self
+
+    def get(self, fileId, fields):
+        return _Request(lambda: {'version': self.version})
+
+def test_batch_get_sheet_data_reads_every_sheet_in_one_request():
+    service = FakeSheetsService()
+
+    data = sheets.batch_get_sheet_data(service, SPREADSHEET_ID, SHEET_NAMES)
+
+    assert len(service.requests) == 1
+    spreadsheet_id, body = service.requests[0]
+    assert spreadsheet_id == SPREADSHEET_ID
+    assert [f['gridRange']['sheetId'] for f in body['dataFilters']] == [880828924, 0]
+    assert data == {'twc': SHEET_VALUES[880828924], 'world_states': SHEET_VALUES[0]}
+
+def test_fetch_sheets_uses_one_batch_request(tmp_path):
+    service = FakeSheetsService()
+    cache_file = str(tmp_path / 'sheets_cache.json')
+
+    frames = sheets.fetch_sheets(service, FakeDriveService('7'), SPREADSHEET_ID, SHEET_NAMES, cache_file)
+
+    assert len(service.requests) == 1
+    assert list(frames['twc']['Country']) == ['Japan', 'Italy']
+    assert list(frames['world_states'].columns) == ['Country', 'GDP']
+    assert sheets.load_sheets_cache(cache_file)['revision'] == '7'
+
+def test_fetch_sheets_uses_cache_for_unchanged_revision(tmp_path):
+    cache_file = str(tmp_path / 'sheets_cache.json')
+    sheets.fetch_sheets(FakeSheetsService(), FakeDriveService('7'), SPREADSHEET_ID, SHEET_NAMES, cache_file)
+
+    service = FakeSheetsService()
+    frames = sheets.fetch_sheets(service, FakeDriveService('7'), SPREADSHEET_ID, SHEET_NAMES, cache_file)
+
+    assert service.requests == []
+    assert list(frames['twc']['Debt']) == ['260', '137']
+
+def test_fetch_sheets_refetches_on_new_revision(tmp_path):
+    cache_file = str(tmp_path / 'sheets_cache.json')
+    sheets.fetch_sheets(FakeSheetsService(), FakeDriveService('7'), SPREADSHEET_ID, SHEET_NAMES, cache_file)
+
+    updated = {**SHEET_VALUES, 0: [['Country', 'GDP'], ['United States', '29000']]}
+    service = FakeSheetsService(updated)
+    frames = sheets.fetch_sheets(service, FakeDriveService('8'), SPREADSHEET_ID, SHEET_NAMES, cache_file)
+
+    assert len(service.requests) == 1
+    assert list(frames['world_states']['GDP']) == ['29000']
+    assert sheets.load_sheets_cache(cache_file)['revision'] == '8'
+
+def test_fetch_sheets_falls_back_to_csv_export_when_api_fails(tmp_path, monkeypatch):
+    for gid, rows in SHEET_VALUES.items():
+        (tmp_path / f'{gid}.csv').write_text('\n'.join(','.join(row) for row in rows) + '\n')
+    monkeypatch.setattr(sheets, 'CSV_EXPORT_URL', str(tmp_path / '{gid}.csv'))
+    cache_file = str(tmp_path / 'sheets_cache.json')
+    service = FakeSheetsService(error=RuntimeError('quota exceeded'))
+
+    frames = sheets.fetch_sheets(service, FakeDriveService('7'), SPREADSHEET_ID, SHEET_NAMES, cache_file)
+
+    assert len(service.requests) == 1
+    assert list(frames['twc']['Country']) == ['Japan', 'Italy']
+    assert list(frames['world_states']['GDP']) == [28780]
+    assert not os.path.exists(cache_file)